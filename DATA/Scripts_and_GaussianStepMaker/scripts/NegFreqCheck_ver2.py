@@ -1,54 +1,119 @@
+import argparse
 import os
-import pandas as pd
 
-# Create an empty list to store dictionaries of results
-results = []
+from compressed_log import is_log_file, unique_logs
+from log_scanner import FLOAT_RE, read_at, rfind_bytes, tail_lines
+from parse_cache import ParseCache, add_cache_arguments
+from parse_profile import NO_PROFILE, Profile, add_profile_argument
 
-# Iterate over all files in the current directory
-for filename in os.listdir("."):
-    if filename.endswith(".log"):
-        with open(filename, "r") as file:
-            content = file.readlines()
+FC_MARKER = b" Full mass-weighted force constant matrix:"
+FREQ_SECTION_BYTES = 4096   # marker, both "Low frequencies" lines and the imaginary warning fit easily
+OUTPUT_BASENAME = "frequency_check_results"
 
-        # Check for job completion
-        if "Normal termination of Gaussian" in content[-1]:
-            job_completion = "Job finished"
-            error_details = ""
-        else:
-            job_completion = "Job error"
-            error_details = "".join(content[-5:])  # Last 5 lines of the file
+def check_log(filename, prof=NO_PROFILE):
+    """Check one log for job completion and imaginary frequencies.
+
+    Works from the end of the file: the termination line comes from a single
+    tail read, and the last frequency section is found by a backward block
+    search, so only the bytes after it are ever read.
+    """
+    # Check for job completion
+    with prof.stage("tail", filename):
+        tail = tail_lines(filename, 5)
+    if tail and "Normal termination of Gaussian" in tail[-1]:
+        job_completion = "Job finished"
+        error_details = ""
+    else:
+        job_completion = "Job error"
+        error_details = "".join(tail)  # Last 5 lines of the file
+
+    # Locate the final frequency section
+    low_freqs = []   # one list per "Low frequencies ---" line
+    imaginary = False
+    with prof.stage("freq_section", filename):
+        offset = rfind_bytes(filename, FC_MARKER)
+        if offset >= 0:
+            for line in read_at(filename, offset, FREQ_SECTION_BYTES).splitlines():
+                if "Low frequencies ---" in line:
+                    low_freqs.append([float(x) for x in FLOAT_RE.findall(line)])
+                elif "imaginary frequencies (negative Signs)" in line:
+                    imaginary = True
+                elif "Harmonic frequencies" in line:
+                    break
+        prof.hit("LowFrequencies", len(low_freqs))
 
-        # Check for the presence of imaginary frequencies
-        if any("imaginary frequencies (negative Signs)" in line for line in content):
+    # Check for the presence of imaginary frequencies
+    if imaginary:
+        freq_status = "Negative frequency"
+    elif offset < 0:
+        freq_status = "Keyword not found"
+    elif len(low_freqs) > 1:
+        # The first line holds the translations/rotations; judge on the second
+        second_freqs = low_freqs[1]
+        if second_freqs and second_freqs[0] < 0:
             freq_status = "Negative frequency"
         else:
-            # Find the index of the keyword
-            try:
-                start_index = content.index(" Full mass-weighted force constant matrix:\n") + 1
-                freq_lines = [line for line in content[start_index:] if "Low frequencies ---" in line]
-
-                if len(freq_lines) > 1:
-                    # Extract frequencies from the second line
-                    second_freqs = [float(x) for x in freq_lines[1].split()[3:]]
-                    if second_freqs[0] < 0:
-                        freq_status = "Negative frequency"
-                    else:
-                        freq_status = "OK"
-                else:
-                    freq_status = "Incomplete data"
-            except ValueError:
-                freq_status = "Keyword not found"
-
-        # Append results to list
-        results.append({
-            "Filename": filename,
-            "Status": freq_status,
-            "Job Completion": job_completion,
-            "Error Details": error_details
-        })
-
-# Convert list of dictionaries to DataFrame
-results_df = pd.DataFrame(results)
-
-# Write the DataFrame to an Excel file
-results_df.to_excel("frequency_check_results.xlsx", index=False)
+            freq_status = "OK"
+    else:
+        freq_status = "Incomplete data"
+
+    # Like Status, the lowest frequency comes from the vibrational lines only
+    trans_rot = low_freqs[0] if low_freqs else []
+    vib_low = [f for line in low_freqs[1:] for f in line]
+    return {
+        "Filename": os.path.basename(filename),
+        "Status": freq_status,
+        "Job Completion": job_completion,
+        "Trans/Rot Frequencies": " ".join(f"{f:.4f}" for f in trans_rot),
+        "Low Frequencies": " ".join(f"{f:.4f}" for f in vib_low),
+        "Lowest Frequency": min(vib_low) if vib_low else None,
+        "Error Details": error_details
+    }
+
+def write_results(results_df, formats):
+    """Write the table in each requested format; Parquet needs pyarrow or fastparquet."""
+    for fmt in formats:
+        out = f"{OUTPUT_BASENAME}.{fmt}"
+        try:
+            if fmt == "xlsx":
+                results_df.to_excel(out, index=False)
+            elif fmt == "csv":
+                results_df.to_csv(out, index=False)
+            elif fmt == "parquet":
+                results_df.to_parquet(out, index=False)
+        except ImportError as e:
+            print(f"Skipping {out}: {str(e).splitlines()[0]}")
+            continue
+        print(f"Results written to {out}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Check job completion and imaginary frequencies of all .log files here.")
+    ap.add_argument("--format", nargs="+", default=["xlsx", "csv"], choices=["xlsx", "csv", "parquet"],
+                    help="Output format(s). Excel is slow for large tables; csv/parquet are not.")
+    add_cache_arguments(ap)
+    add_profile_argument(ap, "freq")
+    args = ap.parse_args()
+    prof = Profile("freq", args.profile, reset=True) if args.profile else NO_PROFILE
+
+    # Create an empty list to store dictionaries of results
+    results = []
+
+    # Iterate over all files in the current directory (unchanged logs come from the cache)
+    with ParseCache(enabled=not args.no_cache, rebuild=args.rebuild_cache) as cache:
+        for filename in unique_logs(f for f in os.listdir(".") if is_log_file(f, (".log",))):
+            results.append(cache.fetch("freq", filename, lambda: check_log(filename, prof)))
+        cache.evict_missing()
+        print(cache.summary())
+
+    # Convert list of dictionaries to DataFrame (pandas is only needed for writing)
+    with prof.stage("dataframe"):
+        import pandas as pd
+        results_df = pd.DataFrame(results)
+
+    with prof.stage("write"):
+        write_results(results_df, args.format)
+    if prof:
+        print(prof.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Atom-centred molecular integration grid with Becke fuzzy-cell weights.
+
+Each atom gets a radial Gauss-Chebyshev grid (Becke's r = R (1+x)/(1-x)
+mapping, R from Bragg-Slater radii) times a product angular grid
+(Gauss-Legendre in cos(theta), uniform in phi); the atomic grids are glued
+together with Becke's partition (three smoothing iterations, no size
+adjustment). For a molecule the grid is built once and any number of
+integrands can then be summed against it:
+
+    points, weights = molecular_grid(fchk.atomic_numbers, fchk.coordinates)
+    integral = weights @ f(points)
+"""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+from gto_basis import BOHR_TO_ANGSTROM, POINT_CHUNK
+
+N_RADIAL = 50
+N_THETA = 14              # phi uses 2 * N_THETA points
+
+# Bragg-Slater radii in Angstrom (H..Kr); heavier elements fall back to DEFAULT_RADIUS
+BRAGG_RADII = (
+    0.35, 0.35,
+    1.45, 1.05, 0.85, 0.70, 0.65, 0.60, 0.50, 0.45,
+    1.80, 1.50, 1.25, 1.10, 1.00, 1.00, 1.00, 1.00,
+    2.20, 1.80, 1.60, 1.40, 1.35, 1.40, 1.40, 1.40, 1.35, 1.35, 1.35, 1.35,
+    1.30, 1.25, 1.15, 1.15, 1.15, 1.15,
+)
+DEFAULT_RADIUS = 1.40
+
+
+def radial_grid(n: int, R: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Becke's Gauss-Chebyshev (2nd kind) radial grid; weights include r^2."""
+    i = np.arange(1, n + 1)
+    x = np.cos(i * np.pi / (n + 1))
+    w_x = np.pi / (n + 1) * np.sin(i * np.pi / (n + 1)) ** 2 / np.sqrt(1 - x ** 2)
+    r = R * (1 + x) / (1 - x)
+    dr = 2 * R / (1 - x) ** 2
+    return r, w_x * dr * r ** 2
+
+def angular_grid(n_theta: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Unit-sphere points (n, 3) and weights summing to 4 pi."""
+    ct, wt = np.polynomial.legendre.leggauss(n_theta)
+    n_phi = 2 * n_theta
+    phi = (np.arange(n_phi) + 0.5) * 2 * np.pi / n_phi
+    st = np.sqrt(1 - ct ** 2)
+    pts = np.stack([np.outer(st, np.cos(phi)), np.outer(st, np.sin(phi)), np.outer(ct, np.ones(n_phi))], axis=-1)
+    w = np.outer(wt, np.full(n_phi, 2 * np.pi / n_phi))
+    return pts.reshape(-1, 3), w.ravel()
+
+def _becke_weights(points: np.ndarray, coords: np.ndarray, owner: int) -> np.ndarray:
+    """Becke partition weight of atom `owner` at points."""
+    n = len(coords)
+    if n == 1:
+        return np.ones(len(points))
+    rij = np.linalg.norm(coords[:, None, :] - coords[None, :, :], axis=2)
+    np.fill_diagonal(rij, 1.0)
+    inv_rij = 1.0 / rij
+    out = np.empty(len(points))
+    for p0 in range(0, len(points), POINT_CHUNK):
+        pts = points[p0:p0 + POINT_CHUNK]
+        dist = np.linalg.norm(pts[:, None, :] - coords[None, :, :], axis=2)         # (P, N)
+        cell = np.ones_like(dist)
+        for i in range(n):
+            mu = (dist[:, i, None] - dist) * inv_rij[i]                             # (P, N)
+            for _ in range(3):
+                mu = 1.5 * mu - 0.5 * mu ** 3
+            mu[:, i] = -1.0
+            cell[:, i] = (0.5 * (1 - mu)).prod(axis=1)
+        out[p0:p0 + POINT_CHUNK] = cell[:, owner] / cell.sum(axis=1)
+    return out
+
+def molecular_grid(atomic_numbers, coords: np.ndarray, n_radial: int = N_RADIAL,
+                   n_theta: int = N_THETA) -> Tuple[np.ndarray, np.ndarray]:
+    """Points (P, 3) in Bohr and weights (P,) for the molecule."""
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    ang_pts, ang_w = angular_grid(n_theta)
+    all_pts, all_w = [], []
+    for a, z in enumerate(np.asarray(atomic_numbers).tolist()):
+        radius = BRAGG_RADII[z - 1] if 0 < z <= len(BRAGG_RADII) else DEFAULT_RADIUS
+        R = radius / BOHR_TO_ANGSTROM * (1.0 if z == 1 else 0.5)
+        r, wr = radial_grid(n_radial, R)
+        pts = coords[a] + (r[:, None, None] * ang_pts[None, :, :]).reshape(-1, 3)
+        w = (wr[:, None] * ang_w[None, :]).ravel()
+        all_pts.append(pts)
+        all_w.append(w * _becke_weights(pts, coords, a))
+    return np.concatenate(all_pts), np.concatenate(all_w)
@@ -0,0 +1,707 @@
+"""
+Wall-time and peak-memory benchmark for the log parsers.
+
+Each (parser, file) measurement runs in a fresh interpreter so that peak RSS
+is not polluted by earlier runs; the reported memory is the growth of peak RSS
+during the parse itself (imports excluded).
+
+    python benchmark_parsers.py scanner                 # 3 largest logs under DATA/
+    python benchmark_parsers.py scanner --legacy-dir /tmp/old_scripts
+    python benchmark_parsers.py jobs --corpus 3000 --workers 1 2 4 8
+    python benchmark_parsers.py dispatch                # lines/s of the line matcher
+    python benchmark_parsers.py transitions --states 200000
+    python benchmark_parsers.py lambda scan_*.fchk [--multiwfn /path/to/Multiwfn]
+    python benchmark_parsers.py multiwfn --files 100 --workers 1 2 4 8   # multiwfn_pool scaling (stub)
+    python benchmark_parsers.py ensemble --frames 10000 100000           # xyz_ensemble read + dedup
+    python benchmark_parsers.py startup --check                          # pet.py import time per command
+    python benchmark_parsers.py suite --json bench/$(git rev-parse --short HEAD).json
+    python benchmark_parsers.py suite --compare bench/old.json --check   # regression gate
+    python benchmark_parsers.py scaling --steps 10 100 1000 --atoms 150  # synthetic_log sizes
+    python benchmark_parsers.py compressed --formats gz xz zst bz2        # compressed vs plain DATA/ logs
+
+--legacy-dir points at another copy of this folder (e.g. a `git worktree` of
+an older revision) whose parsers are timed side by side with the current ones.
+
+`suite` runs every parser over the whole DATA/ corpus (or --files), again in
+one fresh interpreter per parser, and splits the time into phases: module
+import, a raw read of the same bytes (the I/O floor), the first parse pass
+and the best of --repeat passes. Throughput (MB/s, files/s) is taken from the
+best pass. The JSON it writes holds the commit, machine and corpus next to
+the per-parser and per-file numbers, so runs from different commits on the
+same machine can be compared with --compare.
+
+`compressed` copies the corpus compressed in each format, once as the
+command-line tool writes it (one gzip member / xz block / zstd frame, no seek
+table) and once seekable (compressed_log.compress: BGZF, xz blocks, zstd
+seekable frames), and times the parsers on every copy against the plain logs:
+tddft_parser streams the whole text, NegFreqCheck_ver2 and the geometry
+reader work from the end of the file and show what the seek tables save.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+HERE = Path(__file__).resolve().parent
+DATA_DIR = HERE.parent.parent
+
+# parser name -> (module, function)
+PARSERS = {
+    "tddft": ("tddft_parser", "parse_file"),
+    "extract": ("extract_all_results", "extract_gaussian_data"),
+    "freq": ("NegFreqCheck_ver2", "check_log"),
+    "geometry": ("log_to_com", "extract_last_geometry"),
+    "scf": ("dft_scf_energy_parser", "last_scf_energy"),
+    "td-energy": ("excitation_energy_parser", "last_td_energy"),
+}
+REGRESSION_TOLERANCE = 0.10   # suite --compare flags parsers whose best pass is this much slower
+
+
+def largest_logs(root: Path, n: int) -> List[Path]:
+    logs = [p for p in root.rglob("*.log") if p.is_file()]
+    logs.sort(key=lambda p: p.stat().st_size, reverse=True)
+    return logs[:n]
+
+def _peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _child(scripts_dir: str, parser: str, path: str, repeat: int) -> None:
+    """Runs inside the child interpreter; prints one JSON line."""
+    import importlib
+    sys.path.insert(0, scripts_dir)
+    os.chdir(scripts_dir)
+    mod_name, func_name = PARSERS[parser]
+    try:
+        func = getattr(importlib.import_module(mod_name), func_name)
+    except (ImportError, AttributeError) as e:
+        print(json.dumps({"skipped": str(e)}))
+        return
+    arg = Path(path) if parser == "tddft" else path
+    rss0 = _peak_rss_kb()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - t0)
+    print(json.dumps({"wall_s": min(times), "peak_rss_delta_kb": _peak_rss_kb() - rss0}))
+
+def measure(scripts_dir: Path, parser: str, path: Path, repeat: int = 3) -> Dict[str, object]:
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "_child", str(scripts_dir), parser, str(path), str(repeat)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"skipped": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def run_scanner(args) -> None:
+    files = [Path(f) for f in args.files] if args.files else largest_logs(DATA_DIR, args.n)
+    variants = [("current", HERE)]
+    if args.legacy_dir:
+        variants.insert(0, ("legacy", Path(args.legacy_dir).resolve()))
+
+    print(f"{'file':<48} {'lines':>7} {'parser':<8} {'variant':<8} {'wall(s)':>8} {'peakRSS(MB)':>11}")
+    print("-" * 96)
+    for f in files:
+        with open(f, "rb") as fh:
+            nlines = sum(1 for _ in fh)
+        for parser in args.parsers:
+            for label, d in variants:
+                r = measure(d, parser, f, args.repeat)
+                if "skipped" in r:
+                    print(f"{f.name[:48]:<48} {nlines:>7} {parser:<8} {label:<8} {'skipped':>8}")
+                    continue
+                print(f"{f.name[:48]:<48} {nlines:>7} {parser:<8} {label:<8} "
+                      f"{r['wall_s']:>8.3f} {r['peak_rss_delta_kb'] / 1024:>11.1f}")
+
+def _suite_child(scripts_dir: str, parser: str, list_file: str, repeat: int) -> None:
+    """Runs inside the child interpreter: all phases of one parser over a file list; prints one JSON line."""
+    import importlib
+    sys.path.insert(0, scripts_dir)
+    os.chdir(scripts_dir)
+    files = json.loads(Path(list_file).read_text())
+    mod_name, func_name = PARSERS[parser]
+    t0 = time.perf_counter()
+    try:
+        func = getattr(importlib.import_module(mod_name), func_name)
+    except (ImportError, AttributeError) as e:
+        print(json.dumps({"skipped": str(e)}))
+        return
+    import_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for f in files:
+        with open(f, "rb") as fh:
+            while fh.read(1 << 20):
+                pass
+    read_s = time.perf_counter() - t0
+
+    args = [Path(f) if parser == "tddft" else f for f in files]
+    rss0 = _peak_rss_kb()
+    passes = []
+    per_file = [float("inf")] * len(files)
+    for _ in range(max(1, repeat)):
+        t_pass = time.perf_counter()
+        for i, arg in enumerate(args):
+            t0 = time.perf_counter()
+            func(arg)
+            per_file[i] = min(per_file[i], time.perf_counter() - t0)
+        passes.append(time.perf_counter() - t_pass)
+    print(json.dumps({
+        "phases": {"import_s": import_s, "read_s": read_s, "first_pass_s": passes[0], "best_pass_s": min(passes)},
+        "peak_rss_delta_kb": _peak_rss_kb() - rss0,
+        "per_file_s": per_file,
+    }))
+
+def suite_measure(scripts_dir: Path, parser: str, files: List[Path], repeat: int) -> Dict[str, object]:
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as tmp:
+        json.dump([str(f) for f in files], tmp)
+    try:
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "_suite_child", str(scripts_dir), parser, tmp.name,
+             str(repeat)], capture_output=True, text=True,
+        )
+    finally:
+        os.unlink(tmp.name)
+    if proc.returncode != 0:
+        return {"skipped": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def _git_commit() -> Optional[str]:
+    proc = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=HERE)
+    if proc.returncode != 0:
+        return None
+    dirty = subprocess.run(["git", "status", "--porcelain", "--", "."], capture_output=True, text=True, cwd=HERE)
+    return proc.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+def compare_suites(old: Dict[str, object], new: Dict[str, object], tolerance: float) -> List[str]:
+    """Print best-pass changes per parser; returns the parsers that slowed down by more than tolerance."""
+    print(f"\nvs {old['meta'].get('commit') or '?'} ({old['meta'].get('date', '?')})")
+    print(f"{'parser':<10} {'old (s)':>9} {'new (s)':>9} {'change':>8}")
+    slower = []
+    for parser, r in new["results"].items():
+        o = old["results"].get(parser)
+        if not o or "skipped" in o or "skipped" in r:
+            continue
+        if o["files"] != r["files"] or o["bytes"] != r["bytes"]:
+            print(f"{parser:<10} different corpus, not compared")
+            continue
+        a, b = o["phases"]["best_pass_s"], r["phases"]["best_pass_s"]
+        change = b / a - 1
+        flag = "  REGRESSION" if change > tolerance else ""
+        if flag:
+            slower.append(parser)
+        print(f"{parser:<10} {a:>9.3f} {b:>9.3f} {change:>+8.1%}{flag}")
+    return slower
+
+def run_suite(args) -> None:
+    import platform
+
+    files = [Path(f).resolve() for f in args.files] if args.files else \
+        sorted(p.resolve() for p in DATA_DIR.rglob("*.log") if p.is_file())
+    sizes = [f.stat().st_size for f in files]
+    total = sum(sizes)
+    meta = {
+        "commit": _git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "corpus": {"files": len(files), "bytes": total},
+    }
+    print(f"{len(files)} logs, {total / 1e6:.1f} MB, best of {args.repeat} passes")
+    print(f"{'parser':<10} {'import':>7} {'read':>7} {'first':>7} {'best':>7} {'MB/s':>7} {'files/s':>8} "
+          f"{'peakRSS(MB)':>11}  slowest file")
+    results = {}
+    for parser in args.parsers:
+        r = suite_measure(HERE, parser, files, args.repeat)
+        if "skipped" in r:
+            print(f"{parser:<10} skipped: {r['skipped']}")
+            results[parser] = r
+            continue
+        ph, per_file = r["phases"], r.pop("per_file_s")
+        best = ph["best_pass_s"]
+        slowest = max(range(len(files)), key=per_file.__getitem__)
+        results[parser] = {
+            "files": len(files), "bytes": total, **r,
+            "mb_per_s": total / 1e6 / best, "files_per_s": len(files) / best,
+            "per_file": [{"file": str(f.relative_to(DATA_DIR)) if f.is_relative_to(DATA_DIR) else str(f),
+                          "bytes": n, "seconds": t} for f, n, t in zip(files, sizes, per_file)],
+        }
+        print(f"{parser:<10} {ph['import_s']:>7.3f} {ph['read_s']:>7.3f} {ph['first_pass_s']:>7.3f} {best:>7.3f} "
+              f"{total / 1e6 / best:>7.1f} {len(files) / best:>8.1f} {r['peak_rss_delta_kb'] / 1024:>11.1f}  "
+              f"{files[slowest].name} ({per_file[slowest] * 1e3:.1f} ms)")
+    suite = {"meta": meta, "results": results}
+
+    if args.json:
+        out = Path(args.json)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(suite, indent=1))
+        print(f"Wrote: {out}")
+    if args.compare:
+        slower = compare_suites(json.loads(Path(args.compare).read_text()), suite, args.tolerance)
+        if slower and args.check:
+            sys.exit(f"Slower than {args.compare}: {', '.join(slower)}")
+
+def run_scaling(args) -> None:
+    from synthetic_log import SyntheticLog, load_template
+
+    template = load_template()
+    print(f"{'parser':<10} {'steps':>6} {'MB':>8} {'lines':>9} {'best(s)':>8} {'MB/s':>7} {'peakRSS(MB)':>11}")
+    with tempfile.TemporaryDirectory(prefix="pet_scaling_") as tmp:
+        logs = []
+        for steps in args.steps:
+            path = SyntheticLog(template, args.atoms, steps, args.states, args.transitions).write(
+                Path(tmp) / f"04syn_{steps}.log")
+            with open(path, "rb") as fh:
+                logs.append((steps, path, path.stat().st_size, sum(1 for _ in fh)))
+        for parser in args.parsers:
+            for steps, path, size, nlines in logs:
+                r = suite_measure(HERE, parser, [path], args.repeat)
+                if "skipped" in r:
+                    print(f"{parser:<10} {steps:>6} skipped: {r['skipped']}")
+                    continue
+                best = r["phases"]["best_pass_s"]
+                print(f"{parser:<10} {steps:>6} {size / 1e6:>8.1f} {nlines:>9} {best:>8.3f} {size / 1e6 / best:>7.1f} "
+                      f"{r['peak_rss_delta_kb'] / 1024:>11.1f}")
+
+def _compress_plain(src: Path, dest: Path, fmt: str) -> None:
+    """Compress as the gzip/bzip2/xz/zstd tools do by default: one member, stream or frame."""
+    import bz2
+    import gzip
+    import lzma
+    from compressed_log import LEVELS, _zstd
+
+    data = src.read_bytes()
+    if fmt == "gz":
+        out = gzip.compress(data, LEVELS["gz"], mtime=0)
+    elif fmt == "bz2":
+        out = bz2.compress(data, LEVELS["bz2"])
+    elif fmt == "xz":
+        out = lzma.compress(data, preset=LEVELS["xz"])
+    else:
+        out = _zstd().ZstdCompressor(level=LEVELS["zst"]).compress(data)
+    dest.write_bytes(out)
+
+def run_compressed(args) -> None:
+    from compressed_log import compress, seek_table
+
+    files = [Path(f).resolve() for f in args.files] if args.files else \
+        sorted(p.resolve() for p in DATA_DIR.rglob("*.log") if p.is_file())
+    total = sum(f.stat().st_size for f in files)
+    print(f"{len(files)} logs, {total / 1e6:.1f} MB; best of {args.repeat} passes per parser (x = time / plain)")
+    print(f"{'variant':<14} {'MB':>7} {'ratio':>6} {'write(s)':>8} {'seekable':>8}"
+          + "".join(f" {p + '(s)':>13} {'x':>5}" for p in args.parsers))
+    base: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="pet_compressed_") as tmp:
+        variants = [("plain", None, None)]
+        for fmt in args.formats:
+            variants.append((fmt, fmt, "plain"))
+            if fmt != "bz2":
+                variants.append((f"{fmt}-seekable", fmt, "seekable"))
+        for name, fmt, kind in variants:
+            if fmt is None:
+                copies, dt = files, 0.0
+            else:
+                folder = Path(tmp) / name
+                folder.mkdir()
+                copies = [folder / f"{i:03d}_{f.name}.{fmt}" for i, f in enumerate(files)]
+                t0 = time.perf_counter()
+                try:
+                    for f, c in zip(files, copies):
+                        if kind == "plain":
+                            _compress_plain(f, c, fmt)
+                        else:
+                            compress(f, fmt, c, frame_size=int(args.frame_size * 2 ** 20))
+                except ImportError as e:
+                    print(f"{name:<14} skipped: {e}")
+                    continue
+                dt = time.perf_counter() - t0
+            size = sum(c.stat().st_size for c in copies)
+            seekable = "-" if fmt is None else f"{sum(seek_table(c) is not None for c in copies)}/{len(copies)}"
+            row = f"{name:<14} {size / 1e6:>7.1f} {total / size:>5.1f}x {dt:>8.2f} {seekable:>8}"
+            for parser in args.parsers:
+                r = suite_measure(HERE, parser, copies, args.repeat)
+                if "skipped" in r:
+                    row += f" {'skipped':>13} {'':>5}"
+                    continue
+                best = r["phases"]["best_pass_s"]
+                base.setdefault(parser, best)
+                row += f" {best:>13.3f} {best / base[parser]:>5.1f}"
+            print(row)
+
+def build_corpus(dest: Path, n: int, source: Path = DATA_DIR) -> List[Path]:
+    """Fill dest with n uniquely named symlinks cycling over the real DATA/ logs."""
+    logs = sorted(p.resolve() for p in source.rglob("*.log") if p.is_file())
+    if not logs:
+        raise SystemExit(f"No .log files under {source}")
+    out = []
+    for i in range(n):
+        src = logs[i % len(logs)]
+        link = dest / f"{i:06d}_{src.name}"
+        os.symlink(src, link)
+        out.append(link)
+    return out
+
+def run_jobs(args) -> None:
+    import tddft_parser
+
+    with tempfile.TemporaryDirectory(prefix="pet_bench_") as tmp:
+        corpus = Path(tmp) / "corpus"
+        corpus.mkdir()
+        build_corpus(corpus, args.corpus)
+        print(f"Synthetic corpus: {args.corpus} logs (cpu_count={os.cpu_count()})")
+        print(f"{'workers':>7} {'wall(s)':>9} {'files/s':>9} {'speedup':>8}")
+        base = None
+        for n in args.workers:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                # no parse cache: every worker count parses the whole corpus
+                tddft_parser.run([str(corpus)], output=str(Path(tmp) / f"out_{n}.csv"), jobs=n, use_cache=False)
+            dt = time.perf_counter() - t0
+            base = base or dt
+            print(f"{n:>7} {dt:>9.2f} {args.corpus / dt:>9.1f} {base / dt:>8.2f}")
+
+# Per-line matching work done by the parsers before log_scanner existed, kept
+# as the reference for the dispatch micro-benchmark.
+def _legacy_tddft_lines(lines: List[str]) -> int:
+    from log_scanner import EXCITED_HEADER_RE, OPTIM_FLAG_RE
+    n = 0
+    for ln in lines:
+        if EXCITED_HEADER_RE.search(ln):
+            n += 1
+    for ln in lines:
+        if EXCITED_HEADER_RE.search(ln):
+            continue
+        if OPTIM_FLAG_RE.search(ln):
+            n += 1
+    return n
+
+def _legacy_extract_lines(lines: List[str]) -> int:
+    import re
+    n = 0
+    for line in lines:
+        if "SCF Done:" in line and re.search(r"SCF Done:.*=\s*([-+]?\d+\.\d+)", line):
+            n += 1
+        if "Total Energy, E(TD-HF/TD-DFT)" in line and re.search(r"=\s*([-+]?\d+\.\d+)", line):
+            n += 1
+        if "Total energy after correction" in line and re.search(r"correction\s*=?\s*([-+]?\d+\.\d+)", line):
+            n += 1
+        if "Excited State" in line and "f=" in line and re.search(r"Excited State\s+(\d+):", line):
+            n += 1
+        if "This state for optimization" in line:
+            n += 1
+    n += any("imaginary frequencies (negative Signs)" in l for l in lines)
+    for line in lines:
+        if "Low frequencies ---" in line:
+            n += 1
+    return n
+
+def run_dispatch(args) -> None:
+    from log_scanner import scan_lines
+    import extract_all_results
+    import tddft_parser
+
+    td_kinds = (tddft_parser.Route, tddft_parser.ExcitedState, tddft_parser.Transition,
+                tddft_parser.OptFlag, tddft_parser.TdEnergy)
+    cases = [
+        ("legacy tddft regex passes", _legacy_tddft_lines),
+        ("scanner, tddft_parser kinds", lambda ls: sum(1 for _ in scan_lines(ls, td_kinds))),
+        ("legacy extract cascade", _legacy_extract_lines),
+        ("scanner, extract kinds", lambda ls: sum(1 for _ in scan_lines(ls, extract_all_results.SCAN_EVENTS))),
+        ("scanner, all events", lambda ls: sum(1 for _ in scan_lines(ls))),
+    ]
+    files = [Path(f) for f in args.files] if args.files else \
+        [p for p in largest_logs(DATA_DIR, 50) if p.name.startswith("04")][:args.n]
+    for f in files:
+        with open(f, "r", encoding="utf-8", errors="ignore") as fh:
+            lines = fh.readlines()
+        print(f"{f.name} ({len(lines)} lines, matching only - lines already in memory)")
+        for label, fn in cases:
+            best = min(_timed(fn, lines) for _ in range(args.repeat))
+            print(f"  {label:<30} {best * 1e3:>8.1f} ms {len(lines) / best / 1e6:>8.2f} Mlines/s")
+
+def _tiled_transitions(n_states: int):
+    """(state_row, src, dst, coeff, homo) for n_states, cycling over the real DATA/ states."""
+    import numpy as np
+    from state_table import build_table
+    from tddft_parser import gather_files
+    from transition_analysis import homo_index_from_log
+
+    files = gather_files([str(DATA_DIR)])
+    table = build_table(files)
+    homo_file = np.array([homo_index_from_log(f) or 0 for f in files])
+    base = len(table.states)
+    reps = -(-n_states // base)
+    t = table.transitions
+    state_row = (t["state_row"][None, :] + base * np.arange(reps)[:, None]).ravel()
+    keep = state_row < n_states
+    homo = np.tile(homo_file[table.states["file_id"]], reps)[:n_states]
+    return (state_row[keep], np.tile(t["src"], reps)[keep], np.tile(t["dst"], reps)[keep],
+            np.tile(t["coeff"], reps)[keep], homo)
+
+def run_transitions(args) -> None:
+    import numpy as np
+    from calc_dct import get_label
+    from tddft_parser import rank_transitions
+    from transition_analysis import analyse
+
+    state_row, src, dst, coeff, homo = _tiled_transitions(args.states)
+    print(f"{args.states} states, {len(state_row)} transitions (top {args.top}, threshold {args.threshold})")
+
+    # Reference: per-state lists, as tddft_parser/calc_dct do it
+    bounds = np.searchsorted(state_row, np.arange(args.states + 1))
+    per_state = [list(zip(src[a:b].tolist(), dst[a:b].tolist(), coeff[a:b].tolist()))
+                 for a, b in zip(bounds[:-1], bounds[1:])]
+    homo_list = homo.tolist()
+    t0 = time.perf_counter()
+    for trans, h in zip(per_state, homo_list):
+        rank_transitions(trans, args.threshold, args.top)
+        top = sorted(trans, key=lambda t: abs(t[2]), reverse=True)[:args.top]
+        [(f"{get_label(a, h)}->{get_label(b, h)}", 2 * c * c) for a, b, c in top]
+    loop = time.perf_counter() - t0
+
+    best = min(_timed(lambda _: analyse(state_row, src, dst, coeff, args.states,
+                                        threshold=args.threshold, topk=args.top, homo=homo), None)
+               for _ in range(args.repeat))
+    print(f"  {'python loop per state':<30} {loop:>8.3f} s {args.states / loop / 1e6:>8.2f} Mstates/s")
+    print(f"  {'analyse() vectorised':<30} {best:>8.3f} s {args.states / best / 1e6:>8.2f} Mstates/s "
+          f"({loop / best:.1f}x)")
+
+def run_lambda(args) -> None:
+    import glob
+    from calc_dct import parse_log_last_geometry
+    from lambda_engine import LambdaCalculator
+
+    files = sorted(f for p in (args.files or ["*.fchk"]) for f in glob.glob(p))
+    print(f"{'file':<40} {'states':>6} {'setup(s)':>9} {'overlaps(s)':>11} {'native(s)':>10} {'multiwfn(s)':>11}")
+    for f in files:
+        base = os.path.splitext(f)[0]
+        log = next((base + ext for ext in (".log", ".out") if os.path.exists(base + ext)), None)
+        if log is None:
+            continue
+        states = {d["state"]: d["trans"] for d in parse_log_last_geometry(log, None)[0]}
+        t0 = time.perf_counter()
+        calc = LambdaCalculator(f)
+        t1 = time.perf_counter()
+        calc.lambdas(states)
+        t2 = time.perf_counter()
+        ext = "skipped"
+        if args.multiwfn:
+            from multiwfn_pool import multiwfn_lambda_batch
+            t3 = time.perf_counter()
+            for s in states:
+                multiwfn_lambda_batch(args.multiwfn, [(f, [s])], jobs=1)
+            ext = f"{time.perf_counter() - t3:.2f}"
+        print(f"{Path(f).name[:40]:<40} {len(states):>6} {t1 - t0:>9.2f} {t2 - t1:>11.2f} {t2 - t0:>10.2f} {ext:>11}")
+
+def run_multiwfn(args) -> None:
+    from multiwfn_pool import multiwfn_dct_batch
+
+    exe = args.multiwfn or str(HERE / "multiwfn_stub.py")
+    if not args.multiwfn:
+        os.environ["MULTIWFN_STUB_DELAY"] = str(args.delay)
+    pairs = [(s, (70 + s, 74 + s)) for s in range(1, args.states + 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        fchks = []
+        for i in range(args.files):
+            p = Path(tmp) / f"scan_{i:03d}.fchk"
+            p.touch()
+            fchks.append(p)
+        print(f"{args.files} files x {args.states} states, {Path(exe).name}"
+              + ("" if args.multiwfn else f" (delay {args.delay:g} s/session)"))
+        t0 = time.perf_counter()
+        for f in fchks[:max(1, args.files // 10)]:
+            for s, pair in pairs:
+                multiwfn_dct_batch(exe, [(f, [(s, pair)])], jobs=1)
+        per_state = (time.perf_counter() - t0) / max(1, args.files // 10)
+        print(f"  {'one process per state':<24} {per_state * args.files:>8.2f} s (extrapolated)")
+        for w in args.workers:
+            t0 = time.perf_counter()
+            results = multiwfn_dct_batch(exe, [(f, pairs) for f in fchks], jobs=w)
+            dt = time.perf_counter() - t0
+            errors = sum(1 for _, err in results if err)
+            print(f"  {f'sessions, jobs={w}':<24} {dt:>8.2f} s {args.files / dt:>8.1f} files/s"
+                  + (f"  ({errors} errors)" if errors else ""))
+
+def run_ensemble(args) -> None:
+    import numpy as np
+    from xyz_ensemble import Ensemble, dedup, read_ensemble
+
+    src = Path(args.xyz) if args.xyz else next(DATA_DIR.rglob("*.finalensemble.xyz"))
+    t0 = time.perf_counter()
+    base = read_ensemble(src)
+    print(f"{src.name}: {len(base)} frames x {len(base.symbols)} atoms, read in {time.perf_counter() - t0:.3f} s")
+    rng = np.random.default_rng(0)
+    for n in args.frames:
+        # copies of the real conformers with small coordinate noise: mostly duplicates
+        reps = -(-n // len(base))
+        coords = np.repeat(base.coords, reps, axis=0)[:n]
+        coords = coords + rng.normal(scale=args.noise, size=coords.shape)
+        energies = np.repeat(base.energies, reps)[:n] + rng.normal(scale=1e-6, size=n)
+        ens = Ensemble(base.symbols, coords, energies, [""] * n)
+        t0 = time.perf_counter()
+        keep = dedup(ens, args.rmsd)
+        dt = time.perf_counter() - t0
+        print(f"  {n:>8} frames -> {len(keep):>6} unique  {dt:>8.2f} s {n / dt:>10.0f} frames/s")
+
+def import_profile(argv: List[str]) -> Dict[str, float]:
+    """Module -> self import time (ms) of one interpreter run, from -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *argv], capture_output=True, text=True, cwd=HERE)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_us, _, name = line[len("import time:"):].split("|")
+            if self_us.strip().isdigit():
+                times[name.strip()] = int(self_us) / 1000
+    return times
+
+def command_startup(cmd: str) -> Tuple[float, List[str], Dict[str, float]]:
+    """Import time (ms), heavy packages imported and per-module times of `pet <cmd> --help`
+    ("" for `pet --help`)."""
+    from pet import HEAVY_MODULES
+
+    times = import_profile([str(HERE / "pet.py"), *([cmd] if cmd else []), "--help"])
+    heavy = sorted({name.split(".")[0] for name in times} & set(HEAVY_MODULES))
+    return sum(times.values()), heavy, times
+
+def run_startup(args) -> None:
+    from pet import COMMANDS, HEAVY_MODULES, LIGHT_COMMANDS, STARTUP_BUDGET_MS
+
+    budget = args.budget if args.budget is not None else STARTUP_BUDGET_MS
+    failed = []
+    print(f"{'Command':<12} {'Imports (ms)':>12} {'Wall (ms)':>10}  Heavy modules")
+    for cmd in [""] + (args.commands or list(COMMANDS)):
+        t0 = time.perf_counter()
+        total, heavy, times = command_startup(cmd)
+        wall = (time.perf_counter() - t0) * 1000
+        light = not cmd or cmd in LIGHT_COMMANDS
+        bad = light and (total > budget or heavy)
+        if bad:
+            failed.append(cmd or "pet")
+        print(f"{cmd or '(pet)':<12} {total:>12.1f} {wall:>10.1f}  {', '.join(heavy) or '-'}"
+              + ("  OVER BUDGET" if bad else ""))
+        if args.top:
+            for name, ms in sorted(times.items(), key=lambda kv: -kv[1])[:args.top]:
+                print(f"{'':<14}{ms:>8.1f}  {name}")
+    print(f"\nBudget for pet --help and {', '.join(LIGHT_COMMANDS)}: {budget:g} ms of imports, "
+          f"none of {', '.join(HEAVY_MODULES)}")
+    if failed and args.check:
+        sys.exit(f"Start-up budget exceeded: {', '.join(failed)}")
+
+def _timed(fn, lines) -> float:
+    t0 = time.perf_counter()
+    fn(lines)
+    return time.perf_counter() - t0
+
+
+def cli(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "_child":
+        _child(argv[1], argv[2], argv[3], int(argv[4]))
+        return
+    if argv and argv[0] == "_suite_child":
+        _suite_child(argv[1], argv[2], argv[3], int(argv[4]))
+        return
+
+    ap = argparse.ArgumentParser(description="Benchmarks for the Gaussian log parsers.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sp = sub.add_parser("scanner", help="Per-file wall time and peak RSS of each parser.")
+    sp.add_argument("files", nargs="*", help="Logs to time. Default: the largest logs under DATA/.")
+    sp.add_argument("-n", type=int, default=3, help="How many of the largest DATA/ logs to use.")
+    sp.add_argument("--parsers", nargs="+", default=list(PARSERS), choices=list(PARSERS))
+    sp.add_argument("--repeat", type=int, default=3, help="Best-of-N wall time.")
+    sp.add_argument("--legacy-dir", type=str, default=None, help="Older copy of scripts/ to compare against.")
+    sp.set_defaults(func=run_scanner)
+
+    sp = sub.add_parser("jobs", help="Scaling of tddft_parser.run --jobs on a synthetic corpus.")
+    sp.add_argument("--corpus", type=int, default=2000, help="Number of logs in the synthetic corpus.")
+    sp.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    sp.set_defaults(func=run_jobs)
+
+    sp = sub.add_parser("dispatch", help="Lines/s of the scanner's line matcher vs the old regex cascades.")
+    sp.add_argument("files", nargs="*", help="Logs to use. Default: the largest 04* logs under DATA/.")
+    sp.add_argument("-n", type=int, default=3, help="How many 04* logs to use.")
+    sp.add_argument("--repeat", type=int, default=5, help="Best-of-N.")
+    sp.set_defaults(func=run_dispatch)
+
+    sp = sub.add_parser("transitions", help="Batched transition_analysis.analyse() vs the per-state Python loop.")
+    sp.add_argument("--states", type=int, default=200000, help="Number of states (DATA/ states tiled).")
+    sp.add_argument("--top", type=int, default=3)
+    sp.add_argument("--threshold", type=float, default=0.30)
+    sp.add_argument("--repeat", type=int, default=3, help="Best-of-N for the vectorised call.")
+    sp.set_defaults(func=run_transitions)
+
+    sp = sub.add_parser("lambda", help="Native Lambda (grid + overlaps + all states) vs one Multiwfn run per state.")
+    sp.add_argument("files", nargs="*", help="fchk files (with matching .log). Default: *.fchk here.")
+    sp.add_argument("--multiwfn", type=str, default=None, help="Multiwfn executable for the subprocess timing.")
+    sp.set_defaults(func=run_lambda)
+
+    sp = sub.add_parser("multiwfn", help="multiwfn_pool sessions vs one Multiwfn process per state.")
+    sp.add_argument("--files", type=int, default=100, help="Number of (empty) fchk files in the scan folder.")
+    sp.add_argument("--states", type=int, default=3, help="States (orbital pairs) per file.")
+    sp.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    sp.add_argument("--delay", type=float, default=0.2, help="Stub start-up delay per session, seconds.")
+    sp.add_argument("--multiwfn", type=str, default=None, help="Real Multiwfn instead of multiwfn_stub.py.")
+    sp.set_defaults(func=run_multiwfn)
+
+    sp = sub.add_parser("ensemble", help="xyz_ensemble.dedup() on ensembles tiled from a GOAT ensemble.")
+    sp.add_argument("--xyz", type=str, default=None, help="Source ensemble. Default: the first *.finalensemble.xyz in DATA/.")
+    sp.add_argument("--frames", type=int, nargs="+", default=[10000, 100000])
+    sp.add_argument("--noise", type=float, default=0.01, help="Coordinate noise of the copies, Angstrom.")
+    sp.add_argument("--rmsd", type=float, default=0.125)
+    sp.set_defaults(func=run_ensemble)
+
+    sp = sub.add_parser("suite", help="Every parser over the DATA/ corpus: phases, MB/s, files/s, peak RSS; JSON output.")
+    sp.add_argument("--files", nargs="+", default=None, help="Logs to use. Default: every .log under DATA/.")
+    sp.add_argument("--parsers", nargs="+", default=list(PARSERS), choices=list(PARSERS))
+    sp.add_argument("--repeat", type=int, default=3, help="Parse passes; throughput is taken from the best.")
+    sp.add_argument("--json", type=str, default=None, help="Write the results to this JSON file.")
+    sp.add_argument("--compare", type=str, default=None, help="Earlier suite JSON to compare the best passes with.")
+    sp.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                    help="Relative slow-down reported as a regression.")
+    sp.add_argument("--check", action="store_true", help="Exit non-zero when --compare finds a regression.")
+    sp.set_defaults(func=run_suite)
+
+    sp = sub.add_parser("scaling", help="Every parser on synthetic_log.py logs of growing size: time and peak RSS.")
+    sp.add_argument("--steps", type=int, nargs="+", default=[10, 100, 1000], help="Optimisation steps per log.")
+    sp.add_argument("--atoms", type=int, default=None, help="Atoms (default: as in the template).")
+    sp.add_argument("--states", type=int, default=None, help="Excited states per TD block.")
+    sp.add_argument("--transitions", type=int, default=None, help="Transitions per state.")
+    sp.add_argument("--parsers", nargs="+", default=list(PARSERS), choices=list(PARSERS))
+    sp.add_argument("--repeat", type=int, default=1)
+    sp.set_defaults(func=run_scaling)
+
+    sp = sub.add_parser("compressed", help="Parsers on .gz/.bz2/.xz/.zst copies of the corpus (with and without seek tables) vs plain.")
+    sp.add_argument("--files", nargs="+", default=None, help="Logs to use. Default: every .log under DATA/.")
+    sp.add_argument("--formats", nargs="+", default=["gz", "bz2", "xz", "zst"], choices=["gz", "bz2", "xz", "zst"])
+    sp.add_argument("--parsers", nargs="+", default=["tddft", "freq", "geometry"], choices=list(PARSERS))
+    sp.add_argument("--frame-size", type=float, default=1.0, help="MiB per frame of the seekable .xz/.zst copies.")
+    sp.add_argument("--repeat", type=int, default=3)
+    sp.set_defaults(func=run_compressed)
+
+    sp = sub.add_parser("startup", help="Import time of each pet.py subcommand (-X importtime of '<command> --help').")
+    sp.add_argument("commands", nargs="*", help="Subcommands to measure. Default: all.")
+    sp.add_argument("--budget", type=float, default=None, help="Import budget in ms. Default: pet.STARTUP_BUDGET_MS.")
+    sp.add_argument("--top", type=int, default=0, help="Also list the N slowest imports of each command.")
+    sp.add_argument("--check", action="store_true", help="Exit non-zero when a light command is over budget.")
+    sp.set_defaults(func=run_startup)
+
+    args = ap.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    cli()
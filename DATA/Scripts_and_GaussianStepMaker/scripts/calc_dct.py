@@ -1,23 +1,32 @@
+import argparse
 import os
-import subprocess
 import glob
-import pandas as pd
 import sys
 
+from compressed_log import find_log
+from dct_engine import dct_batch
+from fchk_reader import read_homo_index
+from log_index import load_index
+from log_scanner import ExcitedState, OptFlag, Transition, scan_lines
+from multiwfn_pool import dct_script, multiwfn_dct_batch
+from parse_cache import ParseCache
+from parse_profile import NO_PROFILE, Profile, add_profile_argument
+from result_store import ResultStore, memoised_batch
+
 # ================= USER CONFIGURATION =================
 MULTIWFN_PATH = r"C:\Users\Admin\Downloads\Multiwfn_3.8_dev_bin_Win64\Multiwfn_3.8_dev_bin_Win64\Multiwfn.exe"
 STATES_TO_CHECK = 3
+DCT_ENGINE = "multiwfn"    # "multiwfn": one Multiwfn session per file; "native": computed here from the fchk basis/MOs
+                           # (not yet compared with Multiwfn on the published BODIPY values)
+DCT_MODE = "orbitals"      # "orbitals": dominant pair (as Multiwfn 100 -> 11); "hole-electron": all transitions of the state
+JOBS = 1                   # worker processes for the native engine
+MULTIWFN_JOBS = None       # concurrent Multiwfn sessions (None: one per CPU core)
+MULTIWFN_TIMEOUT = 600     # seconds per Multiwfn session; timed-out sessions are retried once
 # ======================================================
 
-def get_homo_index(fchk_path):
-    try:
-        with open(fchk_path, 'r') as f:
-            for line in f:
-                if "Number of alpha electrons" in line:
-                    return int(line.split()[-1])
-    except:
-        return None
-    return None
+def get_homo_index(fchk_path, sidecar=True):
+    # Header scan only (kept in the fchk's binary sidecar unless caching is off); the MO arrays are not parsed
+    return read_homo_index(fchk_path, sidecar=sidecar)
 
 def get_label(orb_idx, homo_idx):
     diff = orb_idx - homo_idx
@@ -27,57 +36,41 @@ def get_label(orb_idx, homo_idx):
     if diff > 1: return f"L+{diff-1}"
     return str(orb_idx)
 
-def parse_log_last_geometry(log_path, max_states):
+def parse_log_last_geometry(log_path, max_states, cache=None, prof=NO_PROFILE):
     if not os.path.exists(log_path): return [], None
 
-    with open(log_path, 'r') as f:
-        content = f.read()
-
-    # Split by TD-DFT header to get steps
-    blocks = content.split("Excitation energies and oscillator strengths")
-    if len(blocks) < 2: return [], None
-    
-    # Take ONLY the last block (Final Geometry)
-    final_block = blocks[-1]
-    lines = final_block.splitlines()
+    # Jump straight to the last 'Excitation energies and oscillator strengths'
+    # block (Final Geometry) through the byte-offset index; only it is decoded
+    index = load_index(log_path, cache)
+    if index.count("td_block") == 0: return [], None
 
     states_data = []
-    opt_state = None 
-    
+    opt_state = None
     current_state_info = None
     current_max_coeff = 0.0
-    
-    for line in lines:
-        if "This state for optimization" in line and current_state_info:
-            opt_state = current_state_info['state']
 
-        if "Excited State" in line:
+    for ev in prof.events(scan_lines(index.block_lines("td_block", -1), (ExcitedState, Transition, OptFlag))):
+        kind = type(ev)
+        if kind is ExcitedState:
             if current_state_info: states_data.append(current_state_info)
-            try:
-                parts = line.split()
-                state_idx = int(parts[2].replace(":", ""))
-                f_val = float(line.split("f=")[1].strip().split()[0])
-                current_state_info = {'state': state_idx, 'f': f_val, 'pair': None}
-                current_max_coeff = 0.0
-            except:
-                current_state_info = None
-
-        if current_state_info and "->" in line:
-            try:
-                t_parts = line.split()
-                start = int(t_parts[0])
-                end = int(t_parts[2])
-                coeff = abs(float(t_parts[3]))
-                if coeff > current_max_coeff:
-                    current_max_coeff = coeff
-                    current_state_info['pair'] = (start, end)
-            except:
-                pass
+            current_state_info = {'state': ev.state, 'f': ev.fosc, 'pair': None, 'trans': []}
+            current_max_coeff = 0.0
+
+        elif kind is Transition:
+            if current_state_info: current_state_info['trans'].append((ev.src, ev.dst, ev.coeff))
+            if current_state_info and abs(ev.coeff) > current_max_coeff:
+                current_max_coeff = abs(ev.coeff)
+                current_state_info['pair'] = (ev.src, ev.dst)
+
+        elif kind is OptFlag:
+            if current_state_info:
+                opt_state = current_state_info['state']
 
     if current_state_info: states_data.append(current_state_info)
     return states_data, opt_state
 
-def run_calculation():
+def run_calculation(use_cache=True, profile=None):
+    prof = Profile("dct", profile, reset=True) if profile else NO_PROFILE
     fchk_files = sorted(glob.glob("*.fchk"))
     if not fchk_files:
         print("No .fchk files found!")
@@ -94,44 +87,64 @@ def run_calculation():
     summary_rows = []
 
     # --- 1. DATA COLLECTION ---
+    # Log indexes are kept in the parse cache, so unchanged logs are not re-indexed
+    cache = ParseCache(enabled=use_cache)
+    work = []
     for file in fchk_files:
         base = os.path.splitext(file)[0]
-        log_file = base + ".log"
-        if not os.path.exists(log_file): log_file = base + ".out"
+        log_file = find_log(base) or base + ".log"
         
-        homo_idx = get_homo_index(file)
+        with prof.stage("homo", file):
+            homo_idx = get_homo_index(file, sidecar=use_cache)
         if not homo_idx: continue
 
-        states_list, opt_state = parse_log_last_geometry(log_file, STATES_TO_CHECK)
+        with prof.stage("log", log_file):
+            states_list, opt_state = parse_log_last_geometry(log_file, STATES_TO_CHECK, cache, prof)
+        states_list = [d for d in states_list if d['state'] <= STATES_TO_CHECK and d['pair']]
         if not states_list: continue
+        work.append((file, homo_idx, states_list, opt_state))
+    cache.close()
 
-        for i, data in enumerate(states_list):
-            if data['state'] > STATES_TO_CHECK: continue
+    # --- 2. dCT: every state of every file in one batched call ---
+    # Values already in the results store (same fchk content and inputs) are not recomputed
+    store = ResultStore(enabled=use_cache)
+    sessions = {} if prof else None   # Multiwfn wall time per fchk, for --profile
+    with prof.stage("dct"):
+        if DCT_ENGINE == "native":
+            specs = [(file, [(d['state'], d['pair'], d['trans']) for d in states]) for file, _, states, _ in work]
+            dct_results = memoised_batch(
+                store, f"dct/native/{DCT_MODE}", specs,
+                lambda spec: repr(spec[2]) if DCT_MODE == "hole-electron" else repr(spec[1]),
+                lambda todo: dct_batch(todo, mode=DCT_MODE, jobs=JOBS))
+        else:
+            specs = [(file, [(d['state'], d['pair']) for d in states]) for file, _, states, _ in work]
+            dct_results = memoised_batch(
+                store, "dct/multiwfn", specs, lambda spec: "\n".join(dct_script([spec[1]])),
+                lambda todo: multiwfn_dct_batch(MULTIWFN_PATH, todo, jobs=MULTIWFN_JOBS, timeout=MULTIWFN_TIMEOUT,
+                                                timings=sessions))
+        for fchk, seconds in (sessions or {}).items():
+            prof.external("multiwfn", fchk, seconds)
+    store.close()
+
+    for n, (file, homo_idx, states_list, opt_state) in enumerate(work):
+        dists, err = dct_results[n]
+        if err:
+            print(f"Error: {err}")
+            print("-" * 100)
+            continue
 
+        for i, data in enumerate(states_list):
             s_idx = data['state']
             f_val = data['f']
-            pair = data['pair']
-            if not pair: continue
-
-            start, end = pair
+            start, end = data['pair']
             lbl_start = get_label(start, homo_idx)
             lbl_end = get_label(end, homo_idx)
             char_label = f"{lbl_start}->{lbl_end}"
             orb_input = f"{start},{end}"
 
-            # Multiwfn Calc
-            cmds = ["100", "11", orb_input, "n", "0,0", "0", "q"]
             try:
-                process = subprocess.run(
-                    [MULTIWFN_PATH, file],
-                    input="\n".join(cmds), text=True, capture_output=True,
-                    encoding='utf-8', errors='ignore'
-                )
-                dist = "---"
-                for line in process.stdout.splitlines():
-                    if "Centroid distance" in line:
-                        dist = float(line.split(":")[-1].strip().split()[0])
-                        break
+                dist = dists.get(s_idx)
+                dist = "---" if dist is None else round(dist, 6)
                 
                 is_interest = (s_idx == opt_state)
                 interest_marker = "YES" if is_interest else ""
@@ -158,7 +171,16 @@ def run_calculation():
                 print(f"Error: {e}")
         print("-" * 100)
 
+    print(store.summary())
+
+    with prof.stage("excel"):
+        save_excel(all_data_rows, summary_rows)
+    if prof:
+        print(prof.summary())
+
+def save_excel(all_data_rows, summary_rows):
     # --- 2. EXCEL SAVING AND MERGING ---
+    import pandas as pd
     output_file = "results_opt_merged.xlsx"
     df_all = pd.DataFrame(all_data_rows)
     df_summary = pd.DataFrame(summary_rows)
@@ -223,5 +245,13 @@ def run_calculation():
         print(f"\nError creating Excel: {e}")
         df_all.drop(columns=["is_bold"]).to_csv("results_backup.csv", index=False)
 
+def cli():
+    ap = argparse.ArgumentParser(description="Charge-transfer distance (dCT) of the excited states of every .fchk/.log pair here "
+                                             "(settings: USER CONFIGURATION above).")
+    ap.add_argument("--no-cache", action="store_true", help="Recompute every file instead of reusing stored results.")
+    add_profile_argument(ap, "dct")
+    args = ap.parse_args()
+    run_calculation(use_cache=not args.no_cache, profile=args.profile)
+
 if __name__ == "__main__":
-    run_calculation()
+    cli()
@@ -1,123 +1,121 @@
+import argparse
 import os
-import subprocess
 import glob
 import csv
-import matplotlib.pyplot as plt
+
+from calc_dct import parse_log_last_geometry
+from compressed_log import find_log
+from lambda_engine import lambda_batch
+from multiwfn_pool import lambda_script, multiwfn_lambda_batch
+from result_store import ResultStore, memoised_batch
 
 # ================= USER CONFIGURATION =================
 # CRITICAL: Replace the path below with the actual location of Multiwfn.exe
-# Double check this path! It must end in .exe
+# Double check this path! It must end in .exe  (only needed with LAMBDA_ENGINE = "multiwfn")
 MULTIWFN_PATH = r"C:\Users\Admin\Downloads\Multiwfn_3.8_dev_bin_Win64\Multiwfn_3.8_dev_bin_Win64\Multiwfn.exe"
+LAMBDA_ENGINE = "multiwfn" # "multiwfn": one Multiwfn session per state; "native": computed here from the fchk + log
+                           # (not yet checked against Multiwfn on the DATA systems)
+LAMBDA_STATES = None       # None: every state of the last TD block; or a list such as [1]
+JOBS = 1                   # worker processes for the native engine
+MULTIWFN_JOBS = None       # concurrent Multiwfn sessions (None: one per CPU core)
+MULTIWFN_TIMEOUT = 600     # seconds per Multiwfn session; timed-out sessions are retried once
 # ======================================================
 
-def run_calculation():
+def run_calculation(use_cache=True):
     # 1. Find and SORT files
     fchk_files = sorted(glob.glob("*.fchk"))
-    
+
     if not fchk_files:
         print("No .fchk files found!")
         return
 
     print(f"Found {len(fchk_files)} files.")
     print("NOTE: Ensure your .log/.out files are in the same folder!")
-    print("-" * 60)
-
-    # 2. ASK USER FOR THE EXCITED STATE
-    # The script pauses here and waits for you to type a number
-    state_input = input(">> Enter the Excited State index you want to analyze (e.g. 1): ").strip()
-    
-    # Default to 1 if you just hit Enter
-    if not state_input:
-        state_idx = "1"
-        print("No input detected. Defaulting to State 1.")
-    else:
-        state_idx = state_input
-        print(f"Okay, calculating Lambda for State {state_idx}...")
+    print(f"States: {'all' if LAMBDA_STATES is None else LAMBDA_STATES} (engine: {LAMBDA_ENGINE})")
 
     print("\n" + "="*80)
-    print(f"{'Filename':<45} | {'Lambda':<10} | {'Status'}")
+    print(f"{'Filename':<45} | {'St':<2} | {'Lambda':<10} | {'Status'}")
     print("="*80)
 
-    results_data = []
-
-    # 3. Loop through all files
+    # 2. Pair every fchk with its log and read the transitions of the final TD block
+    work = []
     for file in fchk_files:
-        # Check for corresponding .log or .out file
         base_name = os.path.splitext(file)[0]
-        if os.path.exists(base_name + ".log"):
-            log_exists = True
-        elif os.path.exists(base_name + ".out"):
-            log_exists = True
-        else:
-            print(f"{file:<45} | {'---':<10} | FAIL: No .log/.out file")
+        log_file = find_log(base_name)
+        if log_file is None:
+            print(f"{file:<45} | {'':<2} | {'---':<10} | FAIL: No .log/.out file")
+            continue
+
+        states_list, _ = parse_log_last_geometry(log_file, None)
+        states = {d['state']: d['trans'] for d in states_list
+                  if LAMBDA_STATES is None or d['state'] in LAMBDA_STATES}
+        if not states:
+            print(f"{file:<45} | {'':<2} | {'---':<10} | FAIL: No excited states in log")
             continue
+        work.append((file, states))
+
+    # 3. Lambda for every state of every file (one overlap table per geometry);
+    #    values already in the results store (same fchk content and transitions) are reused
+    specs = [(file, list(states.items())) for file, states in work]
+    store = ResultStore(enabled=use_cache)
+    if LAMBDA_ENGINE == "native":
+        results = memoised_batch(
+            store, "lambda/native", specs, lambda spec: repr(spec[1]),
+            lambda todo: lambda_batch([(f, dict(sp)) for f, sp in todo], jobs=JOBS))
+    else:
+        results = memoised_batch(
+            store, "lambda/multiwfn", specs, lambda spec: "\n".join(lambda_script(spec[0])) + "\n" + repr(spec[1]),
+            lambda todo: multiwfn_lambda_batch(MULTIWFN_PATH, [(f, [s for s, _ in sp]) for f, sp in todo],
+                                               jobs=MULTIWFN_JOBS, timeout=MULTIWFN_TIMEOUT))
+    store.close()
 
-        # Prepare Multiwfn commands
-        input_commands = [
-            "18",           # Electron excitation analysis
-            "14",           # Calculate lambda index
-            "",             # Press ENTER to load the matching .log file
-            state_idx,      # <--- Uses the state YOU typed (e.g. 1)
-            "n",            # Print contributions? -> No
-            "n",            # Do analysis again? -> No
-            "0",            # Return
-            "q"             # Quit
-        ]
-        
-        input_str = "\n".join(input_commands)
-
-        try:
-            # Run Multiwfn
-            process = subprocess.run(
-                [MULTIWFN_PATH, file],
-                input=input_str, text=True, capture_output=True,
-                encoding='utf-8', errors='ignore'
-            )
-
-            # Extract Lambda Value
-            lambda_val = None
-            output_lines = process.stdout.splitlines()
-            
-            # Look for line: "Excited state 1: lambda = 0.683489"
-            for line in output_lines:
-                if "lambda =" in line:
-                    parts = line.split("=")
-                    lambda_val = float(parts[-1].strip())
-                    break
-            
+    results_data = []
+    for (file, states), (lambdas, err) in zip(work, results):
+        if err:
+            print(f"{file:<45} | {'':<2} | {'Error':<10} | {err}")
+            continue
+        for state_idx in states:
+            lambda_val = lambdas.get(state_idx)
             if lambda_val is not None:
-                print(f"{file:<45} | {lambda_val:<10.4f} | OK")
+                print(f"{file:<45} | {state_idx:<2} | {lambda_val:<10.4f} | OK")
                 results_data.append([file, state_idx, lambda_val])
             else:
-                print(f"{file:<45} | {'---':<10} | FAIL: Value not found")
-
-        except Exception as e:
-            print(f"{file:<45} | {'Error':<10} | {e}")
+                print(f"{file:<45} | {state_idx:<2} | {'---':<10} | FAIL: Value not found")
 
     # 4. Save to CSV
     csv_filename = "results_lambda.csv"
     with open(csv_filename, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(["Filename", "State", "Lambda"]) 
+        writer.writerow(["Filename", "State", "Lambda"])
         writer.writerows(results_data)
-    
+
     print("-" * 80)
     print(f"Data saved to: {csv_filename}")
+    print(store.summary())
 
-    # 5. Plot Results
+    # 5. Plot Results (one line per state along the scan)
     if results_data:
-        lambdas = [row[2] for row in results_data]
-        x_axis = range(1, len(lambdas) + 1)
-
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 6))
-        plt.plot(x_axis, lambdas, marker='s', linestyle='-', color='g') 
-        plt.title(f"Lambda Index (State {state_idx}) vs Scan Step")
+        for state_idx in sorted({row[1] for row in results_data}):
+            rows = [row for row in results_data if row[1] == state_idx]
+            steps = [fchk_files.index(row[0]) + 1 for row in rows]
+            plt.plot(steps, [row[2] for row in rows], marker='s', linestyle='-', label=f"State {state_idx}")
+        plt.title("Lambda Index vs Scan Step")
         plt.xlabel("Scan Step")
         plt.ylabel("Lambda Index")
+        plt.legend()
         plt.grid(True)
-        
+
         plt.savefig("lambda_plot.png")
         plt.show()
 
+def cli():
+    ap = argparse.ArgumentParser(description="Lambda overlap index of the excited states of every .fchk/.log pair here "
+                                             "(settings: USER CONFIGURATION above).")
+    ap.add_argument("--no-cache", action="store_true", help="Recompute every file instead of reusing stored results.")
+    args = ap.parse_args()
+    run_calculation(use_cache=not args.no_cache)
+
 if __name__ == "__main__":
-    run_calculation()
+    cli()
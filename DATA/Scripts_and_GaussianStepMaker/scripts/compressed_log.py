@@ -0,0 +1,551 @@
+"""
+Compressed Gaussian logs (.gz, .bz2, .xz, .zst) behind the log_scanner readers.
+
+Finished logs are often compressed in place to save quota. scan_log(),
+read_tail(), tail_lines(), rfind_bytes(), read_at() and log_index accept them
+as they are, so every parser does too:
+
+    for ev in scan_log("04BDP-NH2_m062x_def2SVP_ethanol.log.xz"):
+        ...
+
+Forward scans stream: the file is decompressed READ_CHUNK compressed bytes at
+a time (concatenated gzip members, bz2/xz streams and zstd frames follow each
+other, as with the command-line tools), so memory stays flat. Reads from the
+end or at an offset use a seek table when the file has one:
+
+    .gz   BGZF (bgzip, or `--format gz` here): each member header holds the
+          member's size, so the table is read by hopping from header to header
+    .xz   the index at the end of every xz stream; files with several blocks
+          (xz -T0, xz --block-size, or `--format xz` here) are decoded one
+          block at a time
+    .zst  the zstd seekable format (seek table in a trailing skippable frame),
+          as written by `--format zst`; .zst needs the zstandard package
+    .bz2  no index: always streamed
+
+Only the frames overlapping the requested bytes are decompressed, so the
+termination check of a 150 MB log decodes one frame instead of the file.
+Without a table (a plain `gzip`/`zstd` file, one xz block, any .bz2) a log of
+up to SMALL_BYTES compressed is decompressed once and its text kept for the
+next calls on the same file (a tail check, then a backward search, then a read
+at the offset found); larger ones are decompressed from the start by every
+call, keeping only the bytes it needs.
+
+    python compressed_log.py runs/*.log --format zst --remove   # seekable copies replace the logs
+    python compressed_log.py --info runs/*.log.*
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import struct
+from bisect import bisect_right
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+PathLike = Union[str, Path]
+
+LOG_SUFFIXES = (".log", ".out")
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+READ_CHUNK = 256 * 1024        # compressed bytes per read while streaming
+FRAME_SIZE = 1024 * 1024       # uncompressed bytes per .xz/.zst frame written by compress()
+BGZF_BLOCK = 0xff00            # uncompressed bytes per BGZF member (as bgzip)
+LEVELS = {"gz": 6, "bz2": 9, "xz": 6, "zst": 10}
+TABLE_CACHE = 64               # seek tables / sizes remembered per process
+SMALL_BYTES = 2 * 1024 * 1024  # compressed logs without a seek table up to this size are held decompressed
+
+BGZF_HEADER = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+BGZF_EOF = BGZF_HEADER + b"\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+XZ_CHECK_SIZES = (0, 4, 4, 4, 8, 8, 8, 16, 16, 16, 32, 32, 32, 64, 64, 64)
+XZ_LZMA2 = 0x21
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+
+
+# -- names -----------------------------------------------------------------------
+def compression(path: PathLike) -> Optional[str]:
+    """'gz', 'bz2', 'xz' or 'zst' from the file name; None for an uncompressed file."""
+    name = str(path).lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix[1:]
+    return None
+
+def strip_compression(path: PathLike) -> str:
+    """The name without its compression suffix ("a.log.xz" -> "a.log")."""
+    fmt = compression(path)
+    return str(path)[:-len(fmt) - 1] if fmt else str(path)
+
+def is_log_file(name: PathLike, suffixes: Sequence[str] = LOG_SUFFIXES) -> bool:
+    """True for a .log/.out name (or the given suffixes), compressed or not."""
+    return strip_compression(name).lower().endswith(tuple(suffixes))
+
+def unique_logs(paths: Iterable[PathLike]) -> list:
+    """One path per log, in first-seen order: a plain file wins over its compressed
+    copies ("a.log" over "a.log.gz"), then COMPRESSED_SUFFIXES order, as in find_log()."""
+    rank = {None: 0, **{s[1:]: i + 1 for i, s in enumerate(COMPRESSED_SUFFIXES)}}
+    best: Dict[str, PathLike] = {}
+    for p in paths:
+        key = strip_compression(p)
+        if key not in best or rank[compression(p)] < rank[compression(best[key])]:
+            best[key] = p
+    return list(best.values())
+
+def find_log(base: str, suffixes: Sequence[str] = LOG_SUFFIXES) -> Optional[str]:
+    """First existing base + suffix, plain before compressed (a.log, a.log.gz, ..., a.out, ...)."""
+    for suffix in suffixes:
+        for comp in ("",) + COMPRESSED_SUFFIXES:
+            if os.path.exists(base + suffix + comp):
+                return base + suffix + comp
+    return None
+
+
+# -- streaming ---------------------------------------------------------------------
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(".zst logs need the zstandard package (pip install zstandard)") from None
+    return zstandard
+
+def _decompressor(fmt: str):
+    if fmt == "gz":
+        import zlib
+        return zlib.decompressobj(zlib.MAX_WBITS | 16)
+    if fmt == "bz2":
+        import bz2
+        return bz2.BZ2Decompressor()
+    if fmt == "xz":
+        import lzma
+        return lzma.LZMADecompressor()
+    return _zstd().ZstdDecompressor().decompressobj()
+
+def iter_decompressed(path: PathLike) -> Iterator[bytes]:
+    """The decompressed bytes of the whole file, in pieces.
+
+    A new decompressor is started after each member/stream/frame, so
+    concatenated ones are read in order; a truncated last one ends the data.
+    """
+    fmt = compression(path)
+    with open(path, "rb") as f:
+        d, fresh = _decompressor(fmt), True
+        while True:
+            data = f.read(READ_CHUNK)
+            if not data:
+                return
+            while data:
+                if fresh and fmt == "xz":
+                    data = data.lstrip(b"\0")   # stream padding between .xz streams
+                    if not data:
+                        break
+                out = d.decompress(data)
+                fresh = False
+                if out:
+                    yield out
+                if not d.eof:
+                    break
+                data = d.unused_data
+                d, fresh = _decompressor(fmt), True
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only raw stream over iter_decompressed(); tell() is the decompressed position."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buf = memoryview(b"")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._buf:
+            self._buf = memoryview(next(self._chunks, b""))
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._chunks.close()
+        super().close()
+
+def open_stream(path: PathLike) -> BinaryIO:
+    """Binary, forward-only file object over the decompressed log."""
+    return io.BufferedReader(_ChunkReader(iter_decompressed(path)), 1024 * 1024)
+
+
+# -- seek tables ---------------------------------------------------------------------
+class Frame(NamedTuple):
+    offset: int        # compressed offset of the member / block / frame
+    size: int          # its compressed bytes (xz: unpadded block size)
+    raw_offset: int    # offset of its first decompressed byte
+    raw_size: int
+    check: int = 0     # xz: size of the block's integrity check
+
+class SeekTable(NamedTuple):
+    fmt: str
+    frames: List[Frame]
+    starts: List[int]  # raw_offset of every frame, for bisect
+    raw_size: int
+
+def _varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            return value, pos
+
+def _bgzf_frames(f: BinaryIO, size: int) -> Optional[List[Tuple[int, int, int, int]]]:
+    frames, pos = [], 0
+    while pos < size:
+        f.seek(pos)
+        head = f.read(18)
+        if len(head) < 18 or head[:4] != BGZF_HEADER[:4] or head[10:16] != BGZF_HEADER[10:16]:
+            return None    # not BGZF (plain gzip): no table
+        bsize = struct.unpack_from("<H", head, 16)[0] + 1
+        f.seek(pos + bsize - 4)
+        isize = struct.unpack("<I", f.read(4))[0]
+        if isize:
+            frames.append((pos, bsize, isize, 0))
+        pos += bsize
+    return frames
+
+def _xz_lzma2_dict(block_header: bytes) -> Optional[int]:
+    """Dictionary size of a block whose only filter is LZMA2; None for any other filter chain."""
+    flags = block_header[1]
+    if flags & 0x03:
+        return None        # more than one filter (BCJ, delta, ...)
+    pos = 2
+    if flags & 0x40:
+        _, pos = _varint(block_header, pos)
+    if flags & 0x80:
+        _, pos = _varint(block_header, pos)
+    fid, pos = _varint(block_header, pos)
+    nprops, pos = _varint(block_header, pos)
+    if fid != XZ_LZMA2 or nprops != 1:
+        return None
+    bits = block_header[pos] & 0x3F
+    return 0xFFFFFFFF if bits == 40 else (2 | (bits & 1)) << (bits // 2 + 11)
+
+def _xz_frames(f: BinaryIO, size: int) -> Optional[List[Tuple[int, int, int, int]]]:
+    streams, end = [], size
+    while end > 0:
+        f.seek(end - 12)
+        footer = f.read(12)
+        if len(footer) < 12:
+            return None
+        if footer[8:] == b"\0\0\0\0":
+            end -= 4       # stream padding
+            continue
+        if footer[10:] != b"YZ":
+            return None
+        index_size = (struct.unpack_from("<I", footer, 4)[0] + 1) * 4
+        check = XZ_CHECK_SIZES[footer[9] & 0x0F]
+        f.seek(end - 12 - index_size)
+        index = f.read(index_size)
+        if not index or index[0] != 0:
+            return None
+        n, pos = _varint(index, 1)
+        records = []
+        for _ in range(n):
+            unpadded, pos = _varint(index, pos)
+            usize, pos = _varint(index, pos)
+            records.append((unpadded, usize))
+        start = end - 12 - index_size - sum((u + 3) & ~3 for u, _ in records) - 12
+        f.seek(start)
+        if start < 0 or f.read(6) != XZ_MAGIC:
+            return None
+        blocks, pos = [], start + 12
+        for unpadded, usize in records:
+            blocks.append((pos, unpadded, usize, check))
+            pos += (unpadded + 3) & ~3
+        streams.append(blocks)
+        end = start
+    frames = [b for blocks in reversed(streams) for b in blocks]
+    if frames:
+        f.seek(frames[0][0])
+        head = f.read(1)
+        f.seek(frames[0][0])
+        if _xz_lzma2_dict(f.read((head[0] + 1) * 4)) is None:
+            return None
+    return frames
+
+def _zst_frames(f: BinaryIO, size: int) -> Optional[List[Tuple[int, int, int, int]]]:
+    if size < 17:
+        return None
+    f.seek(size - 9)
+    n, descriptor, magic = struct.unpack("<IBI", f.read(9))
+    if magic != ZSTD_SEEKABLE_MAGIC:
+        return None
+    entry = 12 if descriptor & 0x80 else 8
+    table = n * entry + 9
+    f.seek(size - table - 8)
+    skip_magic, frame_size = struct.unpack("<II", f.read(8))
+    if skip_magic != ZSTD_SKIPPABLE_MAGIC or frame_size != table:
+        return None
+    body = f.read(n * entry)
+    frames, pos = [], 0
+    for i in range(n):
+        csize, dsize = struct.unpack_from("<II", body, i * entry)
+        if dsize:
+            frames.append((pos, csize, dsize, 0))
+        pos += csize
+    return frames
+
+_FRAME_READERS = {"gz": _bgzf_frames, "xz": _xz_frames, "zst": _zst_frames}
+_tables: Dict[tuple, Optional[SeekTable]] = {}
+_sizes: Dict[tuple, int] = {}
+_small: Dict[tuple, bytes] = {}    # text of the last small log read without a table
+
+def _key(path: PathLike) -> tuple:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+def _remember(cache: dict, key: tuple, value):
+    if len(cache) >= TABLE_CACHE:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+    return value
+
+def seek_table(path: PathLike) -> Optional[SeekTable]:
+    """The file's seek table, or None when it has none (or only one frame, which is streamed)."""
+    fmt = compression(path)
+    if fmt not in _FRAME_READERS:
+        return None
+    key = _key(path)
+    if key in _tables:
+        return _tables[key]
+    with open(path, "rb") as f:
+        try:
+            found = _FRAME_READERS[fmt](f, key[1])
+        except (IndexError, struct.error):
+            found = None
+    table = None
+    if found and len(found) > 1:
+        frames, raw = [], 0
+        for offset, size, raw_size, check in found:
+            frames.append(Frame(offset, size, raw, raw_size, check))
+            raw += raw_size
+        table = SeekTable(fmt, frames, [fr.raw_offset for fr in frames], raw)
+    return _remember(_tables, key, table)
+
+def _small_text(path: PathLike) -> Optional[bytes]:
+    """Whole text of a compressed log of up to SMALL_BYTES (the last one asked for is kept)."""
+    key = _key(path)
+    if key[1] > SMALL_BYTES:
+        return None
+    if key not in _small:
+        _small.clear()
+        _small[key] = b"".join(iter_decompressed(path))
+    return _small[key]
+
+def _decode(fmt: str, f: BinaryIO, frame: Frame) -> bytes:
+    f.seek(frame.offset)
+    data = f.read(frame.size)
+    if fmt == "gz":
+        import zlib
+        return zlib.decompress(data, zlib.MAX_WBITS | 16)
+    if fmt == "xz":
+        import lzma
+        head = (data[0] + 1) * 4
+        filters = [{"id": lzma.FILTER_LZMA2, "dict_size": _xz_lzma2_dict(data[:head])}]
+        return lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=filters).decompress(
+            data[head:frame.size - frame.check])
+    return _zstd().ZstdDecompressor().decompressobj().decompress(data)
+
+
+# -- random access -----------------------------------------------------------------
+def raw_size(path: PathLike) -> int:
+    """Decompressed size: from the seek table, else by decompressing once (remembered per process)."""
+    table = seek_table(path)
+    if table is not None:
+        return table.raw_size
+    text = _small_text(path)
+    if text is not None:
+        return len(text)
+    key = _key(path)
+    if key not in _sizes:
+        _remember(_sizes, key, sum(len(chunk) for chunk in iter_decompressed(path)))
+    return _sizes[key]
+
+def read_range(path: PathLike, start: int, end: int) -> bytes:
+    """Decompressed bytes [start, end) (fewer at the end of the file)."""
+    if end <= start:
+        return b""
+    table = seek_table(path)
+    if table is not None:
+        first = max(0, bisect_right(table.starts, start) - 1)
+        parts = []
+        with open(path, "rb") as f:
+            for frame in table.frames[first:]:
+                if frame.raw_offset >= end:
+                    break
+                parts.append(_decode(table.fmt, f, frame))
+        return b"".join(parts)[start - table.frames[first].raw_offset:end - table.frames[first].raw_offset]
+    text = _small_text(path)
+    if text is not None:
+        return text[start:end]
+    out, pos = bytearray(), 0
+    with contextlib.closing(iter_decompressed(path)) as chunks:
+        for chunk in chunks:
+            if pos + len(chunk) > start:
+                out += chunk[max(0, start - pos):end - pos]
+            pos += len(chunk)
+            if pos >= end:
+                break
+    return bytes(out)
+
+def read_tail(path: PathLike, nbytes: int) -> bytes:
+    """The last nbytes decompressed bytes."""
+    table = seek_table(path)
+    if table is not None:
+        return read_range(path, max(0, table.raw_size - nbytes), table.raw_size)
+    text = _small_text(path)
+    if text is not None:
+        return text[len(text) - nbytes:] if nbytes else b""
+    buf = bytearray()
+    for chunk in iter_decompressed(path):
+        buf += chunk
+        if len(buf) > 2 * nbytes:
+            del buf[:-nbytes]
+    return bytes(buf[-nbytes:]) if nbytes else b""
+
+def rfind(path: PathLike, needle: bytes) -> int:
+    """Decompressed offset of the last occurrence of needle; -1 if absent."""
+    overlap = len(needle) - 1
+    table = seek_table(path)
+    if table is not None:
+        carry = b""
+        with open(path, "rb") as f:
+            for frame in reversed(table.frames):
+                buf = _decode(table.fmt, f, frame) + carry
+                pos = buf.rfind(needle)
+                if pos >= 0:
+                    return frame.raw_offset + pos
+                carry = buf[:overlap]
+        return -1
+    text = _small_text(path)
+    if text is not None:
+        return text.rfind(needle)
+    last, base, carry = -1, 0, b""
+    for chunk in iter_decompressed(path):
+        buf = carry + chunk
+        pos = buf.rfind(needle)
+        if pos >= 0:
+            last = base - len(carry) + pos
+        carry = buf[len(buf) - overlap:] if overlap else b""
+        base += len(chunk)
+    return last
+
+
+# -- writing -------------------------------------------------------------------------
+def _chunks(f: BinaryIO, size: int) -> Iterator[bytes]:
+    return iter(lambda: f.read(size), b"")
+
+def compress(src: PathLike, fmt: str, dest: Optional[PathLike] = None, level: Optional[int] = None,
+             frame_size: int = FRAME_SIZE) -> str:
+    """Write src compressed as fmt with a seek table (.gz BGZF, .xz blocks, .zst seekable; .bz2 streams)."""
+    dest = str(dest or f"{src}.{fmt}")
+    level = LEVELS[fmt] if level is None else level
+    tmp = dest + ".part"
+    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+        if fmt == "gz":
+            import zlib
+            for data in _chunks(fin, BGZF_BLOCK):
+                c = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+                body = c.compress(data) + c.flush()
+                fout.write(BGZF_HEADER + struct.pack("<H", len(body) + 25) + body
+                           + struct.pack("<II", zlib.crc32(data), len(data)))
+            fout.write(BGZF_EOF)
+        elif fmt == "xz":
+            import lzma
+            for data in _chunks(fin, frame_size):
+                fout.write(lzma.compress(data, preset=level))   # one stream per frame
+        elif fmt == "zst":
+            cctx = _zstd().ZstdCompressor(level=level)
+            sizes = []
+            for data in _chunks(fin, frame_size):
+                frame = cctx.compress(data)
+                fout.write(frame)
+                sizes.append((len(frame), len(data)))
+            table = b"".join(struct.pack("<II", c, d) for c, d in sizes)
+            table += struct.pack("<IBI", len(sizes), 0, ZSTD_SEEKABLE_MAGIC)
+            fout.write(struct.pack("<II", ZSTD_SKIPPABLE_MAGIC, len(table)) + table)
+        elif fmt == "bz2":
+            import bz2
+            c = bz2.BZ2Compressor(level)
+            for data in _chunks(fin, READ_CHUNK):
+                fout.write(c.compress(data))
+            fout.write(c.flush())
+        else:
+            raise ValueError(f"unknown compression {fmt!r}")
+    os.replace(tmp, dest)
+    return dest
+
+def _compress_job(args) -> Tuple[str, str, Optional[str]]:
+    """compress() one log and check the copy (size and tail); returns (src, dest, error)."""
+    src, fmt, level, frame_size, remove = args
+    try:
+        dest = compress(src, fmt, level=level, frame_size=frame_size)
+        size = os.path.getsize(src)
+        with open(src, "rb") as f:
+            f.seek(max(0, size - 4096))
+            tail = f.read()
+        if raw_size(dest) != size or read_tail(dest, 4096) != tail:
+            return src, dest, "verification failed; original kept"
+        if remove:
+            os.remove(src)
+        return src, dest, None
+    except (OSError, ImportError, ValueError) as e:
+        return src, "", str(e)
+
+def describe(path: PathLike) -> str:
+    table = seek_table(path)
+    size = os.path.getsize(path)
+    raw = raw_size(path)
+    frames = f"{len(table.frames)} frames, seekable" if table else "streamed (no seek table)"
+    return f"{str(path)[-50:]:<50} {size / 1e6:>9.2f} {raw / 1e6:>9.2f} {raw / max(size, 1):>6.1f}x  {frames}"
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Compress finished Gaussian logs with seek tables, or show how logs are compressed.")
+    ap.add_argument("files", nargs="+", help="Logs to compress (or, with --info, compressed logs to describe).")
+    ap.add_argument("--format", choices=sorted(LEVELS), default="zst",
+                    help="Compression (default zst; gz writes BGZF, readable by gzip and bgzip).")
+    ap.add_argument("--level", type=int, default=None, help="Compression level (default per format: %s)." % LEVELS)
+    ap.add_argument("--frame-size", type=float, default=FRAME_SIZE / 2 ** 20,
+                    help="MiB of log per .xz/.zst frame: smaller frames make tail reads cheaper.")
+    ap.add_argument("--remove", action="store_true", help="Delete each log once its compressed copy is verified.")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes (0 = all cores).")
+    ap.add_argument("--info", action="store_true", help="Only describe the given compressed logs.")
+    args = ap.parse_args()
+
+    if args.info:
+        print(f"{'File':<50} {'MB':>9} {'raw MB':>9} {'ratio':>7}  Seek table")
+        for path in args.files:
+            print(describe(path) if compression(path) else f"{path[-50:]:<50} not compressed")
+        return
+    work = [(f, args.format, args.level, int(args.frame_size * 2 ** 20), args.remove)
+            for f in args.files if not compression(f)]
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if jobs > 1 and len(work) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_compress_job, work))
+    else:
+        results = [_compress_job(w) for w in work]
+    for src, dest, err in results:
+        print(f"{src}: {err}" if err else describe(dest))
+
+if __name__ == "__main__":
+    cli()
@@ -3,29 +3,44 @@ Syed Ali Abbas Abedi
 
 """
 
-import os, glob, re
-import pandas as pd
+import argparse
+import csv
+import glob
+import re
+
+from compressed_log import is_log_file, strip_compression, unique_logs
+from log_scanner import ScfDone, scan_log
+
+# Only 'SCF Done:  E(<METHOD>) =' lines for this method are used; None accepts any method.
+METHOD = "UM062X"
+OUTPUT_CSV = "data.csv"
 
 def natsort_key(s):
     # splits "MOL_10.log" -> ["MOL_", 10, ".log"] for human ordering
     return [int(t) if t.isdigit() else t.lower() for t in re.split(r'(\d+)', s)]
 
-energy_last_list = []
-name_list = []
-
-files = sorted(glob.glob('*.log'), key=natsort_key)
-
-for fn in files:
-    with open(fn, errors='ignore') as f:
-        lines = f.readlines()
-    name_list.append(fn[:-4])
-    energy_all = []
-    for line in lines:
-        if 'SCF Done:  E(UM062X) =' in line:
-            words = line.split()
-            energy_all.append(float(words[4]))
-    # if no SCF line found, skip or set None
-    energy_last_list.append(energy_all[-1] if energy_all else None)
-
-df = pd.DataFrame({'Filename': name_list, 'Energy': energy_last_list})
-df.to_csv('data.csv', index=False)
+def last_scf_energy(filename, method=METHOD):
+    energy_last = None
+    for ev in scan_log(filename, (ScfDone,)):
+        if method is None or ev.method == method:
+            energy_last = ev.energy
+    # if no SCF line found, None
+    return energy_last
+
+def write_csv(rows, path=OUTPUT_CSV):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")   # as pandas wrote data.csv
+        writer.writerow(["Filename", "Energy"])
+        writer.writerows(rows)
+
+def main():
+    ap = argparse.ArgumentParser(description=f"Last SCF energy of every .log file here, written to {OUTPUT_CSV}.")
+    ap.add_argument("--method", default=METHOD, help="Functional in 'SCF Done:  E(<method>)'; 'any' accepts all.")
+    args = ap.parse_args()
+    method = None if args.method == "any" else args.method
+
+    files = sorted(unique_logs(f for f in glob.glob('*.log*') if is_log_file(f, (".log",))), key=natsort_key)
+    write_csv([(strip_compression(fn)[:-4], last_scf_energy(fn, method)) for fn in files])
+
+if __name__ == "__main__":
+    main()
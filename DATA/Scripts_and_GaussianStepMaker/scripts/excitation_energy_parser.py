@@ -2,11 +2,16 @@
 Syed Ali Abbas Abedi
 
 """
-import os
+import argparse
+import csv
 import glob
-import pandas as pd
 import re
 
+from compressed_log import is_log_file, strip_compression, unique_logs
+from log_scanner import TdEnergy, scan_log
+
+OUTPUT_CSV = "data.csv"
+
 def natural_key(filename):
     # Extract the number after first underscore, before next underscore
     # For example: 03FLIMBD_10_DMSO_... => 10 as int
@@ -17,31 +22,30 @@ def natural_key(filename):
         # If no number found, return a big number so it comes last
         return 1_000_000
 
-energy_last_list = []
-name_list = []
-
-files = glob.glob('*.log')
-
-# Sort files naturally by the number after first underscore
-files_sorted = sorted(files, key=natural_key)
-
-for filename in files_sorted:
-    with open(filename) as f:
-        lines = f.readlines()
-
-    energy_all = []
-    for line in lines:
-        if 'Total Energy, E(TD-HF/TD-DFT)' in line:
-            words = line.split()
-            if len(words) >= 5:
-                energy_all.append(words[4])
-
-    if energy_all:
-        name_list.append(filename[:-4])
-        energy_last_list.append(energy_all[-1])
-    else:
-        pass
-
-data = {'Filename': name_list, 'Energy': energy_last_list}
-df = pd.DataFrame(data=data)
-df.to_csv('data.csv', index=False)
+def last_td_energy(filename):
+    # Gaussian's own token (trailing zeros kept), as data.csv has always held it
+    energy_last = None
+    for ev in scan_log(filename, (TdEnergy,)):
+        energy_last = ev.text
+    return energy_last
+
+def main():
+    ap = argparse.ArgumentParser(description=f"Last TD-DFT total energy of every .log file here, written to {OUTPUT_CSV}.")
+    ap.parse_args()
+
+    # Sort files naturally by the number after first underscore
+    files_sorted = sorted(unique_logs(f for f in glob.glob('*.log*') if is_log_file(f, (".log",))), key=natural_key)
+
+    rows = []
+    for filename in files_sorted:
+        energy_last = last_td_energy(filename)
+        if energy_last is not None:
+            rows.append((strip_compression(filename)[:-4], energy_last))
+
+    with open(OUTPUT_CSV, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")   # as pandas wrote data.csv
+        writer.writerow(["Filename", "Energy"])
+        writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+import argparse
 import os
-import pandas as pd
 import re
 
-def extract_gaussian_data(file_path):
+from compressed_log import is_log_file, unique_logs
+from log_scanner import (
+    ClrEnergy, EndOfFile, ExcitedState, ImaginaryFreqs, LowFrequencies, OptFlag, Route,
+    ScfDone, TdEnergy, find_root_in_route, scan_log,
+)
+from parse_cache import ParseCache, add_cache_arguments
+from parse_profile import NO_PROFILE, Profile, add_profile_argument
+
+SCAN_EVENTS = (Route, ScfDone, TdEnergy, ClrEnergy, ExcitedState, OptFlag,
+               ImaginaryFreqs, LowFrequencies, EndOfFile)
+
+def extract_gaussian_data(file_path, prof=NO_PROFILE):
     filename = os.path.basename(file_path)
     
     # Initialize data dictionary
@@ -31,93 +42,65 @@ def extract_gaussian_data(file_path):
     last_tddft = None
     last_clr = None
 
+    negative_flag = False
+    freq_table_found = False
+    min_freq = 9999
+
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            
         # -------------------------------------------------------
-        # 1. PRE-SCAN: Check Route Card for "Root=N"
+        # 1. SINGLE STREAMING PASS OVER THE LOG
         # -------------------------------------------------------
-        # Sets a default target root based on user input keywords
-        for line in lines[:50]: 
-            if line.strip().startswith("#"):
-                root_match = re.search(r"root=(\d+)", line, re.IGNORECASE)
-                if root_match:
-                    data["Root"] = int(root_match.group(1))
-                    break
+        for ev in prof.events(scan_log(file_path, SCAN_EVENTS)):
+            kind = type(ev)
+
+            # --- Route Card "Root=N" sets the default target root ---
+            # (only honoured near the top of the file, as before)
+            if kind is Route:
+                if ev.lineno < 50:
+                    root = find_root_in_route(ev.text)
+                    if root is not None:
+                        data["Root"] = root
 
-        # -------------------------------------------------------
-        # 2. PARSE FILE LINE-BY-LINE
-        # -------------------------------------------------------
-        for i, line in enumerate(lines):
-            
             # --- Capture Energies ---
-            if "SCF Done:" in line:
-                try:
-                    match_scf = re.search(r"SCF Done:.*=\s*([-+]?\d+\.\d+)", line)
-                    if match_scf: last_scf = float(match_scf.group(1))
-                except: pass
-
-            if "Total Energy, E(TD-HF/TD-DFT)" in line:
-                try:
-                    match_td = re.search(r"=\s*([-+]?\d+\.\d+)", line)
-                    if match_td: last_tddft = float(match_td.group(1))
-                except: pass
-
-            if "Total energy after correction" in line:
-                try:
-                    match_clr = re.search(r"correction\s*=?\s*([-+]?\d+\.\d+)", line)
-                    if match_clr: last_clr = float(match_clr.group(1))
-                except: pass
+            elif kind is ScfDone:
+                last_scf = ev.energy
+            elif kind is TdEnergy:
+                last_tddft = ev.energy
+            elif kind is ClrEnergy:
+                last_clr = ev.energy
 
             # --- Capture Excited State Info ---
             # Format: " Excited State   3:      Singlet-A      2.2103 eV ... f=1.2340 "
-            if "Excited State" in line and "f=" in line:
-                try:
-                    # Extract Root Number
-                    root_match = re.search(r"Excited State\s+(\d+):", line)
-                    if root_match:
-                        current_root_idx = int(root_match.group(1))
-                    
-                    # Extract Oscillator Strength
-                    f_match = re.search(r"f=\s*(\d+\.\d+)", line)
-                    if f_match:
-                        current_root_f = float(f_match.group(1))
-
-                    # If this matches our expected Root, grab the 'f' value temporarily.
-                    # (This will be confirmed or overwritten if the 'Optimization' flag appears below)
-                    if current_root_idx == data["Root"]:
-                        data["Oscillator_Strength"] = current_root_f
-                        
-                except: pass
+            elif kind is ExcitedState:
+                current_root_idx = ev.state
+                current_root_f = ev.fosc
+                # If this matches our expected Root, grab the 'f' value temporarily.
+                # (This will be confirmed or overwritten if the 'Optimization' flag appears below)
+                if current_root_idx == data["Root"]:
+                    data["Oscillator_Strength"] = current_root_f
 
             # --- CHECK FOR OPTIMIZATION FLAG ---
             # This line confirms exactly which state Gaussian is tracking.
-            if "This state for optimization" in line:
+            elif kind is OptFlag:
                 data["Root"] = current_root_idx
                 data["Oscillator_Strength"] = current_root_f
 
-        # -------------------------------------------------------
-        # 3. CHECK TERMINATION & FREQUENCIES
-        # -------------------------------------------------------
-        if len(lines) > 0:
-            full_text = "".join(lines[-5:])
-            if "Normal termination" in full_text:
-                data["Termination"] = "Normal"
-        
-        # Frequency Check
-        negative_flag = any("imaginary frequencies (negative Signs)" in l for l in lines)
-        freq_table_found = False
-        min_freq = 9999
-        
-        for line in lines:
-            if "Low frequencies ---" in line:
+            # --- Frequencies ---
+            elif kind is ImaginaryFreqs:
+                negative_flag = True
+            elif kind is LowFrequencies:
                 freq_table_found = True
-                try:
-                    freqs = [float(x) for x in line.split()[3:]]
-                    if freqs: min_freq = min(min_freq, min(freqs))
-                except: pass
+                if ev.values:
+                    min_freq = min(min_freq, min(ev.values))
 
+            # --- Termination (last 5 lines of the file) ---
+            elif kind is EndOfFile:
+                if "Normal termination" in "".join(ev.tail):
+                    data["Termination"] = "Normal"
+
+        # -------------------------------------------------------
+        # 2. FREQUENCY STATUS
+        # -------------------------------------------------------
         if negative_flag or (freq_table_found and min_freq < 0):
             data["Freq_Status"] = "NEGATIVE FREQ"
         elif freq_table_found:
@@ -126,7 +109,7 @@ def extract_gaussian_data(file_path):
             data["Freq_Status"] = "No Freq Calc"
 
         # -------------------------------------------------------
-        # 4. FINALIZE ENERGY ASSIGNMENT
+        # 3. FINALIZE ENERGY ASSIGNMENT
         # -------------------------------------------------------
         step = data["Step"]
 
@@ -155,14 +138,16 @@ def extract_gaussian_data(file_path):
 
     except Exception as e:
         print(f"Error parsing {filename}: {e}")
+        data["error"] = str(e)   # not cached; the summary table has no error column
 
     return data
 
-def main():
+def main(use_cache=True, rebuild_cache=False, profile=None):
+    prof = Profile("extract", profile, reset=True) if profile else NO_PROFILE
     target_dir = os.getcwd()
     print(f"Scanning directory: {target_dir}")
 
-    files = sorted([f for f in os.listdir(target_dir) if f.endswith(".log")])
+    files = sorted(unique_logs(f for f in os.listdir(target_dir) if is_log_file(f, (".log",))))
     if not files:
         print("No .log files found!")
         return
@@ -170,24 +155,45 @@ def main():
     all_results = []
     print(f"Found {len(files)} log files. Processing...")
 
-    for f in files:
-        result = extract_gaussian_data(os.path.join(target_dir, f))
-        all_results.append(result)
+    # Unchanged logs are served from the .petcache/ parse cache
+    with ParseCache(enabled=use_cache, rebuild=rebuild_cache) as cache:
+        for f in files:
+            path = os.path.join(target_dir, f)
+            with prof.stage("parse", path):   # a cache hit reads 0 bytes
+                result = cache.get("extract", path)
+                if result is None:
+                    result = extract_gaussian_data(path, prof)
+                    if "error" not in result:   # a failed parse is retried on the next run
+                        cache.put("extract", path, result)
+            all_results.append(result)
+        cache.evict_missing()
+        print(cache.summary())
 
     # Create DataFrame
-    df = pd.DataFrame(all_results)
-    
-    # Order Columns
-    cols = ["Step", "Filename", "Termination", "Freq_Status", "Energy_Type", "Root", "Energy_Hartree", "Oscillator_Strength"]
-    for c in cols:
-        if c not in df.columns: df[c] = None
-    df = df[cols]
+    with prof.stage("dataframe"):
+        import pandas as pd
+        df = pd.DataFrame(all_results)
+
+        # Order Columns
+        cols = ["Step", "Filename", "Termination", "Freq_Status", "Energy_Type", "Root", "Energy_Hartree", "Oscillator_Strength"]
+        for c in cols:
+            if c not in df.columns: df[c] = None
+        df = df[cols]
 
     # Save
     output_xlsx = "Summary_Data.xlsx"
-    df.to_excel(output_xlsx, index=False)
+    with prof.stage("to_excel"):
+        df.to_excel(output_xlsx, index=False)
     print(f"\nSuccess! Data saved to {output_xlsx}")
+    if prof:
+        print(prof.summary())
 
-if __name__ == "__main__":
-    main()
+def cli():
+    ap = argparse.ArgumentParser(description="Summarise all Gaussian .log files in the current directory.")
+    add_cache_arguments(ap)
+    add_profile_argument(ap, "extract")
+    args = ap.parse_args()
+    main(use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache, profile=args.profile)
 
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,306 @@
+"""
+Lazy reader for Gaussian formatted checkpoint (.fchk) files.
+
+Opening an FchkFile only walks the section headers: every array section is
+stepped over using its N= count and fixed line width, so a multi-MB fchk
+costs one header scan. Scalars are parsed right away; R/I arrays are parsed
+from their exact byte slice on first access and then cached:
+
+    fchk = FchkFile("00BDP-NH2_ethanol_m062x_m062x_m062x.fchk")
+    fchk.homo_index                      # no array is read
+    C = fchk.alpha_mo_coefficients       # (n_mo, n_basis), parsed once
+    fchk["Shell types"]                  # any section by its header name
+
+With sidecar=True (or load_fchk()) the header table and every array in
+SIDECAR_ARRAYS that gets parsed are also saved as .npy files under
+.petcache/fchk/<name>/ next to the fchk. Later runs take both from there
+(arrays zero-copy, np.load(mmap_mode="r")) for as long as the fchk keeps its
+size and mtime; a changed fchk wipes its sidecar.
+"""
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from parse_cache import CACHE_DIR
+
+PathLike = Union[str, Path]
+
+# values per line and field width of each array type (Gaussian: 5E16.8, 6I12, 5A12, 72L1)
+LAYOUT = {"R": (5, 16), "I": (6, 12), "C": (5, 12), "L": (72, 1)}
+
+SIDECAR_VERSION = 1
+# arrays worth keeping in binary form: MOs, orbital energies, basis/shell info, geometry
+SIDECAR_ARRAYS = (
+    "Atomic numbers", "Current cartesian coordinates",
+    "Alpha Orbital Energies", "Beta Orbital Energies", "Alpha MO coefficients", "Beta MO coefficients",
+    "Shell types", "Number of primitives per shell", "Shell to atom map", "Coordinates of each shell",
+    "Primitive exponents", "Contraction coefficients", "P(S=P) Contraction coefficients",
+)
+
+
+class Section(NamedTuple):
+    name: str
+    type: str                        # I, R, C, L or H
+    count: Optional[int]             # N= for arrays, None for scalars
+    value: Union[int, float, str, None]
+    start: int                       # byte offset of the first data line (arrays)
+    end: int                         # byte offset just past the data
+
+
+def _scalar(kind: str, text: str) -> Union[int, float, str, bool]:
+    if kind == "I":
+        return int(text)
+    if kind == "R":
+        return float(text.replace("D", "E"))
+    if kind == "L":
+        return text.strip() == "T"
+    return text.strip()
+
+def _skip_lines(mm: mmap.mmap, pos: int, n: int) -> int:
+    for _ in range(n):
+        nl = mm.find(b"\n", pos)
+        if nl < 0:
+            return len(mm)
+        pos = nl + 1
+    return pos
+
+def _array_end(mm: mmap.mmap, start: int, kind: str, count: int) -> int:
+    """Offset just past an array section, computed from its fixed layout and checked."""
+    per_line, width = LAYOUT.get(kind, (1, 0))
+    n_lines = math.ceil(count / per_line)
+    if n_lines == 0:
+        return start
+    last = count - (n_lines - 1) * per_line
+    end = start + (n_lines - 1) * (per_line * width + 1) + last * width + 1
+    if end <= len(mm) and mm[end - 1:end] == b"\n" and (end == len(mm) or mm[end:end + 1] != b" "):
+        return end
+    # CRLF line ends or unusual widths: fall back to counting lines
+    return _skip_lines(mm, start, n_lines)
+
+def scan_sections(path: PathLike) -> Dict[str, object]:
+    """Title, job line and {name: Section} of an fchk, reading headers only."""
+    sections: Dict[str, Section] = {}
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return {"title": "", "job": "", "sections": sections}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = _skip_lines(mm, 0, 2)
+            head = mm[:pos].decode("utf-8", errors="ignore").splitlines()
+            while pos < size:
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    nl = size
+                line = mm[pos:nl].decode("utf-8", errors="ignore").rstrip("\r")
+                pos = nl + 1
+                if len(line) < 44 or line.startswith(" "):
+                    continue
+                name, kind, rest = line[:40].strip(), line[43], line[44:].strip()
+                if rest.startswith("N="):
+                    count = int(rest[2:])
+                    end = _array_end(mm, pos, kind, count)
+                    sections[name] = Section(name, kind, count, None, pos, end)
+                    pos = end
+                else:
+                    try:
+                        value = _scalar(kind, rest)
+                    except ValueError:
+                        continue
+                    sections[name] = Section(name, kind, None, value, pos, pos)
+    return {"title": head[0] if head else "", "job": head[1] if len(head) > 1 else "", "sections": sections}
+
+
+def sidecar_dir(path: PathLike) -> Path:
+    p = Path(path)
+    return p.parent / CACHE_DIR / "fchk" / p.name
+
+def _npy_name(section: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in section.lower()) + ".npy"
+
+
+class FchkFile:
+    def __init__(self, path: PathLike, sidecar: bool = False):
+        self.path = str(path)
+        self._sidecar = sidecar_dir(path) if sidecar else None
+        info = self._read_meta() if sidecar else None
+        if info is None:
+            info = scan_sections(path)
+            if sidecar:
+                self._write_meta(info)
+        self.title: str = info["title"]
+        self.job: str = info["job"]
+        self.sections: Dict[str, Section] = info["sections"]
+        self._arrays: Dict[str, object] = {}
+
+    # -- sidecar -------------------------------------------------------------
+    def _signature(self) -> List[int]:
+        st = os.stat(self.path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _read_meta(self) -> Optional[Dict[str, object]]:
+        try:
+            with open(self._sidecar / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != SIDECAR_VERSION or meta.get("signature") != self._signature():
+            shutil.rmtree(self._sidecar, ignore_errors=True)
+            return None
+        meta["sections"] = {s[0]: Section(*s) for s in meta["sections"]}
+        return meta
+
+    def _write_meta(self, info: Dict[str, object]) -> None:
+        meta = {"version": SIDECAR_VERSION, "signature": self._signature(), "title": info["title"],
+                "job": info["job"], "sections": [list(s) for s in info["sections"].values()]}
+        try:
+            shutil.rmtree(self._sidecar, ignore_errors=True)
+            self._sidecar.mkdir(parents=True, exist_ok=True)
+            tmp = self._sidecar / f"meta.json.{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._sidecar / "meta.json")
+        except OSError:
+            self._sidecar = None   # read-only location: work without a sidecar
+
+    def _sidecar_array(self, sec: Section):
+        npy = self._sidecar / _npy_name(sec.name)
+        if npy.exists():
+            return np.load(npy, mmap_mode="r")
+        arr = self._parse(sec)
+        try:
+            tmp = npy.with_name(f"{npy.name}.{os.getpid()}.npy")
+            np.save(tmp, arr)
+            os.replace(tmp, npy)
+        except OSError:
+            pass
+        return arr
+
+    def __repr__(self) -> str:
+        return f"FchkFile({Path(self.path).name}, {len(self.sections)} sections)"
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sections)
+
+    def __getitem__(self, name: str):
+        sec = self.sections[name]
+        if sec.count is None:
+            return sec.value
+        if name not in self._arrays:
+            self._arrays[name] = self._load(sec)
+        return self._arrays[name]
+
+    def get(self, name: str, default=None):
+        return self[name] if name in self.sections else default
+
+    def _load(self, sec: Section):
+        if self._sidecar is not None and sec.name in SIDECAR_ARRAYS and sec.type in ("R", "I"):
+            return self._sidecar_array(sec)
+        return self._parse(sec)
+
+    def _parse(self, sec: Section):
+        with open(self.path, "rb") as f:
+            f.seek(sec.start)
+            raw = f.read(sec.end - sec.start)
+        if sec.type in ("R", "I"):
+            dtype = np.float64 if sec.type == "R" else np.int64
+            if b"D" in raw:
+                raw = raw.replace(b"D", b"E")
+            arr = np.fromstring(raw, dtype=dtype, sep=" ")
+            if arr.size != sec.count:
+                arr = np.array(raw.split(), dtype=dtype)
+            return arr
+        lines = raw.decode("utf-8", errors="ignore").splitlines()
+        if sec.type == "L":
+            return np.array([c == "T" for c in "".join(s.strip() for s in lines)][:sec.count])
+        return "".join(lines)
+
+    # -- common quantities ---------------------------------------------------
+    @property
+    def n_atoms(self) -> int:
+        return int(self["Number of atoms"])
+
+    @property
+    def n_alpha(self) -> int:
+        return int(self["Number of alpha electrons"])
+
+    @property
+    def n_beta(self) -> int:
+        return int(self["Number of beta electrons"])
+
+    @property
+    def homo_index(self) -> int:
+        """1-based index of the (alpha) HOMO."""
+        return self.n_alpha
+
+    @property
+    def n_basis(self) -> int:
+        return int(self["Number of basis functions"])
+
+    @property
+    def n_mo(self) -> int:
+        return int(self.get("Number of independent functions", self.n_basis))
+
+    @property
+    def atomic_numbers(self) -> np.ndarray:
+        return self["Atomic numbers"]
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """(n_atoms, 3) Cartesian coordinates in Bohr."""
+        return self["Current cartesian coordinates"].reshape(-1, 3)
+
+    @property
+    def alpha_orbital_energies(self) -> np.ndarray:
+        return self["Alpha Orbital Energies"]
+
+    @property
+    def alpha_mo_coefficients(self) -> np.ndarray:
+        """(n_mo, n_basis); row i is MO i+1."""
+        return self["Alpha MO coefficients"].reshape(-1, self.n_basis)
+
+    @property
+    def beta_mo_coefficients(self) -> Optional[np.ndarray]:
+        arr = self.get("Beta MO coefficients")
+        return None if arr is None else arr.reshape(-1, self.n_basis)
+
+
+def load_fchk(path: PathLike) -> FchkFile:
+    """FchkFile backed by its binary sidecar (created or refreshed as needed)."""
+    return FchkFile(path, sidecar=True)
+
+def read_homo_index(path: PathLike, sidecar: bool = False) -> Optional[int]:
+    """HOMO index from the header scan alone, or None if the file has no electron count."""
+    try:
+        return FchkFile(path, sidecar=sidecar).homo_index
+    except (OSError, KeyError, ValueError):
+        return None
+
+def list_sections(path: PathLike) -> List[str]:
+    return list(scan_sections(path)["sections"])
+
+def cli():
+    import argparse
+    import glob
+
+    ap = argparse.ArgumentParser(description="Build the binary sidecars of .fchk files ahead of an analysis run.")
+    ap.add_argument("paths", nargs="*", default=["*.fchk"], help="fchk files or globs. Default: *.fchk here.")
+    args = ap.parse_args()
+    files = sorted({f for p in args.paths for f in (glob.glob(p) or [p]) if os.path.isfile(f)})
+    for path in files:
+        fchk = load_fchk(path)
+        n = sum(1 for name in SIDECAR_ARRAYS if fchk.get(name) is not None)
+        print(f"{path}: {n} array(s) in {sidecar_dir(path)}")
+
+if __name__ == "__main__":
+    cli()
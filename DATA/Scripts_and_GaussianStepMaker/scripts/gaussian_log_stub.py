@@ -0,0 +1,54 @@
+"""
+Fake running Gaussian job, for testing and benchmarking job_monitor.
+
+Appends an existing log to a new file in chunks, as Gaussian would while it
+runs. Chunks are cut at arbitrary byte positions (not at line ends), so the
+reader sees partial lines the way it does on a real, growing log.
+
+    python gaussian_log_stub.py LE_opt.log runs/LE_opt.log --chunk 4096 --interval 0.5
+"""
+import argparse
+import os
+import random
+import time
+from typing import Iterator
+
+
+def replay_chunks(src: str, dest: str, chunk: int = 8192, jitter: float = 0.5,
+                  stop_at: float = 1.0, seed: int = 0) -> Iterator[int]:
+    """Copy src to dest chunk by chunk, yielding the bytes written so far after each chunk."""
+    rng = random.Random(seed)
+    with open(src, "rb") as f:
+        data = f.read()
+    data = data[:int(len(data) * stop_at)]
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    pos = 0
+    with open(dest, "wb") as out:
+        while pos < len(data):
+            n = max(1, int(chunk * rng.uniform(1 - jitter, 1 + jitter)))
+            pos += out.write(data[pos:pos + n])
+            out.flush()
+            yield pos
+
+def replay(src: str, dest: str, chunk: int = 8192, interval: float = 1.0, jitter: float = 0.5,
+           stop_at: float = 1.0, seed: int = 0) -> int:
+    """Copy src to dest chunk by chunk; stop_at < 1 stops early (a job still running). Returns bytes written."""
+    pos = 0
+    for pos in replay_chunks(src, dest, chunk, jitter, stop_at, seed):
+        if interval > 0:
+            time.sleep(interval)
+    return pos
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Append an existing Gaussian log to a new file in chunks.")
+    ap.add_argument("src", help="Finished log to replay.")
+    ap.add_argument("dest", help="Growing log to write.")
+    ap.add_argument("--chunk", type=int, default=8192, help="Mean chunk size in bytes.")
+    ap.add_argument("--interval", type=float, default=1.0, help="Seconds between chunks.")
+    ap.add_argument("--jitter", type=float, default=0.5, help="Relative spread of the chunk size.")
+    ap.add_argument("--stop-at", type=float, default=1.0, help="Fraction of the log to write (1 = all).")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    n = replay(args.src, args.dest, args.chunk, args.interval, args.jitter, args.stop_at, args.seed)
+    print(f"Wrote {n} bytes to {args.dest}")
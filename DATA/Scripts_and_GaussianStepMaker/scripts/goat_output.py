@@ -0,0 +1,269 @@
+"""
+Columnar summary of an ORCA GOAT conformer search (conf_search.out).
+
+The GOAT output is mostly per-optimisation XTB text; the parts that describe
+the search itself are read in one streaming pass by parse_goat() into NumPy
+structured arrays:
+
+    workers      one row per worker launched in a global step
+                 step, worker, min_temp, max_en, n_opt, n_procs
+    iterations   one row per 'GOAT Global Iter' summary
+                 iter, min_en (Hartree), sconf (cal/(mol K)), gconf (kcal/mol),
+                 n_workers, n_frames, frame_start
+    frames       one row per frame of the <base>.finalensemble.globaliter.N.xyz
+                 file written after each global iteration (N = iter - 1)
+                 iter, frame, offset, energy (Hartree, from the comment line)
+    conformers   one row of the '# Final ensemble info #' table
+                 conformer, rel_energy (kcal/mol), degen, pct_total, pct_cumul,
+                 offset, energy (frame of <base>.finalensemble.xyz)
+
+The frames of iterations[i] are frames[frame_start:frame_start + n_frames],
+so the growth of the ensemble across iterations is available without reading
+any coordinates; offset is the byte offset of the frame in its XYZ file, to
+be read with xyz_ensemble.read_frame(). params holds the 'Global parameters',
+'Filtering criteria' and 'Thermodynamics' settings as text, timings the
+'Timings for individual modules' seconds and the total run time.
+
+    run = parse_goat("conf_search.out")
+    run.iterations[["iter", "n_frames", "gconf"]]
+    comment, symbols, xyz = read_frame(run.xyz_file(), run.conformers["offset"][0])
+    save_run(run, "conf_search.goat.npz")
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from log_scanner import open_log
+from xyz_ensemble import frame_index
+
+PathLike = Union[str, Path]
+
+WORKER_DTYPE = np.dtype([
+    ("step", "i2"),           # 0-based global step (the N of <base>.goat.N.<worker>.out)
+    ("worker", "i2"),
+    ("min_temp", "f8"),
+    ("max_en", "f8"),
+    ("n_opt", "i4"),
+    ("n_procs", "i4"),
+])
+
+ITER_DTYPE = np.dtype([
+    ("iter", "i2"),           # 1-based, as printed
+    ("min_en", "f8"),
+    ("sconf", "f8"),
+    ("gconf", "f8"),
+    ("n_workers", "i4"),      # workers launched for this global step
+    ("n_frames", "i4"),       # conformers in globaliter.<iter - 1>.xyz (-1 if the file is missing)
+    ("frame_start", "i8"),
+])
+
+FRAME_DTYPE = np.dtype([
+    ("iter", "i2"),
+    ("frame", "i4"),
+    ("offset", "i8"),
+    ("energy", "f8"),
+])
+
+CONFORMER_DTYPE = np.dtype([
+    ("conformer", "i4"),
+    ("rel_energy", "f8"),
+    ("degen", "i4"),
+    ("pct_total", "f8"),
+    ("pct_cumul", "f8"),
+    ("offset", "i8"),         # -1 if the final ensemble file is missing
+    ("energy", "f8"),
+])
+
+GOAT_BANNER = "A Global Optimizer Algorithm"
+PARAM_SECTIONS = ("Global parameters", "Filtering criteria", "Thermodynamics")
+PARAM_INDENT = " " * 20    # continuation lines of a wrapped parameter value
+
+_PARAM_RE = re.compile(r"^  (\S.*?)\s+\.\.\.\s+(.*\S)")
+_HOSTS_RE = re.compile(r"\.goat\.(\d+)\.hostnames")
+_TIMING_RE = re.compile(r"^(\S.*?)\s+\.\.\.\s+([\d.]+) sec")
+_RUN_TIME_RE = re.compile(r"(\d+) days (\d+) hours (\d+) minutes (\d+) seconds (\d+) msec")
+_BELOW_RE = re.compile(r"Conformers below ([\d.]+) kcal/mol:\s*(\d+)")
+
+
+class GoatRun(NamedTuple):
+    path: str
+    base: str                     # basename of the GOAT job, e.g. Naph_GOAT
+    params: Dict[str, str]
+    workers: np.ndarray
+    iterations: np.ndarray
+    frames: np.ndarray
+    conformers: np.ndarray
+    summary: Dict[str, float]     # lowest_energy, sconf, gconf, window_kcal, n_below_window
+    timings: Dict[str, float]     # module -> seconds, plus 'TOTAL RUN TIME'
+
+    def xyz_file(self, iteration: Optional[int] = None) -> Path:
+        """The final ensemble file, or the one written after a given (1-based) global iteration."""
+        folder = Path(self.path).parent
+        if iteration is None:
+            return folder / f"{self.base}.finalensemble.xyz"
+        return folder / f"{self.base}.finalensemble.globaliter.{iteration - 1}.xyz"
+
+    def frames_of(self, row: int) -> np.ndarray:
+        it = self.iterations[row]
+        return self.frames[it["frame_start"]:it["frame_start"] + max(0, it["n_frames"])]
+
+
+def _read_output(path: PathLike):
+    """(base, params, workers, iterations, conformers, summary, timings) in one pass over the text."""
+    base = ""
+    params: Dict[str, str] = {}
+    workers: List[tuple] = []
+    iters: Dict[int, tuple] = {}
+    conformers: List[tuple] = []
+    summary: Dict[str, float] = {}
+    timings: Dict[str, float] = {}
+
+    in_goat = False
+    section = None          # params | iter | final | timings
+    step = -1
+    key = ""
+    with open_log(path) as f:
+        for line in f:
+            if not in_goat:
+                if GOAT_BANNER in line:
+                    in_goat = True
+                elif line.startswith("NAME = "):
+                    base = line[7:].strip().rsplit(".", 1)[0]
+                continue
+            s = line.strip()
+            if not s:
+                continue
+            if s in PARAM_SECTIONS:
+                section = "params"
+                continue
+            if section == "params":
+                m = _PARAM_RE.match(line)
+                if m:
+                    key = m.group(1)
+                    params[key] = m.group(2)
+                    continue
+                if line.startswith(PARAM_INDENT) and key:
+                    params[key] += " " + s   # wrapped worker : temperature list
+                    continue
+                if line.startswith("  ") or s.startswith("*") or s.startswith("-"):
+                    continue   # notes, rules, table header
+                section = None
+            tok = s.split()
+            if section == "iter" and len(tok) == 4 and tok[0].isdigit():
+                iters[int(tok[0])] = (float(tok[1]), float(tok[2]), float(tok[3]))
+                continue
+            if section == "final" and len(tok) == 5 and tok[0].isdigit():
+                conformers.append((int(tok[0]), float(tok[1]), int(tok[2]), float(tok[3]), float(tok[4])))
+                continue
+            if s.startswith("List of participating nodes"):
+                m = _HOSTS_RE.search(s)
+                step = int(m.group(1)) if m else step + 1
+            elif len(tok) == 9 and tok[-1].endswith(".out") and ".goat." in tok[-1]:
+                # worker  min_temp  max_en  mean : sigma  n_opt  n_procs  output
+                workers.append((step, int(tok[0]), float(tok[1]), float(tok[2]), int(tok[6]), int(tok[7])))
+            elif s.startswith("GOAT Global Iter"):
+                section = "iter"
+            elif s.startswith("Conformer") and "Degen." in s:
+                section = "final"
+            elif s.startswith("Conformers below"):
+                m = _BELOW_RE.search(s)
+                if m:
+                    summary["window_kcal"], summary["n_below_window"] = float(m.group(1)), int(m.group(2))
+            elif s.startswith("Lowest energy conformer"):
+                summary["lowest_energy"] = float(s.split(":")[1].split()[0])
+            elif s.startswith("Sconf at") or s.startswith("Gconf at"):
+                summary[s[:5].lower()] = float(s.split(":")[1].split()[0])
+            elif s.startswith("Writing final ensemble to"):
+                base = s.split()[-1].split(".finalensemble")[0]
+            elif s.startswith("Timings for individual modules"):
+                section = "timings"
+            elif section == "timings":
+                m = _TIMING_RE.match(s)
+                if m:
+                    timings[m.group(1)] = float(m.group(2))
+                elif s.startswith("TOTAL RUN TIME"):
+                    d, h, mi, sec, ms = (int(g) for g in _RUN_TIME_RE.search(s).groups())
+                    timings["TOTAL RUN TIME"] = ((d * 24 + h) * 60 + mi) * 60 + sec + ms / 1000
+    return base, params, workers, iters, conformers, summary, timings
+
+
+def parse_goat(path: PathLike, link_frames: bool = True) -> GoatRun:
+    """Parse a GOAT output; with link_frames, index the frames of the XYZ files next to it."""
+    base, params, workers, iters, confs, summary, timings = _read_output(path)
+    folder = Path(path).parent
+    worker_arr = np.array(workers, dtype=WORKER_DTYPE)
+    n_workers = np.bincount(worker_arr["step"], minlength=max(iters, default=0) + 1) if len(worker_arr) else None
+
+    iterations = np.empty(len(iters), ITER_DTYPE)
+    frame_parts = []
+    start = 0
+    for row, it in enumerate(sorted(iters)):
+        iterations[row] = (it, *iters[it], n_workers[it - 1] if n_workers is not None else 0, -1, start)
+        xyz = folder / f"{base}.finalensemble.globaliter.{it - 1}.xyz"
+        if link_frames and xyz.is_file():
+            offsets, energies = frame_index(xyz)
+            part = np.empty(len(offsets), FRAME_DTYPE)
+            part["iter"], part["frame"], part["offset"], part["energy"] = it, np.arange(len(offsets)), offsets, energies
+            frame_parts.append(part)
+            iterations[row]["n_frames"] = len(part)
+            start += len(part)
+    frames = np.concatenate(frame_parts) if frame_parts else np.empty(0, FRAME_DTYPE)
+
+    conformers = np.empty(len(confs), CONFORMER_DTYPE)
+    for row, c in enumerate(confs):
+        conformers[row] = (*c, -1, np.nan)
+    final = folder / f"{base}.finalensemble.xyz"
+    if link_frames and len(conformers) and final.is_file():
+        offsets, energies = frame_index(final)
+        ids = conformers["conformer"]
+        ok = ids < len(offsets)
+        conformers["offset"][ok] = offsets[ids[ok]]
+        conformers["energy"][ok] = energies[ids[ok]]
+    return GoatRun(str(path), base, params, worker_arr, iterations, frames, conformers, summary, timings)
+
+
+def save_run(run: GoatRun, path: PathLike) -> Path:
+    """All tables in one .npz; params, summary and timings as a JSON string."""
+    path = Path(path)
+    meta = {"path": run.path, "base": run.base, "params": run.params, "summary": run.summary, "timings": run.timings}
+    np.savez(path, meta=np.array(json.dumps(meta)), workers=run.workers, iterations=run.iterations,
+             frames=run.frames, conformers=run.conformers)
+    return path if path.suffix == ".npz" else Path(f"{path}.npz")
+
+def load_run(path: PathLike) -> GoatRun:
+    with np.load(path) as z:
+        meta = json.loads(str(z["meta"]))
+        return GoatRun(meta["path"], meta["base"], meta["params"], z["workers"], z["iterations"],
+                       z["frames"], z["conformers"], meta["summary"], meta["timings"])
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Summarise an ORCA GOAT conformer search output as NumPy tables.")
+    ap.add_argument("outputs", nargs="+", help="GOAT output files, e.g. conf_search.out.")
+    ap.add_argument("--save", action="store_true", help="Write <output stem>.goat.npz next to each output.")
+    args = ap.parse_args()
+
+    for out in args.outputs:
+        run = parse_goat(out)
+        print(f"{os.path.basename(out)} ({run.base}): {len(run.workers)} worker runs, "
+              f"{len(run.iterations)} global iterations, {len(run.conformers)} final conformers")
+        print(f"  {'Iter':>4} {'Min En (Eh)':>13} {'Sconf':>7} {'Gconf':>7} {'Workers':>8} {'Frames':>7}")
+        for it in run.iterations:
+            print(f"  {it['iter']:>4} {it['min_en']:>13.6f} {it['sconf']:>7.3f} {it['gconf']:>7.3f} "
+                  f"{it['n_workers']:>8} {it['n_frames']:>7}")
+        if run.summary:
+            print("  " + ", ".join(f"{k}={v:g}" for k, v in run.summary.items()))
+        if "TOTAL RUN TIME" in run.timings:
+            print(f"  total run time {run.timings['TOTAL RUN TIME']:.1f} s")
+        if args.save:
+            print(f"Wrote: {save_run(run, Path(out).with_suffix('.goat.npz'))}")
+
+if __name__ == "__main__":
+    cli()
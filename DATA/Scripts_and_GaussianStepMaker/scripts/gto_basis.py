@@ -0,0 +1,243 @@
+"""
+Contracted Gaussian basis set of an fchk, with the one-electron integrals the
+excited-state analyses need.
+
+BasisSet.from_fchk() rebuilds the AO basis from the shell sections of a
+Gaussian fchk (Shell types, Number of primitives per shell, Shell to atom
+map, Primitive exponents, Contraction coefficients, P(S=P) Contraction
+coefficients, Coordinates of each shell), in Gaussian's AO order:
+
+    Cartesian d   xx yy zz xy xz yz
+    Cartesian f   xxx yyy zzz xyy xxy xxz xzz yzz yyz xyz
+    pure shells   m = 0, +1, -1, +2, -2, ...  (real solid harmonics)
+
+Every AO is expanded into Cartesian primitives (exponent, centre, lx/ly/lz)
+and a transformation matrix, so integrals are done once over primitives with
+NumPy and contracted with a matrix product:
+
+    basis = BasisSet.from_fchk(load_fchk(path))
+    S = basis.overlap()                  # (n_ao, n_ao)
+    Dx, Dy, Dz = basis.dipole()          # <mu|r|nu>, origin at 0, Bohr
+    phi = basis.evaluate(points)         # (n_points, n_ao) on a grid
+
+Pure functions are normalised to 1; Cartesian shells share the
+normalisation of their x^L component, as Gaussian writes them.
+check_orthonormal(C) reports max |C S C^T - 1| and is the guard that the
+basis matches the MO coefficients.
+"""
+from __future__ import annotations
+
+import math
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+BOHR_TO_ANGSTROM = 0.529177210903
+ROW_CHUNK = 512           # primitive rows per integral block (bounds memory)
+POINT_CHUNK = 4096        # grid points per evaluation block
+
+CARTESIAN_ORDER = {
+    0: [(0, 0, 0)],
+    1: [(1, 0, 0), (0, 1, 0), (0, 0, 1)],
+    2: [(2, 0, 0), (0, 2, 0), (0, 0, 2), (1, 1, 0), (1, 0, 1), (0, 1, 1)],
+    3: [(3, 0, 0), (0, 3, 0), (0, 0, 3), (1, 2, 0), (2, 1, 0), (2, 0, 1), (1, 0, 2), (0, 1, 2), (0, 2, 1), (1, 1, 1)],
+    4: [(0, 0, 4), (0, 1, 3), (0, 2, 2), (0, 3, 1), (0, 4, 0), (1, 0, 3), (1, 1, 2), (1, 2, 1), (1, 3, 0),
+        (2, 0, 2), (2, 1, 1), (2, 2, 0), (3, 0, 1), (3, 1, 0), (4, 0, 0)],
+}
+
+
+def _dfact(n: int) -> int:
+    """Double factorial, with (-1)!! = 1."""
+    return math.prod(range(n, 0, -2)) if n > 0 else 1
+
+def solid_harmonic(l: int, m: int) -> List[Tuple[Tuple[int, int, int], float]]:
+    """Real solid harmonic S_lm as (monomial, coefficient) pairs (Helgaker, Jorgensen & Olsen eq. 6.4.47)."""
+    am = abs(m)
+    neg = 1 if m < 0 else 0
+    norm = math.sqrt(2 * math.factorial(l + am) * math.factorial(l - am) / (2.0 if m == 0 else 1.0)) \
+        / (2 ** am * math.factorial(l))
+    terms = {}
+    for t in range((l - am) // 2 + 1):
+        for u in range(t + 1):
+            for w in range(neg, am + 1, 2):          # w = 2v
+                c = ((-1) ** (t + (w - neg) // 2) * 0.25 ** t * math.comb(l, t) * math.comb(l - t, am + t)
+                     * math.comb(t, u) * math.comb(am, w))
+                key = (2 * t + am - 2 * u - w, 2 * u + w, l - 2 * t - am)
+                terms[key] = terms.get(key, 0.0) + norm * c
+    return [(k, c) for k, c in terms.items() if abs(c) > 1e-14]
+
+def _pure_order(l: int) -> List[int]:
+    return [0] + [s * m for m in range(1, l + 1) for s in (1, -1)]
+
+
+class Primitives(NamedTuple):
+    exps: np.ndarray       # (n_prim,)
+    centers: np.ndarray    # (n_prim, 3) Bohr
+    powers: np.ndarray     # (n_prim, 3) lx, ly, lz
+    coefs: np.ndarray      # (n_prim,) contraction coefficient x primitive normalisation
+
+
+def _overlap_1d(i, j, a, b, A, B):
+    """1D overlap <x_A^i e^{-a x_A^2} | x_B^j e^{-b x_B^2}> for broadcastable arrays."""
+    p = a + b
+    P = (a * A + b * B) / p
+    PA, PB = P - A, P - B
+    pref = np.sqrt(np.pi / p) * np.exp(-a * b / p * (A - B) ** 2)
+    out = np.zeros(np.broadcast(i, j, p).shape)
+    imax, jmax = int(np.max(i)), int(np.max(j))
+    for k1 in range(imax + 1):
+        ok1 = k1 <= i
+        t1 = np.where(ok1, _BINOM[np.minimum(i, _BINOM.shape[0] - 1), k1] * PA ** np.maximum(i - k1, 0), 0.0)
+        for k2 in range(k1 % 2, jmax + 1, 2):
+            ok2 = k2 <= j
+            t2 = np.where(ok2, _BINOM[np.minimum(j, _BINOM.shape[0] - 1), k2] * PB ** np.maximum(j - k2, 0), 0.0)
+            k = k1 + k2
+            out += t1 * t2 * (_dfact(k - 1) / (2 * p) ** (k // 2))
+    return pref * out
+
+_BINOM = np.array([[math.comb(n, k) for k in range(12)] for n in range(12)], dtype=float)
+
+
+class BasisSet:
+    def __init__(self, prims: Primitives, transform: np.ndarray, shell_of_ao: np.ndarray, ao_l: np.ndarray,
+                 pure_ao: np.ndarray):
+        self.prims = prims
+        self.n_ao = transform.shape[1]
+        self.shell_of_ao = shell_of_ao
+        self.ao_l = ao_l
+        self.pure_ao = pure_ao
+        self._T_raw = transform
+        S_raw, _ = self._contracted(transform, dipole=False)
+        self.scale = self._ao_scale(np.diag(S_raw))
+        self.transform = transform * self.scale[None, :]
+        self._S = S_raw * np.outer(self.scale, self.scale)
+
+    def __repr__(self) -> str:
+        return f"BasisSet({self.n_ao} AOs, {len(self.prims.exps)} Cartesian primitives)"
+
+    @classmethod
+    def from_fchk(cls, fchk) -> "BasisSet":
+        types = np.asarray(fchk["Shell types"])
+        nprim = np.asarray(fchk["Number of primitives per shell"])
+        exps_all = np.asarray(fchk["Primitive exponents"])
+        coef_all = np.asarray(fchk["Contraction coefficients"])
+        sp_all = fchk.get("P(S=P) Contraction coefficients")
+        sp_all = np.asarray(sp_all) if sp_all is not None else None
+        centers = np.asarray(fchk["Coordinates of each shell"]).reshape(-1, 3)
+
+        exps, cents, powers, coefs, cols = [], [], [], [], []
+        shell_of_ao, ao_l, pure_ao = [], [], []
+        n_ao = 0
+        start = 0
+        for sh, (t, n) in enumerate(zip(types.tolist(), nprim.tolist())):
+            a = exps_all[start:start + n]
+            parts = [(0, False, coef_all[start:start + n]), (1, False, sp_all[start:start + n])] if t == -1 \
+                else [(abs(t), t < -1, coef_all[start:start + n])]
+            start += n
+            for L, pure, d in parts:
+                if pure:
+                    aos = [solid_harmonic(L, m) for m in _pure_order(L)]
+                else:
+                    if L not in CARTESIAN_ORDER:
+                        raise ValueError(f"Cartesian shells with L={L} are not supported")
+                    aos = [[(mono, 1.0)] for mono in CARTESIAN_ORDER[L]]
+                monos = sorted({mono for ao in aos for mono, _ in ao})
+                base = len(exps)
+                for k in range(n):
+                    # primitives normalised as x^L e^{-a r^2}; solid-harmonic weights go into the transform
+                    nk = (2 * a[k] / np.pi) ** 0.75 * (4 * a[k]) ** (L / 2) / math.sqrt(_dfact(2 * L - 1))
+                    for mono in monos:
+                        exps.append(a[k])
+                        cents.append(centers[sh])
+                        powers.append(mono)
+                        coefs.append(d[k] * nk)
+                for ao in aos:
+                    for mono, w in ao:
+                        mi = monos.index(mono)
+                        for k in range(n):
+                            cols.append((base + k * len(monos) + mi, n_ao, w))
+                    shell_of_ao.append(sh)
+                    ao_l.append(L)
+                    pure_ao.append(pure)
+                    n_ao += 1
+
+        prims = Primitives(np.array(exps, float), np.array(cents, float).reshape(-1, 3),
+                           np.array(powers, int).reshape(-1, 3), np.array(coefs, float))
+        T = np.zeros((len(exps), n_ao))
+        for r, c, w in cols:
+            T[r, c] += w
+        return cls(prims, T, np.array(shell_of_ao), np.array(ao_l), np.array(pure_ao, bool))
+
+    # -- integrals -----------------------------------------------------------
+    def _contracted(self, transform: np.ndarray, dipole: bool):
+        """<mu|nu> (and <mu|x|nu>, <mu|y|nu>, <mu|z|nu>) from primitive blocks, contracted with transform."""
+        P = self.prims
+        T = transform * P.coefs[:, None]
+        n = len(P.exps)
+        S = np.zeros((self.n_ao, self.n_ao))
+        D = [np.zeros((self.n_ao, self.n_ao)) for _ in range(3)] if dipole else None
+        b = P.exps[None, :]
+        for r0 in range(0, n, ROW_CHUNK):
+            rows = slice(r0, min(n, r0 + ROW_CHUNK))
+            a = P.exps[rows][:, None]
+            s1d, x1d = [], []
+            for d in range(3):
+                i = P.powers[rows, d][:, None]
+                j = P.powers[None, :, d]
+                A = P.centers[rows, d][:, None]
+                B = P.centers[None, :, d]
+                sd = _overlap_1d(i, j, a, b, A, B)
+                s1d.append(sd)
+                if dipole:
+                    # x = (x - A_x) + A_x: raise the bra power by one
+                    x1d.append(_overlap_1d(i + 1, j, a, b, A, B) + A * sd)
+            Tr = T[rows]
+            S += Tr.T @ (s1d[0] * s1d[1] * s1d[2]) @ T
+            if dipole:
+                D[0] += Tr.T @ (x1d[0] * s1d[1] * s1d[2]) @ T
+                D[1] += Tr.T @ (s1d[0] * x1d[1] * s1d[2]) @ T
+                D[2] += Tr.T @ (s1d[0] * s1d[1] * x1d[2]) @ T
+        return S, D
+
+    def _ao_scale(self, diag: np.ndarray) -> np.ndarray:
+        scale = 1.0 / np.sqrt(diag)
+        # Cartesian shells: every component takes the factor of the shell's first (x^L) one
+        first = {}
+        for mu in range(self.n_ao):
+            if self.pure_ao[mu]:
+                continue
+            key = (self.shell_of_ao[mu], self.ao_l[mu])
+            scale[mu] = first.setdefault(key, scale[mu])
+        return scale
+
+    def overlap(self) -> np.ndarray:
+        return self._S.copy()
+
+    def dipole(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """<mu|x|nu>, <mu|y|nu>, <mu|z|nu> (origin at 0, Bohr)."""
+        _, D = self._contracted(self.transform, dipole=True)
+        return D[0], D[1], D[2]
+
+    def check_orthonormal(self, C: np.ndarray, S: np.ndarray = None) -> float:
+        """max |C S C^T - 1| over the rows (MOs) of C."""
+        S = self._S if S is None else S
+        M = C @ S @ C.T
+        return float(np.abs(M - np.eye(len(C))).max()) if len(C) else 0.0
+
+    # -- grid evaluation -----------------------------------------------------
+    def evaluate(self, points: np.ndarray) -> np.ndarray:
+        """AO values on points (n_points, 3) in Bohr -> (n_points, n_ao)."""
+        P = self.prims
+        T = self.transform * P.coefs[:, None]
+        out = np.empty((len(points), self.n_ao))
+        for p0 in range(0, len(points), POINT_CHUNK):
+            pts = points[p0:p0 + POINT_CHUNK]
+            d = pts[:, None, :] - P.centers[None, :, :]
+            r2 = np.einsum("pkd,pkd->pk", d, d)
+            val = np.exp(-P.exps[None, :] * r2)
+            for ax in range(3):
+                pw = P.powers[:, ax]
+                if pw.any():
+                    val *= d[:, :, ax] ** pw[None, :]
+            out[p0:p0 + POINT_CHUNK] = val @ T
+        return out
@@ -0,0 +1,242 @@
+"""
+Watch running Gaussian jobs by following their logs as they grow.
+
+tddft_parser and extract_all_results re-read every log from the start. The
+monitor instead keeps, per file, the byte offset it has read up to and the
+job state built from what it has seen so far; each poll reads only the bytes
+appended since the last one (up to the last complete line) and feeds those
+lines through log_scanner.scan_lines(). Watching many long jobs therefore
+costs in proportion to how fast the logs grow, not to their size.
+
+For every log the summary tracks
+
+    step        last 'Step number' of the optimisation
+    scf / td    latest SCF Done and Total Energy, E(TD-HF/TD-DFT)
+    state       excited state flagged 'for optimization' in the latest TD block,
+                with its excitation energy and oscillator strength
+    root        Root= of the route; the job is flagged if the tracked state differs
+    converged   the four convergence criteria of the latest step (YES count)
+    status      running / stalled (no growth for `stall` seconds) / normal / error
+
+and a root flip is flagged when the oscillator strength of the tracked state
+changes by more than FOSC_FLIP_RATIO between two TD blocks (the state kept
+its index but changed character).
+
+    python job_monitor.py runs/ -r --interval 30
+    python gaussian_log_stub.py ../DATA/.../LE_opt.log runs/LE_opt.log &   # fake running job
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from compressed_log import compression
+from log_scanner import (
+    Convergence, ExcitedState, OptFlag, OptStep, Route, ScfDone, TdEnergy, Termination,
+    find_root_in_route, open_log, scan_lines,
+)
+from log_to_com import find_logs
+
+POLL_INTERVAL = 10.0       # seconds between polls in watch()
+STALL_SECONDS = 1800.0     # a running log that has not grown for this long is reported as stalled
+FOSC_FLIP_RATIO = 3.0      # change of the tracked state's f between TD blocks that counts as a flip
+MAX_READ = 64 * 1024 * 1024
+
+EVENTS = (Route, ScfDone, ExcitedState, OptFlag, TdEnergy, OptStep, Convergence, Termination)
+
+
+class LogFollower:
+    """Incremental parser state of one log."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0            # bytes consumed (always at a line start)
+        self.lineno = 0
+        self.mtime = 0.0
+        self.route: Optional[str] = None
+        self.root: Optional[int] = None
+        self.link = 0
+        self.step: Optional[int] = None
+        self.scf: Optional[float] = None
+        self.td: Optional[float] = None
+        self.state: Optional[int] = None          # tracked (flagged) state of the latest TD block
+        self.state_e_eV: Optional[float] = None
+        self.state_fosc: Optional[float] = None
+        self.convergence: Dict[str, Tuple[float, float, bool]] = {}
+        self.termination: Optional[bool] = None   # True normal, False error, None still running
+        self.flips = 0
+        self._last: Optional[ExcitedState] = None  # most recent ExcitedState, for the OptFlag after it
+
+    # -- reading ---------------------------------------------------------------
+    def poll(self) -> int:
+        """Read and parse whatever was appended since the last poll; returns the bytes consumed."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        if compression(self.path):
+            return self._poll_compressed(st)
+        if st.st_size < self.offset:
+            self.reset()           # truncated or replaced: start over
+        if st.st_size == self.offset:
+            return 0
+        self.mtime = st.st_mtime
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(st.st_size - self.offset, MAX_READ))
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return 0               # no complete line yet
+        lines = data[:end].decode("utf-8", errors="ignore").splitlines(keepends=True)
+        if self.route is None:
+            # the route spans several lines; keep an unfinished one for the next poll
+            start = next((i for i, line in enumerate(lines) if line.startswith(" #")), None)
+            if start is not None and not any(line.startswith(" ---") for line in lines[start + 1:]):
+                end = len("".join(lines[:start]).encode("utf-8", errors="ignore"))
+                lines = lines[:start]
+        self.feed(lines)
+        self.offset += end
+        return end
+
+    def _poll_compressed(self, st: os.stat_result) -> int:
+        """A compressed log is a finished job: parse it whole once (again only if it is replaced)."""
+        if st.st_size == self.offset and st.st_mtime == self.mtime:
+            return 0
+        self.reset()
+        self.mtime = st.st_mtime
+        with open_log(self.path) as f:
+            for lines in iter(lambda: f.readlines(MAX_READ), []):
+                self.feed(lines)
+        self.offset = st.st_size
+        return st.st_size
+
+    def feed(self, lines: List[str]) -> None:
+        kinds = EVENTS if self.route is None else EVENTS[1:]
+        for ev in scan_lines(lines, kinds):
+            kind = type(ev)
+            if self.termination is not None and kind is not Termination:
+                self.termination = None    # output after a termination line: a later link is running
+            if kind is ScfDone:
+                self.scf = ev.energy
+            elif kind is TdEnergy:
+                self.td = ev.energy
+            elif kind is ExcitedState:
+                self._last = ev
+            elif kind is OptFlag:
+                if self._last is not None:
+                    self._track(self._last)
+            elif kind is OptStep:
+                self.step = ev.step
+            elif kind is Convergence:
+                self.convergence[ev.item] = (ev.value, ev.threshold, ev.converged)
+            elif kind is Termination:
+                self.link += 1
+                self.termination = ev.normal
+            elif kind is Route and self.route is None:
+                self.route = ev.text.strip()
+                self.root = find_root_in_route(ev.text)
+        self.lineno += len(lines)
+
+    def _track(self, ev: ExcitedState) -> None:
+        if self.state == ev.state and self.state_fosc is not None:
+            lo, hi = sorted((self.state_fosc, ev.fosc))
+            if hi > FOSC_FLIP_RATIO * max(lo, 1e-4):
+                self.flips += 1
+        self.state, self.state_e_eV, self.state_fosc = ev.state, ev.e_eV, ev.fosc
+
+    # -- summary ---------------------------------------------------------------
+    def status(self, stall: float = STALL_SECONDS, now: Optional[float] = None) -> str:
+        if self.termination is True:
+            return "normal"
+        if self.termination is False:
+            return "error"
+        if self.mtime and (now or time.time()) - self.mtime > stall:
+            return "stalled"
+        return "running"
+
+    def flags(self) -> List[str]:
+        out = []
+        if self.root is not None and self.state is not None and self.state != self.root:
+            out.append(f"state {self.state} != root {self.root}")
+        if self.flips:
+            out.append(f"{self.flips} root flip(s)")
+        return out
+
+    def converged(self) -> str:
+        if not self.convergence:
+            return "-"
+        return f"{sum(c for _, _, c in self.convergence.values())}/{len(self.convergence)}"
+
+
+class JobMonitor:
+    """LogFollowers for every .log under the watched paths; new logs are picked up on each poll."""
+
+    def __init__(self, paths: List[str], recursive: bool = False):
+        self.paths = paths
+        self.recursive = recursive
+        self.followers: Dict[str, LogFollower] = {}
+        self.bytes_read = 0
+
+    def poll(self) -> List[LogFollower]:
+        for path in find_logs(self.paths, self.recursive):
+            if path not in self.followers:
+                self.followers[path] = LogFollower(path)
+        self.bytes_read += sum(fol.poll() for fol in self.followers.values())
+        return list(self.followers.values())
+
+
+def _fmt(x: Optional[float], spec: str) -> str:
+    return "-" if x is None else format(x, spec)
+
+def summary_table(followers: List[LogFollower], stall: float = STALL_SECONDS) -> str:
+    now = time.time()
+    rows = [f"{'Log':<40} {'Step':>5} {'SCF (Eh)':>15} {'TD (Eh)':>15} {'State':>5} {'eV':>7} {'f':>7} "
+            f"{'Root':>4} {'Conv':>5}  {'Status':<8} Flags"]
+    for fol in sorted(followers, key=lambda f: f.path):
+        name = os.path.basename(fol.path)
+        rows.append(f"{name[-40:]:<40} {_fmt(fol.step, 'd'):>5} {_fmt(fol.scf, '.8f'):>15} {_fmt(fol.td, '.8f'):>15} "
+                    f"{_fmt(fol.state, 'd'):>5} {_fmt(fol.state_e_eV, '.4f'):>7} {_fmt(fol.state_fosc, '.4f'):>7} "
+                    f"{_fmt(fol.root, 'd'):>4} {fol.converged():>5}  {fol.status(stall, now):<8} "
+                    f"{'; '.join(fol.flags())}")
+    return "\n".join(rows)
+
+def watch(paths: List[str], recursive: bool = False, interval: float = POLL_INTERVAL,
+          stall: float = STALL_SECONDS, once: bool = False, clear: bool = True) -> JobMonitor:
+    """Poll until interrupted (or once), printing the summary table after each poll."""
+    mon = JobMonitor(paths, recursive)
+    try:
+        while True:
+            t0 = time.perf_counter()
+            followers = mon.poll()
+            dt = time.perf_counter() - t0
+            if clear and not once:
+                print("\033[2J\033[H", end="")
+            print(summary_table(followers, stall))
+            print(f"\n{len(followers)} log(s), {mon.bytes_read / 1e6:.1f} MB read in total, "
+                  f"last poll {dt * 1000:.1f} ms  ({time.strftime('%H:%M:%S')})")
+            if once:
+                return mon
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return mon
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Live summary of running Gaussian jobs, reading only new log output.")
+    ap.add_argument("paths", nargs="*", default=["."], help="Logs or folders. Default: current directory.")
+    ap.add_argument("--recursive", "-r", action="store_true", help="Also search sub-directories of the folders.")
+    ap.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between polls.")
+    ap.add_argument("--stall", type=float, default=STALL_SECONDS,
+                    help="Report a running job as stalled after this many seconds without output.")
+    ap.add_argument("--once", action="store_true", help="Poll once and exit.")
+    ap.add_argument("--no-clear", action="store_true", help="Do not clear the screen between polls.")
+    args = ap.parse_args()
+    watch(args.paths, args.recursive, args.interval, args.stall, args.once, not args.no_clear)
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,103 @@
+"""
+In-process Peach Lambda index from an fchk and its log, without Multiwfn.
+
+    Lambda = sum_ia k_ia^2 O_ia / sum_ia k_ia^2,   O_ia = integral |phi_i| |phi_a| dr
+
+with k_ia the transition coefficients printed in the log. The spatial
+overlaps O_ia are the expensive part, so they are computed once per
+geometry: one Becke grid (becke_grid.py), the AOs evaluated on it in blocks,
+and the |phi_i||phi_a| integrals for every occupied/virtual pair that occurs
+in any state of the file. Every state is then a weighted sum over that table.
+Before integrating, the MOs involved must be orthonormal in the rebuilt basis
+(within dct_engine.ORTHO_TOL), as for dCT; otherwise a shell ordering or
+normalisation the basis does not reproduce would give a wrong Lambda silently.
+
+
+    lam = LambdaCalculator("scan_07.fchk")
+    lam.lambdas({1: [(73, 74, 0.698)], 2: [(72, 74, 0.69)]})   # {1: 0.71, 2: 0.35}
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from becke_grid import N_RADIAL, N_THETA, molecular_grid
+from dct_engine import ORTHO_TOL
+from fchk_reader import load_fchk
+from gto_basis import POINT_CHUNK, BasisSet
+
+PathLike = Union[str, Path]
+Transition = Tuple[int, int, float]
+
+
+class LambdaCalculator:
+    """Grid, AOs and MOs of one fchk; the overlap table is built once and reused per state."""
+
+    def __init__(self, fchk_path: PathLike, n_radial: int = N_RADIAL, n_theta: int = N_THETA):
+        fchk = load_fchk(fchk_path)
+        self.path = str(fchk_path)
+        self.basis = BasisSet.from_fchk(fchk)
+        self.C = np.asarray(fchk.alpha_mo_coefficients)
+        self.points, self.weights = molecular_grid(fchk.atomic_numbers, fchk.coordinates, n_radial, n_theta)
+
+    def overlaps(self, occ: Sequence[int], vir: Sequence[int]) -> np.ndarray:
+        """O[i, a] = integral |phi_i||phi_a| for 1-based MO indices, on the shared grid."""
+        occ_idx = np.asarray(occ, dtype=int) - 1
+        vir_idx = np.asarray(vir, dtype=int) - 1
+        O = np.zeros((len(occ_idx), len(vir_idx)))
+        for p0 in range(0, len(self.points), POINT_CHUNK):
+            ao = self.basis.evaluate(self.points[p0:p0 + POINT_CHUNK])
+            w = self.weights[p0:p0 + POINT_CHUNK]
+            mo_o = np.abs(ao @ self.C[occ_idx].T)
+            mo_v = np.abs(ao @ self.C[vir_idx].T)
+            O += (mo_o * w[:, None]).T @ mo_v
+        return O
+
+    def check(self, orbitals: Sequence[int]) -> float:
+        """Orthonormality error of the given (1-based) MOs in the rebuilt basis."""
+        idx = np.asarray(sorted(set(orbitals)), dtype=int) - 1
+        return self.basis.check_orthonormal(self.C[idx])
+
+    def lambdas(self, states: Mapping[int, Sequence[Transition]],
+                check: bool = True) -> Dict[int, Optional[float]]:
+        """Lambda for every state; the overlap table is built once for all of them."""
+        occ = sorted({t[0] for trans in states.values() for t in trans})
+        vir = sorted({t[1] for trans in states.values() for t in trans})
+        if not occ:
+            return {s: None for s in states}
+        if check:
+            err = self.check(occ + vir)
+            if err > ORTHO_TOL:
+                raise ValueError(f"{Path(self.path).name}: MOs are not orthonormal in the rebuilt basis "
+                                 f"(max |CSC^T - 1| = {err:.2e}); unsupported basis convention")
+        O = self.overlaps(occ, vir)
+        io = {o: k for k, o in enumerate(occ)}
+        iv = {v: k for k, v in enumerate(vir)}
+        out: Dict[int, Optional[float]] = {}
+        for s, trans in states.items():
+            if not trans:
+                out[s] = None
+                continue
+            k2 = np.array([c * c for _, _, c in trans])
+            o = np.array([O[io[i], iv[a]] for i, a, _ in trans])
+            out[s] = float((k2 * o).sum() / k2.sum())
+        return out
+
+def _batch_job(args) -> Tuple[Dict[int, Optional[float]], Optional[str]]:
+    path, states = args
+    try:
+        return LambdaCalculator(path).lambdas(states), None
+    except Exception as e:
+        return {}, str(e)
+
+def lambda_batch(items: Sequence[Tuple[PathLike, Mapping[int, Sequence[Transition]]]],
+                 jobs: int = 1) -> List[Tuple[Dict[int, Optional[float]], Optional[str]]]:
+    """Lambda for every state of every file; one (results, error) per item, in order."""
+    args = [(str(p), dict(st)) for p, st in items]
+    if jobs > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_batch_job, args))
+    return [_batch_job(a) for a in args]
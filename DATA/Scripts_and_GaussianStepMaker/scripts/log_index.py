@@ -0,0 +1,169 @@
+"""
+Byte-offset index of a Gaussian log, built over an mmap.
+
+build_index() memory-maps the log and records, with bytes.find, the offset
+of the start of every line carrying one of the MARKERS below (optimisation
+steps, TD blocks, orientation tables, ...). Nothing is decoded to str while
+indexing, and a parser that only needs "the last TD block" can then decode
+just that slice:
+
+    idx = load_index("04BN-1_ethanol_m062x_b3lyp_m062x.log")
+    for line in idx.block_lines("td_block", -1):
+        ...
+
+A compressed log is indexed in one streaming pass over its decompressed
+text instead, and read() decodes only the frames covering the slice when the
+file has a seek table (see compressed_log.py).
+
+The index is a plain dict of offset lists, so it serialises to JSON and can
+be kept in the parse cache (kind "index"); load_index() with a ParseCache
+rebuilds it only when the log's size or mtime has changed.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import compressed_log
+import log_scanner
+
+PathLike = Union[str, Path]
+
+INDEX_VERSION = 1
+
+# kind -> byte patterns that mark the line (any of them)
+MARKERS: Dict[str, Tuple[bytes, ...]] = {
+    "opt_step": (b" Step number ",),
+    "td_block": (b" Excitation energies and oscillator strengths:",),
+    "standard_orientation": (b"Standard orientation:",),
+    "input_orientation": (b"Input orientation:",),
+    "scf_done": (b" SCF Done:",),
+    "opt_flag": (b" This state for optimization",),
+    "freq_section": (b" Full mass-weighted force constant matrix:",),
+    "termination": (b" Normal termination", b" Error termination"),
+}
+
+# A block runs from its marker to the next marker of one of these kinds (or EOF).
+BOUNDARIES = ("opt_step", "td_block", "standard_orientation", "input_orientation", "scf_done", "termination")
+
+
+def _find_all(mm: mmap.mmap, pattern: bytes) -> List[int]:
+    """Line-start offsets of every occurrence of pattern."""
+    out = []
+    pos = mm.find(pattern)
+    while pos >= 0:
+        out.append(mm.rfind(b"\n", 0, pos) + 1)
+        pos = mm.find(pattern, pos + len(pattern))
+    return out
+
+
+class LogIndex:
+    def __init__(self, path: PathLike, size: int, offsets: Dict[str, List[int]]):
+        self.path = str(path)
+        self.size = size
+        self.offsets = offsets
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{k}={len(v)}" for k, v in self.offsets.items())
+        return f"LogIndex({Path(self.path).name}, {counts})"
+
+    def count(self, kind: str) -> int:
+        return len(self.offsets.get(kind, ()))
+
+    def offset(self, kind: str, i: int = -1) -> Optional[int]:
+        """Offset of the i-th marker of a kind (negative i counts from the end), or None."""
+        offs = self.offsets.get(kind, [])
+        try:
+            return offs[i]
+        except IndexError:
+            return None
+
+    def span(self, kind: str, i: int = -1) -> Optional[Tuple[int, int]]:
+        """(start, end) byte span of the i-th block of a kind; end is the next boundary marker or EOF."""
+        start = self.offset(kind, i)
+        if start is None:
+            return None
+        end = self.size
+        for b in BOUNDARIES:
+            offs = self.offsets.get(b, ())
+            j = bisect_right(offs, start)
+            if j < len(offs):
+                end = min(end, offs[j])
+        return start, end
+
+    def read(self, start: int, end: int) -> str:
+        """Decode only the bytes [start, end) of the log."""
+        if end <= start:
+            return ""
+        if log_scanner.read_stats is not None:
+            log_scanner.read_stats.bytes += end - start
+        if compressed_log.compression(self.path):
+            return compressed_log.read_range(self.path, start, end).decode("utf-8", errors="ignore")
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[start:end].decode("utf-8", errors="ignore")
+
+    def block_text(self, kind: str, i: int = -1) -> str:
+        sp = self.span(kind, i)
+        return self.read(*sp) if sp else ""
+
+    def block_lines(self, kind: str, i: int = -1) -> List[str]:
+        return self.block_text(kind, i).splitlines(keepends=True)
+
+    # -- serialisation ---------------------------------------------------------
+    def to_dict(self) -> Dict[str, object]:
+        return {"version": INDEX_VERSION, "size": self.size, "offsets": self.offsets}
+
+    @classmethod
+    def from_dict(cls, path: PathLike, d: Dict[str, object]) -> "LogIndex":
+        return cls(path, int(d["size"]), {k: list(v) for k, v in d["offsets"].items()})
+
+
+def build_index(path: PathLike) -> LogIndex:
+    """Scan the mmapped log once per marker with bytes.find and return its index."""
+    if compressed_log.compression(path):
+        return _build_index_stream(path)
+    size = os.path.getsize(path)
+    offsets: Dict[str, List[int]] = {k: [] for k in MARKERS}
+    if size == 0:
+        return LogIndex(path, 0, offsets)
+    if log_scanner.read_stats is not None:
+        log_scanner.read_stats.bytes += size
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for kind, patterns in MARKERS.items():
+            found: List[int] = []
+            for pat in patterns:
+                found.extend(_find_all(mm, pat))
+            offsets[kind] = sorted(set(found))
+    return LogIndex(path, size, offsets)
+
+def _build_index_stream(path: PathLike) -> LogIndex:
+    """build_index() of a compressed log: complete lines of each decompressed piece are searched."""
+    offsets: Dict[str, List[int]] = {k: [] for k in MARKERS}
+    base, carry = 0, b""
+    for chunk in compressed_log.iter_decompressed(path):
+        buf = carry + chunk
+        cut = buf.rfind(b"\n") + 1
+        for kind, patterns in MARKERS.items():
+            for pat in patterns:
+                offsets[kind].extend(base + o for o in _find_all(buf[:cut], pat))
+        base, carry = base + cut, buf[cut:]
+    for kind, patterns in MARKERS.items():   # last line without a newline
+        for pat in patterns:
+            offsets[kind].extend(base + o for o in _find_all(carry, pat))
+        offsets[kind] = sorted(set(offsets[kind]))
+    size = base + len(carry)
+    if log_scanner.read_stats is not None:
+        log_scanner.read_stats.bytes += size
+    return LogIndex(path, size, offsets)
+
+
+def load_index(path: PathLike, cache=None) -> LogIndex:
+    """Index for path, served from a ParseCache when one is given and the file is unchanged."""
+    if cache is None:
+        return build_index(path)
+    d = cache.fetch("index", path, lambda: build_index(path).to_dict(), params=f"v{INDEX_VERSION}")
+    return LogIndex.from_dict(path, d)
@@ -0,0 +1,440 @@
+"""
+Single-pass streaming scanner for Gaussian output files.
+
+Every parser in this folder used to read the whole .log with readlines() and
+then walk the list several times. scan_log() reads the file once, line by
+line, and yields small typed events instead, so memory stays constant no
+matter how many optimisation cycles the log contains:
+
+    for ev in scan_log("04BDP-NH2_2_water_m062x_def2SVP_ethanol.log"):
+        if isinstance(ev, ScfDone):
+            print(ev.lineno, ev.energy)
+
+Line numbers are 0-based, matching the list indices the old parsers used.
+Compressed logs (.gz, .bz2, .xz, .zst) are read through compressed_log.py by
+every reader below; offsets and sizes are then those of the decompressed text.
+"""
+from __future__ import annotations
+
+import io
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import compressed_log
+
+PathLike = Union[str, Path]
+
+EXCITED_HEADER_RE = re.compile(
+    r"Excited State\s+(\d+)\s*:\s*([A-Za-z\-]+)\s+([A-Za-z]+)?\s*([0-9.]+)\s*eV\s*([0-9.]+)\s*nm\s*f\s*=\s*([0-9.]+)",
+    re.IGNORECASE,
+)
+TRANSITION_RE = re.compile(r"^\s*(\d+)\s*->\s*(\d+)\s*([\-+]?[0-9]*\.?[0-9]+)\s*$")
+OPTIM_FLAG_RE = re.compile(r"This state for optimization and/or second-order correction\.", re.IGNORECASE)
+TD_TOTAL_E_RE = re.compile(r"Total Energy,\s*E\(TD-HF/TD-DFT\)\s*=\s*([\-+]?[0-9]*\.?[0-9]+)")
+SCF_DONE_RE = re.compile(r"SCF Done:\s*E\((\S+)\)\s*=\s*([-+]?\d+\.\d+)")
+CLR_RE = re.compile(r"correction\s*=?\s*([-+]?\d+\.\d+)")
+ROOT_RE = re.compile(r"Root\s*=\s*(\d+)", re.IGNORECASE)
+FLOAT_RE = re.compile(r"[-+]?\d+\.\d+")
+OPT_STEP_RE = re.compile(r"Step number\s+(\d+)")
+
+ELEMENTS = (
+    "X",
+    "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne",
+    "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar", "K", "Ca",
+    "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn",
+    "Ga", "Ge", "As", "Se", "Br", "Kr", "Rb", "Sr", "Y", "Zr",
+    "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn",
+    "Sb", "Te", "I", "Xe", "Cs", "Ba", "La", "Ce", "Pr", "Nd",
+    "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb",
+    "Lu", "Hf", "Ta", "W", "Re", "Os", "Ir", "Pt", "Au", "Hg",
+    "Tl", "Pb", "Bi", "Po", "At", "Rn",
+)
+
+TAIL_LINES = 5
+TAIL_BYTES = 8 * 1024          # enough for the last TAIL_LINES of any Gaussian log
+RSCAN_BLOCK = 64 * 1024        # block size for backward searches
+
+
+class ReadStats:
+    """Bytes and lines read through this module while a profiled stage is open."""
+    __slots__ = ("bytes", "lines")
+
+    def __init__(self):
+        self.bytes = 0
+        self.lines = 0
+
+# Set by parse_profile.py while a stage is profiled. The readers below add to
+# it once per call (never per line), so leaving it None costs nothing.
+read_stats: Optional[ReadStats] = None
+
+
+# ----------------------------------------------------------------------------
+# Events
+# ----------------------------------------------------------------------------
+class Route(NamedTuple):
+    """The '#' route section, continuation lines joined back together."""
+    lineno: int
+    text: str
+
+class ScfDone(NamedTuple):
+    lineno: int
+    method: str
+    energy: float
+
+class TdBlock(NamedTuple):
+    """'Excitation energies and oscillator strengths:' - start of a TD block."""
+    lineno: int
+
+class ExcitedState(NamedTuple):
+    lineno: int
+    state: int
+    multiplicity: str
+    e_eV: float
+    lam_nm: float
+    fosc: float
+
+class Transition(NamedTuple):
+    """'src -> dst coeff' line, belonging to the most recent ExcitedState."""
+    lineno: int
+    src: int
+    dst: int
+    coeff: float
+
+class OptFlag(NamedTuple):
+    """'This state for optimization and/or second-order correction.'"""
+    lineno: int
+
+class TdEnergy(NamedTuple):
+    """'Total Energy, E(TD-HF/TD-DFT) ='; text is the value as Gaussian printed it."""
+    lineno: int
+    energy: float
+    text: str = ""
+
+class ClrEnergy(NamedTuple):
+    """'Total energy after correction' from a cLR (corrected linear response) step."""
+    lineno: int
+    energy: float
+
+class OptStep(NamedTuple):
+    """' Step number N out of a maximum of M' - printed at the end of each optimisation cycle."""
+    lineno: int
+    step: int
+
+class ForceConstants(NamedTuple):
+    """' Full mass-weighted force constant matrix:' - start of a frequency section."""
+    lineno: int
+
+class LowFrequencies(NamedTuple):
+    lineno: int
+    values: Tuple[float, ...]
+
+class ImaginaryFreqs(NamedTuple):
+    """'imaginary frequencies (negative Signs)' warning."""
+    lineno: int
+
+class Termination(NamedTuple):
+    lineno: int
+    normal: bool
+    text: str
+
+class Geometry(NamedTuple):
+    """A 'Standard orientation:' or 'Input orientation:' block.
+
+    atoms holds (atomic_number, x, y, z) tuples in Angstrom.
+    """
+    lineno: int
+    kind: str
+    atoms: Tuple[Tuple[int, float, float, float], ...]
+
+class Convergence(NamedTuple):
+    """One row of an optimisation convergence table.
+
+    item is "Maximum Force", "RMS Force", "Maximum Displacement" or "RMS Displacement".
+    """
+    lineno: int
+    item: str
+    value: float
+    threshold: float
+    converged: bool
+
+class EndOfFile(NamedTuple):
+    """Last event of the file; tail holds the last TAIL_LINES raw lines."""
+    lineno: int
+    tail: Tuple[str, ...]
+
+
+EVENT_TYPES = (
+    Route, ScfDone, TdBlock, ExcitedState, Transition, OptFlag, TdEnergy, ClrEnergy, OptStep,
+    ForceConstants, LowFrequencies, ImaginaryFreqs, Termination, Geometry, Convergence, EndOfFile,
+)
+
+
+# ----------------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------------
+def open_log(path: PathLike) -> IO[str]:
+    """Open a Gaussian output for text reading; undecodable bytes are dropped."""
+    if compressed_log.compression(path):
+        return io.TextIOWrapper(compressed_log.open_stream(path), encoding="utf-8", errors="ignore")
+    return open(path, "r", encoding="utf-8", errors="ignore")
+
+def log_size(path: PathLike) -> int:
+    """Size of the log text in bytes (decompressed for a compressed log)."""
+    if compressed_log.compression(path):
+        return compressed_log.raw_size(path)
+    return os.path.getsize(path)
+
+def read_tail(path: PathLike, nbytes: int = TAIL_BYTES) -> str:
+    """Return (roughly) the last nbytes of a file as text, with a single seek."""
+    if compressed_log.compression(path):
+        data = compressed_log.read_tail(path, nbytes)
+    else:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - nbytes))
+            data = f.read()
+    if read_stats is not None:
+        read_stats.bytes += len(data)
+    return data.decode("utf-8", errors="ignore")
+
+def tail_lines(path: PathLike, n: int = TAIL_LINES) -> List[str]:
+    """Last n lines of a file (newlines kept), read from the end."""
+    # a compressed log without a seek table is not sized up front: a short read was the whole text
+    compressed = compressed_log.compression(path) is not None
+    size = 0 if compressed else os.path.getsize(path)
+    nbytes = TAIL_BYTES
+    while True:
+        # the first line of a partial read may be cut, so require one extra
+        text = read_tail(path, nbytes)
+        lines = text.splitlines(keepends=True)
+        if len(lines) > n or (len(text) < nbytes if compressed else nbytes >= size):
+            return lines[-n:]
+        nbytes *= 4
+
+def rfind_bytes(path: PathLike, needle: bytes, block_size: int = RSCAN_BLOCK) -> int:
+    """Byte offset of the last occurrence of needle, scanning backwards in blocks; -1 if absent.
+
+    Only the part of the file after the match is read, so markers near the
+    end of a large log cost a few blocks of I/O instead of the whole file
+    (a few frames for a compressed log with a seek table).
+    """
+    if compressed_log.compression(path):
+        return compressed_log.rfind(path, needle)
+    overlap = len(needle) - 1
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        end = f.tell()
+        carry = b""
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            buf = f.read(end - start) + carry
+            if read_stats is not None:
+                read_stats.bytes += end - start
+            pos = buf.rfind(needle)
+            if pos >= 0:
+                return start + pos
+            carry = buf[:overlap]
+            end = start
+    return -1
+
+def read_at(path: PathLike, offset: int, nbytes: int) -> str:
+    """Read nbytes of text starting at a byte offset."""
+    if compressed_log.compression(path):
+        data = compressed_log.read_range(path, offset, offset + nbytes)
+    else:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(nbytes)
+    if read_stats is not None:
+        read_stats.bytes += len(data)
+    return data.decode("utf-8", errors="ignore")
+
+def element_symbol(z: int) -> str:
+    return ELEMENTS[z] if 0 <= z < len(ELEMENTS) else str(z)
+
+def scan_log(path: PathLike, kinds: Optional[Iterable[type]] = None) -> Iterator[NamedTuple]:
+    """Yield events from a Gaussian log in file order.
+
+    kinds restricts the output to the given event classes; unwanted blocks
+    (geometries in particular) are then skipped without being parsed.
+    """
+    with open_log(path) as f:
+        try:
+            yield from scan_lines(f, kinds)
+        finally:
+            if read_stats is not None:
+                read_stats.bytes += f.buffer.tell()
+
+# Dispatch table: the first four characters of a line's first token decide
+# which (if any) handler looks at it, so almost every line is rejected with
+# one lstrip() and one dict lookup; regexes only run on candidate lines.
+_SCF, _EXCITED, _FLAG, _TOTAL, _GEOM, _LOW, _IMAG, _FC, _TERM, _STEP, _CONV = range(11)
+_PREFIXES = (
+    ("SCF ", _SCF, (ScfDone,)),                     # SCF Done:  E(RM062X) = ...
+    ("Exci", _EXCITED, (ExcitedState, Transition, TdBlock)),  # Excited State / Excitation energies
+    ("This", _FLAG, (OptFlag,)),                    # This state for optimization ...
+    ("Tota", _TOTAL, (TdEnergy, ClrEnergy)),        # Total Energy, E(TD-HF/TD-DFT) / Total energy after correction
+    ("Stan", _GEOM, (Geometry,)),                   # Standard orientation:
+    ("Inpu", _GEOM, (Geometry,)),                   # Input orientation:
+    ("Low ", _LOW, (LowFrequencies,)),              # Low frequencies ---
+    ("****", _IMAG, (ImaginaryFreqs,)),             # ****** 1 imaginary frequencies (negative Signs) ******
+    ("Full", _FC, (ForceConstants,)),               # Full mass-weighted force constant matrix:
+    ("Norm", _TERM, (Termination,)),                # Normal termination of Gaussian
+    ("Erro", _TERM, (Termination,)),                # Error termination via ...
+    ("Step", _STEP, (OptStep,)),                    # Step number   3 out of a maximum of  285
+    ("Maxi", _CONV, (Convergence,)),                # Maximum Force            0.038584     0.000450     NO
+    ("RMS ", _CONV, (Convergence,)),                # RMS     Displacement     0.015702     0.001200     NO
+)
+
+def _dispatch_table(want: set) -> Dict[str, int]:
+    return {prefix: tag for prefix, tag, kinds in _PREFIXES if want.intersection(kinds)}
+
+def scan_lines(lines: Iterable[str], kinds: Optional[Iterable[type]] = None) -> Iterator[NamedTuple]:
+    """Same as scan_log() but over any iterable of lines (file object, list, ...)."""
+    want = set(EVENT_TYPES if kinds is None else kinds)
+    dispatch = _dispatch_table(want)
+    w_route = Route in want
+    w_block = TdBlock in want
+    w_state = ExcitedState in want
+    w_trans = Transition in want
+    w_td = TdEnergy in want
+    w_clr = ClrEnergy in want
+    w_tail = EndOfFile in want
+
+    tail: deque = deque(maxlen=TAIL_LINES)
+    route_parts: Optional[list] = None
+    route_start = -1
+    route_done = not w_route
+    seen_state = False
+
+    # Geometry block state: dashes counts the separator lines seen so far.
+    geom_kind: Optional[str] = None
+    geom_start = -1
+    geom_dashes = 0
+    geom_atoms: list = []
+
+    idx = -1
+    for idx, line in enumerate(lines):
+        if w_tail:
+            tail.append(line)
+
+        if geom_kind is not None:
+            if line.startswith(" ---"):
+                geom_dashes += 1
+                if geom_dashes == 3:
+                    yield Geometry(geom_start, geom_kind, tuple(geom_atoms))
+                    geom_kind = None
+                continue
+            if geom_dashes == 2:
+                parts = line.split()
+                try:
+                    geom_atoms.append((int(parts[1]), float(parts[3]), float(parts[4]), float(parts[5])))
+                except (IndexError, ValueError):
+                    geom_kind = None
+            continue
+
+        if not route_done:
+            if route_parts is not None:
+                if line.startswith(" ---"):
+                    route_done = True
+                    yield Route(route_start, "".join(route_parts))
+                    route_parts = None
+                else:
+                    route_parts.append(line.rstrip("\n")[1:])
+                continue
+            if line.startswith(" #"):
+                route_parts = [line.rstrip("\n")[1:]]
+                route_start = idx
+                continue
+
+        tok = line.lstrip()[:4]
+        tag = dispatch.get(tok)
+        if tag is None:
+            # Transition lines ("  99 ->100   0.69632") are the only numeric lines of interest
+            if w_trans and seen_state and tok[:1].isdigit() and "->" in line:
+                m = TRANSITION_RE.match(line)
+                if m:
+                    yield Transition(idx, int(m.group(1)), int(m.group(2)), float(m.group(3)))
+            continue
+
+        if tag == _EXCITED:
+            if line.startswith(" Excited State"):
+                m = EXCITED_HEADER_RE.search(line)
+                if m:
+                    seen_state = True
+                    if w_state:
+                        yield ExcitedState(idx, int(m.group(1)), m.group(2),
+                                           float(m.group(4)), float(m.group(5)), float(m.group(6)))
+            elif w_block and "Excitation energies and oscillator strengths" in line:
+                yield TdBlock(idx)
+
+        elif tag == _TOTAL:
+            if w_td and "E(TD-HF/TD-DFT)" in line:
+                m = TD_TOTAL_E_RE.search(line)
+                if m:
+                    yield TdEnergy(idx, float(m.group(1)), m.group(1))
+            elif w_clr and "Total energy after correction" in line:
+                m = CLR_RE.search(line)
+                if m:
+                    yield ClrEnergy(idx, float(m.group(1)))
+
+        elif tag == _SCF:
+            m = SCF_DONE_RE.search(line)
+            if m:
+                yield ScfDone(idx, m.group(1), float(m.group(2)))
+
+        elif tag == _FLAG:
+            if OPTIM_FLAG_RE.search(line):
+                yield OptFlag(idx)
+
+        elif tag == _GEOM:
+            s = line.strip()
+            if s == "Standard orientation:" or s == "Input orientation:":
+                geom_kind = s.split()[0]
+                geom_start = idx
+                geom_dashes = 0
+                geom_atoms = []
+
+        elif tag == _LOW:
+            if line.startswith(" Low frequencies ---"):
+                yield LowFrequencies(idx, tuple(float(x) for x in FLOAT_RE.findall(line)))
+
+        elif tag == _IMAG:
+            if "imaginary frequencies (negative Signs)" in line:
+                yield ImaginaryFreqs(idx)
+
+        elif tag == _FC:
+            if line.startswith(" Full mass-weighted force constant matrix:"):
+                yield ForceConstants(idx)
+
+        elif tag == _TERM:
+            if line.startswith(" Normal termination") or line.startswith(" Error termination"):
+                yield Termination(idx, tok == "Norm", line.strip())
+
+        elif tag == _STEP:
+            if line.startswith(" Step number"):
+                m = OPT_STEP_RE.match(line, 1)
+                if m:
+                    yield OptStep(idx, int(m.group(1)))
+
+        elif tag == _CONV:
+            parts = line.split()
+            if len(parts) == 5 and (parts[1] == "Force" or parts[1] == "Displacement"):
+                try:
+                    yield Convergence(idx, f"{parts[0]} {parts[1]}", float(parts[2]), float(parts[3]),
+                                      parts[4] == "YES")
+                except ValueError:   # '********' for values too large to print
+                    pass
+
+    if read_stats is not None:
+        read_stats.lines += idx + 1
+    if w_tail:
+        yield EndOfFile(idx + 1, tuple(tail))
+
+def find_root_in_route(route: str) -> Optional[int]:
+    m = ROOT_RE.search(route)
+    return int(m.group(1)) if m else None
@@ -2,41 +2,77 @@
 Syed Ali Abbas Abedi
 
 """
+import argparse
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_last_geometry(logfile_path):
+from compressed_log import is_log_file, strip_compression, unique_logs
+from log_scanner import (
+    Geometry, Route, element_symbol, log_size, read_at, rfind_bytes, scan_lines, scan_log, tail_lines,
+)
+
+# The last Standard orientation is preferred; Input orientation is used for nosymm jobs
+GEOMETRY_MARKERS = (b"Standard orientation:", b"Input orientation:")
+GEOMETRY_READ_BYTES = 16 * 1024   # first read of a geometry block; grown until the table is closed
+HEAD_READ_BYTES = 64 * 1024       # first read of the job header; grown until "Charge =" is reached
+HEAD_MAX_BYTES = 8 * 1024 * 1024
+
+CHARGE_RE = re.compile(r"Charge\s*=\s*(-?\d+)\s+Multiplicity\s*=\s*(\d+)")
+# Coordinates are written explicitly, so the route must not read them from the checkpoint
+GEOM_CHECK_RE = re.compile(r"\s+geom(?:etry)?\s*=\s*(?:\(\s*(?:all)?check\s*\)|(?:all)?check)", re.IGNORECASE)
+
+DEFAULT_HEADER = {
+    "link0": [],
+    "route": "#p opt freq b3lyp/6-31g(d)",
+    "title": "Title Card Required",
+    "charge": 0,
+    "multiplicity": 1,
+}
+
+def read_last_geometry(logfile_path):
     """
-    Extract the last geometry block from the .log file.
+    Atoms (atomic_number, x, y, z) of the last orientation block, read from the end.
+
+    The block is located with a backward byte search and only its own bytes are
+    decoded and parsed; None if the log has no complete orientation table.
     """
-    geometry_blocks = []
-    current_block = []
+    size = log_size(logfile_path)
+    for marker in GEOMETRY_MARKERS:
+        offset = rfind_bytes(logfile_path, marker)
+        if offset < 0:
+            continue
+        nbytes = GEOMETRY_READ_BYTES
+        while True:
+            lines = read_at(logfile_path, offset, nbytes).splitlines(keepends=True)
+            for ev in scan_lines(lines, (Geometry,)):
+                if ev.atoms:
+                    return ev.atoms
+            if offset + nbytes >= size:
+                break   # table cut off by the end of the file (job killed while printing it)
+            nbytes *= 4
+    return None
 
-    # Regex to match lines that start with an optional space, then one or more word characters (atom symbol),
-    # followed by one or more spaces, and then three floating-point numbers (coordinates).
-    # Examples: " C    0.000000    0.000000    0.000000"
-    #           "H  -1.234567  0.987654  -0.123456"
-    atom_line_regex = re.compile(r'^\s*\w+\s+[-+]?\d+\.\d+\s+[-+]?\d+\.\d+\s+[-+]?\d+\.\d+')
+def extract_last_geometry(logfile_path):
+    """
+    Extract the last geometry block from the .log file.
 
+    Only real 'Standard orientation:' / 'Input orientation:' tables are
+    considered (Standard preferred); atomic numbers are mapped to element
+    symbols, e.g. " C    0.000000    0.000000    0.000000".
+    """
     try:
-        with open(logfile_path, 'r') as f:
-            lines = f.readlines()
-
-        for line in lines:
-            if atom_line_regex.match(line):
-                current_block.append(line)
-            elif current_block: # If a line doesn't match the regex and we have a current block, it means the block ended
-                geometry_blocks.append(current_block)
-                current_block = [] # Reset for the next block
-
-        # Add the last block if the file ends with a geometry block
-        if current_block:
-            geometry_blocks.append(current_block)
-
-        if geometry_blocks:
-            return geometry_blocks[-1] # Return the very last complete geometry block
-        else:
+        atoms = read_last_geometry(logfile_path)
+        if atoms is None:
+            # The last table is incomplete: fall back to the last complete one in a forward scan
+            last = {}
+            for ev in scan_log(logfile_path, (Geometry,)):
+                if ev.atoms:
+                    last[ev.kind] = ev.atoms
+            atoms = last.get("Standard") or last.get("Input")
+        if not atoms:
             return [] # No geometry blocks found
+        return [f" {element_symbol(z):<2}  {x:12.6f}  {y:12.6f}  {z_:12.6f}\n" for z, x, y, z_ in atoms]
 
     except FileNotFoundError:
         print(f"Error: The file '{logfile_path}' was not found.")
@@ -45,18 +81,62 @@ def extract_last_geometry(logfile_path):
         print(f"An error occurred while reading '{logfile_path}': {e}")
         return []
 
-def save_to_com(com_path, geometry_lines):
+def extract_job_header(logfile_path):
+    """
+    Link 0 lines (%chk, %mem, ...), route, title, charge and multiplicity of the job.
+
+    Only the head of the log is read, up to the 'Charge = ... Multiplicity = ...'
+    line; fields that cannot be found keep the DEFAULT_HEADER values. A
+    geom=check / geom=allcheck option is dropped from the route, since the new
+    input carries explicit coordinates.
+    """
+    header = dict(DEFAULT_HEADER, link0=[])
+    nbytes = HEAD_READ_BYTES
+    while True:
+        text = read_at(logfile_path, 0, nbytes)
+        m = CHARGE_RE.search(text)
+        if m or len(text) < nbytes or nbytes >= HEAD_MAX_BYTES:
+            break
+        nbytes *= 4
+    head = text[:m.end()] if m else text
+    lines = head.splitlines(keepends=True)
+
+    route_line = None
+    for ev in scan_lines(lines, (Route,)):
+        header["route"] = GEOM_CHECK_RE.sub("", ev.text.strip())
+        route_line = ev.lineno
+        break
+    for line in lines[:route_line]:
+        if line.startswith(" %"):
+            header["link0"].append(line.strip())
+    if m:
+        header["charge"], header["multiplicity"] = int(m.group(1)), int(m.group(2))
+        # The title is the dashed-framed text just before the charge line
+        dashes = [i for i, line in enumerate(lines) if line.startswith(" ---")]
+        if route_line is not None:
+            dashes = [i for i in dashes if i > route_line + 1]
+        if len(dashes) >= 2:
+            title = " ".join(line.strip() for line in lines[dashes[-2] + 1:dashes[-1]]).strip()
+            if title:
+                header["title"] = title
+    return header
+
+def save_to_com(com_path, geometry_lines, header=None):
     """
     Save geometry block to a .com file at com_path.
-    Includes standard Gaussian input header.
+
+    header (from extract_job_header) supplies the Link 0 lines, route, title,
+    charge and multiplicity; without it a standard Gaussian input header is used.
     """
     base_name = os.path.basename(os.path.splitext(com_path)[0])
+    header = header or DEFAULT_HEADER
+    link0 = header["link0"] or [f'%chk={base_name}.chk']
     try:
         with open(com_path, 'w') as f:
-            f.write(f'%chk={base_name}.chk\n')
-            f.write('#p opt freq b3lyp/6-31g(d)\n\n')
-            f.write('Title Card Required\n\n')
-            f.write('0 1\n') # Charge and Multiplicity (e.g., 0 1 for neutral singlet)
+            f.writelines(line + '\n' for line in link0)
+            f.write(f'{header["route"]}\n\n')
+            f.write(f'{header["title"]}\n\n')
+            f.write(f'{header["charge"]} {header["multiplicity"]}\n') # Charge and Multiplicity
             f.writelines(geometry_lines)
             f.write('\n') # Ensure a newline at the end of the geometry block for proper formatting
         print(f"Successfully saved: {com_path}")
@@ -65,38 +145,68 @@ def save_to_com(com_path, geometry_lines):
     except Exception as e:
         print(f"An unexpected error occurred while saving '{com_path}': {e}")
 
+def log_to_com(log_path, suffix="", only_unfinished=False):
+    """Write <log basename><suffix>.com next to the log; returns (com_path or None, message)."""
+    if only_unfinished:
+        tail = tail_lines(log_path, 5)
+        if tail and "Normal termination of Gaussian" in tail[-1]:
+            return None, "finished normally, skipped"
+    geometry = extract_last_geometry(log_path)
+    if not geometry:
+        return None, "no geometry found, skipped"
+    com_path = os.path.splitext(strip_compression(log_path))[0] + suffix + '.com'
+    save_to_com(com_path, geometry, extract_job_header(log_path))
+    return com_path, "written"
 
-if __name__ == "__main__":
-    current_dir = os.getcwd()
-    print(f"Starting to process .log files in folder: {current_dir}")
+def find_logs(paths, recursive=False):
+    """.log files (compressed too) in the given files/directories (sub-directories too with recursive=True)."""
+    out = []
+    for p in paths:
+        if os.path.isfile(p):
+            out.append(p)
+        elif recursive:
+            for root, _, files in os.walk(p):
+                out.extend(os.path.join(root, f) for f in files if is_log_file(f, ('.log',)))
+        elif os.path.isdir(p):
+            out.extend(os.path.join(p, f) for f in os.listdir(p) if is_log_file(f, ('.log',)))
+    return sorted(unique_logs(out))
 
-    # Check if the directory exists
-    if not os.path.isdir(current_dir):
-        print(f"Error: The directory '{current_dir}' does not exist or is not accessible.")
+def _convert(args):
+    log_path, suffix, only_unfinished = args
+    return (log_path,) + log_to_com(log_path, suffix, only_unfinished)
+
+def convert_all(log_files, suffix="", only_unfinished=False, jobs=1):
+    """log_to_com() over many logs, in worker processes when jobs > 1; [(log, com or None, message)]."""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    work = [(f, suffix, only_unfinished) for f in log_files]
+    if jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_convert, work, chunksize=8))
+    return [_convert(w) for w in work]
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Write a Gaussian .com from the last geometry of each .log "
+                                             "(route, charge/multiplicity and %chk taken from the log).")
+    ap.add_argument("paths", nargs="*", default=["."], help="Logs or folders. Default: current directory.")
+    ap.add_argument("--recursive", "-r", action="store_true", help="Also search sub-directories of the folders.")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes (0 = all cores).")
+    ap.add_argument("--suffix", type=str, default="", help="Appended to the log basename, e.g. _restart.")
+    ap.add_argument("--only-unfinished", action="store_true", help="Skip logs that ended in Normal termination.")
+    args = ap.parse_args()
+
+    print(f"Starting to process .log files in: {', '.join(args.paths)}")
+    log_files = find_logs(args.paths, args.recursive)
+    if not log_files:
+        print("No .log files found.")
     else:
-        log_files_found = False
-        for filename in os.listdir(current_dir):
-            if filename.lower().endswith('.log'):
-                log_files_found = True
-                log_path = os.path.join(current_dir, filename)
-                print(f"\nProcessing file: {log_path}")
-                
-                # Check if the log file actually exists before trying to process it
-                if not os.path.exists(log_path):
-                    print(f"Warning: File not found at expected path: {log_path}. Skipping.")
-                    continue
-
-                last_geometry = extract_last_geometry(log_path)
-                if last_geometry:
-                    # Save .com with same basename and same folder as .log file
-                    base = os.path.splitext(filename)[0]
-                    com_path = os.path.join(current_dir, base + '.com')
-                    save_to_com(com_path, last_geometry)
-                else:
-                    print(f"No geometry found in {filename}. Skipping .com file creation.")
-        
-        if not log_files_found:
-            print(f"No .log files found in the directory: {current_dir}")
-        else:
-            print("\nFinished processing all .log files.")
+        results = convert_all(log_files, args.suffix, args.only_unfinished, args.jobs)
+        for log_path, com_path, message in results:
+            if com_path is None:
+                print(f"{log_path}: {message}")
+        written = sum(1 for _, com_path, _ in results if com_path)
+        print(f"\nFinished processing {len(log_files)} .log files ({written} .com written).")
 
+if __name__ == "__main__":
+    cli()
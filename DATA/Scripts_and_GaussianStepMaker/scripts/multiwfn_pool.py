@@ -0,0 +1,166 @@
+"""
+Concurrent Multiwfn runner: many Multiwfn sessions at once.
+
+Each Multiwfn launch reloads the whole fchk, so for dCT every orbital pair of
+a file is written into a single menu script and the stdout is split back into
+per-state results. Lambda keeps the menu answers of the original calc_lambda
+script, one state per session; its sessions run concurrently like the others:
+
+    dCT     100 -> 11, then one "start,end" (+ "n") per orbital pair, "0,0" to leave
+    Lambda  18 -> 14, ENTER to load the log, the state, "n", "n" (no further analysis)
+
+The sessions run under asyncio (asyncio.create_subprocess_exec) with at most
+`jobs` Multiwfn processes alive, a timeout per session and a bounded number
+of retries for sessions that time out or crash. The batch functions have the
+same (results, error) per item interface as dct_engine.dct_batch() and
+lambda_engine.lambda_batch():
+
+    multiwfn_dct_batch(MULTIWFN_PATH, [("scan_01.fchk", [(1, (73, 74))])], jobs=8)
+    -> [({1: 2.31}, None)]
+
+Given a `timings` dict, the batch functions also add up the wall time of
+each file's sessions (retries included) under str(fchk), for --profile.
+
+A `.py` executable is started with the current interpreter, so the stand-in
+multiwfn_stub.py can replace the real binary for testing and benchmarking.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+PathLike = Union[str, Path]
+Result = Tuple[Dict[int, Optional[float]], Optional[str]]
+# (state index, (start, end) orbital pair)
+PairSpec = Tuple[int, Tuple[int, int]]
+
+TIMEOUT = 600.0    # seconds per Multiwfn session
+RETRIES = 1        # extra attempts for a session that timed out or crashed
+
+_LAMBDA_RE = re.compile(r"lambda\s*=\s*(\S+)")
+
+
+class MultiwfnError(RuntimeError):
+    pass
+
+
+# -- session scripts and output demultiplexing ---------------------------------
+def dct_script(pairs: Sequence[Tuple[int, int]]) -> List[str]:
+    """Orbital centroid distances (100 -> 11) for every pair in one session."""
+    cmds = ["100", "11"]
+    for start, end in pairs:
+        cmds += [f"{start},{end}", "n"]
+    return cmds + ["0,0", "0", "q"]
+
+def parse_dct(stdout: str, n_pairs: int) -> List[float]:
+    """The "Centroid distance" values, in the order the pairs were sent."""
+    values = [float(line.split(":")[-1].strip().split()[0])
+              for line in stdout.splitlines() if "Centroid distance" in line]
+    if len(values) != n_pairs:
+        raise MultiwfnError(f"expected {n_pairs} centroid distances, got {len(values)}")
+    return values
+
+def lambda_script(state: int) -> List[str]:
+    """Lambda index (18 -> 14) of one state in one session."""
+    return ["18",         # Electron excitation analysis
+            "14",         # Calculate lambda index
+            "",           # Press ENTER to load the matching .log file
+            str(state),   # Excited state to analyse
+            "n",          # Print contributions? -> No
+            "n",          # Do analysis again? -> No
+            "0",          # Return
+            "q"]          # Quit
+
+def parse_lambda(stdout: str) -> Optional[float]:
+    """The value of the first line such as "Excited state 1: lambda = 0.683489"."""
+    m = _LAMBDA_RE.search(stdout)
+    return float(m.group(1)) if m else None
+
+
+# -- runner ----------------------------------------------------------------------
+def _command(exe: PathLike, fchk_path: PathLike) -> List[str]:
+    exe = os.path.abspath(exe) if os.path.exists(exe) else str(exe)   # sessions run in the fchk's folder
+    if exe.endswith(".py"):
+        return [sys.executable, exe, str(fchk_path)]
+    return [exe, str(fchk_path)]
+
+async def run_session(exe: PathLike, fchk_path: PathLike, commands: Sequence[str],
+                      timeout: float = TIMEOUT, retries: int = RETRIES) -> str:
+    """Feed one menu script to Multiwfn on fchk_path and return its stdout."""
+    stdin = ("\n".join(commands) + "\n").encode()
+    cwd = str(Path(fchk_path).resolve().parent)
+    last = ""
+    for _ in range(retries + 1):
+        proc = await asyncio.create_subprocess_exec(
+            *_command(exe, Path(fchk_path).name), cwd=cwd,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(stdin), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            last = f"timed out after {timeout:g} s"
+            continue
+        if proc.returncode == 0:
+            return out.decode("utf-8", errors="ignore")
+        last = f"exit code {proc.returncode}"
+    raise MultiwfnError(f"{Path(fchk_path).name}: Multiwfn {last}")
+
+async def _gather(exe, jobs, timeout, retries, sessions, timings=None) -> List[Result]:
+    """sessions: (fchk, commands, parse) per item; parse(stdout) -> {state: value}."""
+    limit = asyncio.Semaphore(jobs)
+
+    async def one(fchk, commands, parse) -> Result:
+        async with limit:
+            t0 = time.perf_counter()
+            try:
+                return parse(await run_session(exe, fchk, commands, timeout, retries)), None
+            except (OSError, MultiwfnError, ValueError) as e:
+                return {}, str(e)
+            finally:
+                if timings is not None:
+                    timings[str(fchk)] = timings.get(str(fchk), 0.0) + time.perf_counter() - t0
+
+    return await asyncio.gather(*(one(*s) for s in sessions))
+
+def _run(exe, jobs, timeout, retries, sessions, timings=None) -> List[Result]:
+    return asyncio.run(_gather(exe, max(1, jobs or os.cpu_count() or 1), timeout, retries, sessions, timings))
+
+
+def multiwfn_dct_batch(exe: PathLike, items: Sequence[Tuple[PathLike, Sequence[PairSpec]]],
+                       jobs: Optional[int] = None, timeout: float = TIMEOUT,
+                       retries: int = RETRIES, timings: Optional[Dict[str, float]] = None) -> List[Result]:
+    """Orbital-pair dCT (Angstrom) for every state of every file; jobs=None uses all cores."""
+    sessions = []
+    for fchk, specs in items:
+        specs = list(specs)
+        pairs = [pair for _, pair in specs]
+
+        def parse(stdout, specs=specs):
+            return {s: d for (s, _), d in zip(specs, parse_dct(stdout, len(specs)))}
+
+        sessions.append((fchk, dct_script(pairs), parse))
+    return _run(exe, jobs, timeout, retries, sessions, timings)
+
+def multiwfn_lambda_batch(exe: PathLike, items: Sequence[Tuple[PathLike, Sequence[int]]],
+                          jobs: Optional[int] = None, timeout: float = TIMEOUT,
+                          retries: int = RETRIES, timings: Optional[Dict[str, float]] = None) -> List[Result]:
+    """Lambda for the given states of every file, one session per state; a state whose
+    output has no value maps to None, a failed session makes its file an error."""
+    sessions, owners = [], []
+    for k, (fchk, states) in enumerate(items):
+        for state in states:
+            sessions.append((fchk, lambda_script(state), lambda stdout, state=state: {state: parse_lambda(stdout)}))
+            owners.append(k)
+    results: List[Result] = [({}, None) for _ in items]
+    for k, (values, err) in zip(owners, _run(exe, jobs, timeout, retries, sessions, timings)):
+        if err:
+            results[k] = ({}, results[k][1] or err)
+        elif not results[k][1]:
+            results[k][0].update(values)
+    return results
@@ -0,0 +1,50 @@
+"""
+Stand-in for the Multiwfn executable, for testing and benchmarking multiwfn_pool.
+
+It accepts the two menu paths the PET scripts use and prints the result lines
+in Multiwfn's format, without reading the fchk:
+
+    100 -> 11   "start,end" pairs (each followed by "n") until "0,0"
+                -> " Centroid distance between the two orbitals:   d Angstrom"
+    18 -> 14    log prompt, state, "n", "n" (one state per session)
+                -> " Excited state N: lambda = x"
+
+Values are a deterministic function of the input so results can be checked.
+MULTIWFN_STUB_DELAY (seconds) adds a sleep per session to mimic the fchk load.
+
+    python multiwfn_stub.py scan_01.fchk < commands.txt
+"""
+import os
+import sys
+import time
+
+
+def _dct(start: int, end: int) -> float:
+    return round(0.1 * abs(end - start) + 0.01 * (start % 7), 6)
+
+def _lambda(state: int) -> float:
+    return round(1.0 / (1 + state), 6)
+
+def main() -> None:
+    time.sleep(float(os.environ.get("MULTIWFN_STUB_DELAY", "0")))
+    cmds = iter(line.strip() for line in sys.stdin.read().splitlines())
+    print(f" Loading {sys.argv[1] if len(sys.argv) > 1 else '?'} ... Done!")
+    for cmd in cmds:
+        if cmd == "100" and next(cmds, "") == "11":
+            for pair in cmds:
+                if pair == "0,0":
+                    break
+                start, end = (int(x) for x in pair.split(","))
+                print(f" Centroid distance between the two orbitals:   {_dct(start, end):.6f} Angstrom")
+                next(cmds, "")
+        elif cmd == "18" and next(cmds, "") == "14":
+            next(cmds, "")
+            state = int(next(cmds, "1") or 1)
+            print(f" Excited state {state}: lambda = {_lambda(state):.6f}")
+            next(cmds, "")
+            next(cmds, "")
+        elif cmd == "q":
+            break
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Persistent on-disk cache for parsed log records.
+
+Finished Gaussian logs never change, so re-parsing a whole project tree on
+every run is wasted work. ParseCache stores each parsed record in a SQLite
+file (.petcache/parse_cache.sqlite in the working directory) keyed by
+
+    (kind, absolute path, params)  ->  size, mtime_ns, [tail hash], record
+
+A record is reused only while the file's size and mtime_ns (and, with
+hash_tail=True, a hash of its last TAIL_BYTES) are unchanged, so new and
+still-growing logs are always parsed again. Rows whose source file has
+disappeared are dropped by evict_missing().
+
+    with ParseCache() as cache:
+        rec = cache.fetch("tddft", path, lambda: parse_file(path), params="t=0.3")
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+try:
+    import xxhash
+except ImportError:  # optional; hashlib is used instead
+    xxhash = None
+
+PathLike = Union[str, Path]
+
+CACHE_DIR = ".petcache"
+CACHE_FILE = "parse_cache.sqlite"
+TAIL_BYTES = 64 * 1024
+SCHEMA_VERSION = 3   # bump whenever a cached record layout changes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind      TEXT    NOT NULL,
+    path      TEXT    NOT NULL,
+    params    TEXT    NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    tail_hash TEXT,
+    data      TEXT    NOT NULL,
+    PRIMARY KEY (kind, path, params)
+)
+"""
+
+
+def tail_hash(path: PathLike, nbytes: int = TAIL_BYTES) -> str:
+    """Hash of the last nbytes of a file (xxh64 if available, else blake2b)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - nbytes))
+        chunk = f.read()
+    if xxhash is not None:
+        return xxhash.xxh64(chunk).hexdigest()
+    return hashlib.blake2b(chunk, digest_size=8).hexdigest()
+
+
+class ParseCache:
+    """SQLite-backed record cache. With enabled=False every lookup misses and nothing is written."""
+
+    def __init__(self, root: PathLike = ".", enabled: bool = True, rebuild: bool = False,
+                 hash_tail: bool = False):
+        self.enabled = enabled
+        self.hash_tail = hash_tail
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending = 0
+        if not enabled:
+            return
+        cache_dir = Path(root) / CACHE_DIR
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(cache_dir / CACHE_FILE))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if rebuild or version != SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS records")
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    # -- context manager -----------------------------------------------------
+    def __enter__(self) -> "ParseCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    # -- core ----------------------------------------------------------------
+    def _signature(self, path: PathLike) -> Tuple[str, int, int, Optional[str]]:
+        p = os.path.abspath(path)
+        st = os.stat(p)
+        return p, st.st_size, st.st_mtime_ns, (tail_hash(p) if self.hash_tail else None)
+
+    def get(self, kind: str, path: PathLike, params: str = "") -> Optional[Dict[str, object]]:
+        if self._conn is None:
+            self.misses += 1
+            return None
+        p, size, mtime_ns, th = self._signature(path)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, tail_hash, data FROM records WHERE kind=? AND path=? AND params=?",
+            (kind, p, params),
+        ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns or (th is not None and row[2] != th):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[3])
+
+    def put(self, kind: str, path: PathLike, record: Dict[str, object], params: str = "") -> None:
+        if self._conn is None:
+            return
+        p, size, mtime_ns, th = self._signature(path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO records (kind, path, params, size, mtime_ns, tail_hash, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, p, params, size, mtime_ns, th, json.dumps(record)),
+        )
+        self._pending += 1
+        if self._pending >= 500:
+            self._conn.commit()
+            self._pending = 0
+
+    def fetch(self, kind: str, path: PathLike, compute: Callable[[], Dict[str, object]],
+              params: str = "") -> Dict[str, object]:
+        """Return the cached record for path, or compute(), store and return it."""
+        rec = self.get(kind, path, params)
+        if rec is None:
+            rec = compute()
+            self.put(kind, path, rec, params)
+        return rec
+
+    def evict_missing(self) -> int:
+        """Delete rows whose source file no longer exists; returns how many were dropped."""
+        if self._conn is None:
+            return 0
+        paths = [r[0] for r in self._conn.execute("SELECT DISTINCT path FROM records")]
+        gone = [(p,) for p in paths if not os.path.exists(p)]
+        if gone:
+            self._conn.executemany("DELETE FROM records WHERE path=?", gone)
+            self._conn.commit()
+        return len(gone)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Cache: disabled"
+        return f"Cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def add_cache_arguments(ap) -> None:
+    """Add the shared --no-cache / --rebuild-cache switches to an argparse parser."""
+    ap.add_argument("--no-cache", action="store_true", help=f"Do not read or write the {CACHE_DIR}/ parse cache.")
+    ap.add_argument("--rebuild-cache", action="store_true", help="Discard the parse cache and re-parse every file.")
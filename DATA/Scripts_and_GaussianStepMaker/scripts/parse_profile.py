@@ -0,0 +1,176 @@
+"""
+Opt-in per-file, per-stage profile of a parser run (--profile).
+
+    prof = Profile("tddft", "tddft_profile.jsonl", reset=True)   # Profile("tddft") is disabled
+    with prof.stage("scan", path):
+        for ev in prof.events(scan_log(path, KINDS)):   # counts the events (regex hits) by kind
+            ...
+    with prof.stage("write_csv"):                       # run-level stage (no file)
+        ...
+    prof.external("multiwfn", fchk, seconds)            # time spent in an external process
+    print(prof.summary())
+
+Every closed stage appends one JSON line to the trace:
+
+    {"tool": "tddft", "pid": 4121, "file": "runs/04BDP-NH2_m062x_def2SVP_ethanol.log", "stage": "scan",
+     "elapsed_s": 0.0153, "external_s": 0.0, "bytes": 2031616, "lines": 41102,
+     "hits": {"ExcitedState": 270, "Transition": 540, "OptFlag": 54, "TdEnergy": 54, "Route": 1}}
+
+bytes and lines are counted by the log_scanner readers (scan_log, scan_lines,
+read_tail, read_at, rfind_bytes) and the log_index mmap reads through
+log_scanner.read_stats, which is set only while a stage is open. Pool workers get the trace path, build their own
+Profile and append whole lines, so `--jobs N` runs are traced as well;
+summary() aggregates the trace file.
+
+A disabled Profile hands out one shared no-op context manager from stage()
+and returns the iterator given to events() unchanged, so the parsers' loops
+are exactly the unprofiled ones; log_scanner pays one `is None` test per
+file read.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import log_scanner
+
+PathLike = Union[str, Path]
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ("prof", "file", "name", "stats", "hits", "external", "t0", "prev")
+
+    def __init__(self, prof: "Profile", name: str, file: Optional[PathLike]):
+        self.prof = prof
+        self.name = name
+        self.file = None if file is None else str(file)
+        self.hits: Counter = Counter()
+        self.external = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.prev = (log_scanner.read_stats, self.prof._current)
+        self.stats = log_scanner.read_stats = log_scanner.ReadStats()
+        self.prof._current = self
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        elapsed = time.perf_counter() - self.t0
+        log_scanner.read_stats, self.prof._current = self.prev
+        outer = self.prev[1]
+        if outer is not None:   # a nested stage's reads and hits also count for the enclosing one
+            outer.stats.bytes += self.stats.bytes
+            outer.stats.lines += self.stats.lines
+            outer.hits.update(self.hits)
+        self.prof._write({
+            "tool": self.prof.tool, "pid": os.getpid(), "file": self.file, "stage": self.name,
+            "elapsed_s": elapsed, "external_s": self.external,
+            "bytes": self.stats.bytes, "lines": self.stats.lines, "hits": dict(self.hits),
+        })
+
+
+class Profile:
+    """Stage recorder of one tool; trace=None disables it."""
+
+    def __init__(self, tool: str, trace: Optional[PathLike] = None, reset: bool = False):
+        self.tool = tool
+        self.trace = None if trace is None else str(trace)
+        self.enabled = trace is not None
+        self._current: Optional[_Stage] = None
+        if self.enabled and reset:
+            open(self.trace, "w").close()
+
+    def __bool__(self) -> bool:
+        return self.enabled
+
+    def stage(self, name: str, file: Optional[PathLike] = None):
+        """Context manager timing one stage of one file (or of the whole run when file is None)."""
+        return _Stage(self, name, file) if self.enabled else _NULL_STAGE
+
+    def events(self, events: Iterable) -> Iterable:
+        """Pass scanner events through, counting them by kind into the open stage."""
+        if not self.enabled:
+            return events
+        return self._count(events)
+
+    def _count(self, events: Iterable) -> Iterator:
+        for ev in events:
+            if self._current is not None:
+                self._current.hits[type(ev).__name__] += 1
+            yield ev
+
+    def hit(self, kind: str, n: int = 1) -> None:
+        """Count matches made outside the scanner (e.g. a regex over a block read with read_at)."""
+        if self.enabled and self._current is not None:
+            self._current.hits[kind] += n
+
+    def external(self, name: str, file: Optional[PathLike], seconds: float) -> None:
+        """Record time spent in an external process (Multiwfn), per file and in the open stage.
+
+        The record has elapsed_s 0: the time already counts in the stage that waited for it.
+        """
+        if self.enabled:
+            if self._current is not None:
+                self._current.external += seconds
+            self._write({"tool": self.tool, "pid": os.getpid(),
+                         "file": None if file is None else str(file), "stage": name,
+                         "elapsed_s": 0.0, "external_s": seconds, "bytes": 0, "lines": 0, "hits": {}})
+
+    def _write(self, record: Dict[str, object]) -> None:
+        # one write per line in append mode, so records of pool workers do not interleave
+        with open(self.trace, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    # -- reporting -------------------------------------------------------------
+    def records(self) -> List[Dict[str, object]]:
+        if not self.enabled or not os.path.exists(self.trace):
+            return []
+        with open(self.trace) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def summary(self) -> str:
+        return summary_table(self.records()) + (f"\nTrace: {self.trace}" if self.enabled else "")
+
+
+def summary_table(records: List[Dict[str, object]]) -> str:
+    """Aggregate per stage: files, time, external-process time, MB, lines and regex hits."""
+    if not records:
+        return "Profile: no stages recorded."
+    agg: Dict[str, Dict[str, object]] = defaultdict(lambda: {"files": set(), "calls": 0, "elapsed": 0.0,
+                                                           "external": 0.0, "bytes": 0, "lines": 0, "hits": 0})
+    for r in records:
+        a = agg[r["stage"]]
+        if r["file"]:
+            a["files"].add(r["file"])
+        a["calls"] += 1
+        a["elapsed"] += r["elapsed_s"]
+        a["external"] += r["external_s"]
+        a["bytes"] += r["bytes"]
+        a["lines"] += r["lines"]
+        a["hits"] += sum(r["hits"].values())
+    total = sum(a["elapsed"] for a in agg.values()) or 1.0
+    rows = [f"{'Stage':<16} {'Files':>6} {'Calls':>6} {'Time (s)':>9} {'%':>6} {'Ext (s)':>8} "
+            f"{'MB read':>8} {'Lines':>10} {'Hits':>8} {'MB/s':>7}"]
+    for name, a in sorted(agg.items(), key=lambda kv: (-kv[1]["elapsed"], -kv[1]["external"])):
+        mbs = a["bytes"] / 1e6 / a["elapsed"] if a["elapsed"] and a["bytes"] else 0.0
+        rows.append(f"{name:<16} {len(a['files']):>6} {a['calls']:>6} {a['elapsed']:>9.3f} "
+                    f"{100 * a['elapsed'] / total:>5.1f}% {a['external']:>8.3f} {a['bytes'] / 1e6:>8.2f} "
+                    f"{a['lines']:>10} {a['hits']:>8} {mbs:>7.1f}")
+    return "\n".join(rows)
+
+
+NO_PROFILE = Profile("")
+
+
+def add_profile_argument(ap, tool: str) -> None:
+    """Add the shared --profile [TRACE.jsonl] switch to an argparse parser."""
+    ap.add_argument("--profile", nargs="?", const=f"{tool}_profile.jsonl", default=None, metavar="TRACE",
+                    help=f"Record per-file, per-stage timings and read counts to a JSON-lines trace "
+                         f"(default {tool}_profile.jsonl) and print an aggregate table.")
@@ -0,0 +1,80 @@
+"""
+pet: one command for the PET protocol scripts.
+
+    python pet.py parse-td --jobs 4           # = python tddft_parser.py --jobs 4
+    python pet.py scf --method any
+    python pet.py freq-check --format csv
+    python pet.py pes --steps Si-RDM BN-1
+    python pet.py dct --help
+
+COMMANDS maps each subcommand to the module and entry point of the script
+that implements it. Only that module is imported, and only once its
+subcommand has been chosen, so `pet --help` and the log-only commands start
+without loading NumPy, pandas or matplotlib; the scripts themselves import
+pandas and matplotlib inside the functions that write tables and figures.
+The entry point parses the remaining arguments, so `pet <command> --help`
+is the script's own help. `python benchmark_parsers.py startup` measures the
+import time of every subcommand with `-X importtime` and fails when a
+LIGHT_COMMANDS entry exceeds STARTUP_BUDGET_MS or imports a heavy package.
+"""
+import importlib
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# command -> (module, entry point, summary)
+COMMANDS = {
+    "parse-td": ("tddft_parser", "cli", "TD-DFT states of every log (td_tddft_summary.csv)"),
+    "states": ("state_table", "cli", "every state of every TD block as a NumPy table"),
+    "scf": ("dft_scf_energy_parser", "main", "last SCF energy of every log here (data.csv)"),
+    "td-energy": ("excitation_energy_parser", "main", "last TD-DFT total energy of every log here (data.csv)"),
+    "freq-check": ("NegFreqCheck_ver2", "main", "termination and imaginary frequencies of every log here"),
+    "extract": ("extract_all_results", "cli", "step/termination/energy summary of every log here"),
+    "dct": ("calc_dct", "cli", "charge-transfer distance of every fchk/log pair here"),
+    "lambda": ("calc_lambda", "cli", "Lambda overlap index of every fchk/log pair here"),
+    "pes": ("plot_pes", "main", "potential energy surface diagrams"),
+    "log-to-com": ("log_to_com", "cli", "Gaussian input from the last geometry of each log"),
+    "traj": ("trajectory", "cli", "optimisation trajectory as NumPy arrays"),
+    "ensemble": ("xyz_ensemble", "cli", "filter and deduplicate multi-frame XYZ ensembles"),
+    "goat": ("goat_output", "cli", "ORCA GOAT conformer search summary"),
+    "monitor": ("job_monitor", "cli", "live summary of running Gaussian jobs"),
+    "compress": ("compressed_log", "cli", "compress logs into seekable .gz/.xz/.zst files"),
+    "fchk": ("fchk_reader", "cli", "prebuild the fchk array sidecars"),
+    "bench": ("benchmark_parsers", "cli", "parser benchmarks"),
+}
+
+# Commands that only read logs: their start-up must stay within the budget
+# without importing any of HEAVY_MODULES (checked by benchmark_parsers.py startup).
+LIGHT_COMMANDS = ("parse-td", "scf", "td-energy", "freq-check", "extract", "log-to-com", "monitor")
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "scipy", "openpyxl")
+STARTUP_BUDGET_MS = 150.0
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: pet <command> [options]   (pet <command> --help for the options)", "", "commands:"]
+    lines += [f"  {name:<{width}}  {summary}" for name, (_, _, summary) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"pet: unknown command '{name}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module, entry, _ = COMMANDS[name]
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)   # run through a symlink or from another folder
+    sys.argv = [f"pet {name}", *rest]   # the script's argparse reads its options (and prog) from here
+    getattr(importlib.import_module(module), entry)()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,34 @@
-import matplotlib.pyplot as plt
+"""
+Potential energy surface (PES) diagrams: S0, LE and CT curves with the VES,
+AES and S0-landing points of the PET protocol.
+
+One molecule comes from the USER INPUT SECTION below; a screening campaign
+comes from a table with one row per molecule (CSV or XLSX, columns named
+like the constants below, e.g. Molecule, E_VES_LE, f_VES_LE, E_AES_LE, ...)
+or straight from the step logs of each molecule folder (--steps, the same
+values extract_all_results reports):
+
+    python plot_pes.py                                   # the USER INPUT values
+    python plot_pes.py --table screening.csv -j 8        # one diagram per row
+    python plot_pes.py --steps Si-RDM BN-1 --save-table pes.csv
+
+The figure, its curves, markers, labels and arrows are built once per
+process (PESFigure) and only their data is replaced for each molecule; the
+layout (tight_layout) is recomputed whenever the title or the y range
+changes, since both set the margins. The
+Agg canvas is drawn once per molecule and that one bitmap is encoded as both
+PNG and JPG; SVG is the only format rendered separately.
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
 import numpy as np
 
+from compressed_log import is_log_file, unique_logs
+
 # ================= USER INPUT SECTION =================
 # Replace the values below with your specific calculation results.
 # 1. GROUND STATE (S0)
@@ -17,144 +45,351 @@ f_AES_LE        = 0.71   # Oscillator Strength
 # 3. CHARGE TRANSFER STATE (CT - GREEN)
 E_AES_CT        = 1.63   # Relaxed CT Energy
 f_AES_CT        = 0.00   # Oscillator Strength
-# Set E_VES_CT to a number if you found the Vertical CT state. 
+# Set E_VES_CT to a number if you found the Vertical CT state.
 # Set to None to let the script automatically estimate the curve shape.
-E_VES_CT        = None   
+E_VES_CT        = None
 
 # 4. VISUAL TUNING
 WIDTH_FACTOR    = 1.5    # Adjusts curve width (Higher = Flatter)
 X_POS_CT        = 1.7    # X-axis position for the CT state (Standard ~1.5 to 2.0)
 
 MOLECULE_NAME   = "Neutral Rhodamine"
+
+# 5. OUTPUT
+FORMATS         = ("png", "svg", "jpg")
+DPI             = 300
+JOBS            = 0      # worker processes for tables (0 = all cores)
 # ======================================================
 
-def draw_fitted_curve(ax, x_points, y_points, color, label, x_range_left, x_range_right):
-    """Fits a polynomial (degree 2) to 3 points to ensure the curve hits all of them."""
-    coeffs = np.polyfit(x_points, y_points, 2)
-    poly = np.poly1d(coeffs)
-    x_vertex = x_points[0]
-    x = np.linspace(x_vertex - x_range_left, x_points[-1] + x_range_right, 200)
-    y = poly(x)
-    ax.plot(x, y, color=color, linewidth=2.5, label=label)
-    return poly
-
-def draw_parabola(ax, x_vertex, y_vertex, x_pass, y_pass, color, label, x_range_left, x_range_right):
-    """Draws a parabola. If x_pass/y_pass are given, curve hits that point."""
+HARTREE_TO_EV = 27.211386
+# Protocol step whose log gives each value in --steps mode ("CT/" = the CT or ET sub-folder).
+# Energies are relative to the S0 minimum of step 01.
+STEP_SOURCES = {
+    "E_VES_LE": "03", "f_VES_LE": "02",
+    "E_AES_LE": "06", "f_AES_LE": "06",
+    "E_S0_at_LE_geom": "07",
+    "E_AES_CT": "CT/06", "f_AES_CT": "CT/06",
+    "E_S0_at_CT_geom": "CT/07",
+}
+S0_STEP = "01"
+CT_SUBDIRS = ("CT", "ET")
+
+COLOR_S0, COLOR_LE, COLOR_CT, COLOR_POINT = "silver", "#FF8C00", "#32CD32", "royalblue"
+X_GS, X_LE = 0.0, 1.0
+N_CURVE = 200
+
+
+class PESData(NamedTuple):
+    Molecule: str
+    E_S0_at_LE_geom: float
+    E_S0_at_CT_geom: float
+    E_VES_LE: float
+    f_VES_LE: float
+    E_AES_LE: float
+    f_AES_LE: float
+    E_AES_CT: float
+    f_AES_CT: float
+    E_VES_CT: Optional[float] = None
+    E_S0_min: float = 0.0
+    WIDTH_FACTOR: float = WIDTH_FACTOR
+    X_POS_CT: float = X_POS_CT
+
+
+def user_input() -> PESData:
+    return PESData(MOLECULE_NAME, E_S0_at_LE_geom, E_S0_at_CT_geom, E_VES_LE, f_VES_LE, E_AES_LE, f_AES_LE,
+                   E_AES_CT, f_AES_CT, E_VES_CT, E_S0_min, WIDTH_FACTOR, X_POS_CT)
+
+
+# -- curve shapes --------------------------------------------------------------
+def fitted_curve(x_points, y_points, x_range_left, x_range_right):
+    """Polynomial (degree 2) through 3 points, so the curve hits all of them."""
+    poly = np.poly1d(np.polyfit(x_points, y_points, 2))
+    x = np.linspace(x_points[0] - x_range_left, x_points[-1] + x_range_right, N_CURVE)
+    return x, poly(x)
+
+def parabola(x_vertex, y_vertex, x_pass, y_pass, width_factor, x_range_left, x_range_right):
+    """Parabola with its vertex at (x_vertex, y_vertex); if x_pass/y_pass are given, it hits that point."""
     if x_pass is not None and y_pass is not None:
         denom = (x_pass - x_vertex)**2
         if denom < 1e-6: denom = 1.0
         a = (y_pass - y_vertex) / denom
     else:
-        a = 1.0 / WIDTH_FACTOR 
-    
-    x = np.linspace(x_vertex - x_range_left, x_vertex + x_range_right, 200)
-    y = a * (x - x_vertex)**2 + y_vertex
-    ax.plot(x, y, color=color, linewidth=2.5, label=label)
-
-def draw_zigzag(ax, start_xy, end_xy, num_zags=8, amplitude=0.04, color='black'):
-    """Draws a sharp Zig-Zag line for non-radiative decay."""
+        a = 1.0 / width_factor
+    x = np.linspace(x_vertex - x_range_left, x_vertex + x_range_right, N_CURVE)
+    return x, a * (x - x_vertex)**2 + y_vertex
+
+def zigzag(start_xy, end_xy, num_zags=8, amplitude=0.04):
+    """Vertices of a sharp Zig-Zag line for non-radiative decay."""
     x0, y0 = start_xy
     x1, y1 = end_xy
     dx, dy = x1 - x0, y1 - y0
-    length = np.sqrt(dx**2 + dy**2)
-    ux, uy = dx/length, dy/length 
-    px, py = -uy, ux              
-    step = length / num_zags
-    points = [(x0, y0)]
-    for i in range(num_zags):
-        dist = (i + 0.5) * step
-        bx = x0 + ux * dist
-        by = y0 + uy * dist
-        direction = 1 if i % 2 == 0 else -1
-        zx = bx + px * amplitude * direction
-        zy = by + py * amplitude * direction
-        points.append((zx, zy))
-    points.append((x1, y1))
-    xs, ys = zip(*points)
-    ax.plot(xs, ys, color=color, lw=1.5)
-    ax.annotate("", xy=end_xy, xytext=points[-2],
-                arrowprops=dict(arrowstyle="->", color=color, lw=1.5))
+    length = max(np.sqrt(dx**2 + dy**2), 1e-9)
+    ux, uy = dx/length, dy/length
+    px, py = -uy, ux
+    dist = (np.arange(num_zags) + 0.5) * length / num_zags
+    direction = np.where(np.arange(num_zags) % 2 == 0, 1.0, -1.0)
+    xs = np.concatenate([[x0], x0 + ux * dist + px * amplitude * direction, [x1]])
+    ys = np.concatenate([[y0], y0 + uy * dist + py * amplitude * direction, [y1]])
+    return xs, ys
 
-def main():
-    fig, ax = plt.subplots(figsize=(8.5, 6.5))
-
-    X_GS = 0.0
-    X_LE = 1.0
-    X_CT = X_POS_CT
-
-    # --- 1. DRAW CURVES ---
-    # S0 (Gray) - Fits 3 points
-    s0_x = [X_GS, X_LE, X_CT]
-    s0_y = [E_S0_min, E_S0_at_LE_geom, E_S0_at_CT_geom]
-    draw_fitted_curve(ax, s0_x, s0_y, 'silver', 'S0', 0.8, 0.4)
-
-    # LE (Orange)
-    draw_parabola(ax, X_LE, E_AES_LE, X_GS, E_VES_LE, '#FF8C00', 'LE', 1.2, 1.2)
-
-    # CT (Green)
-    draw_parabola(ax, X_CT, E_AES_CT, X_GS, E_VES_CT, '#32CD32', 'CT', 1.5, 0.8)
-
-    # --- 2. ADD POINTS & LABELS ---
-    def add_point(x, y, color, label=None, sublabel=None, top=True):
-        ax.scatter(x, y, s=120, color=color, edgecolors='black', zorder=10)
-        offset = 0.25 if top else -0.45
-        va = 'bottom' if top else 'top'
-        if label: txt = f"{label}\n{y:.2f}"
-        else: txt = f"{y:.2f}"
+
+# -- figure template -----------------------------------------------------------
+class PESFigure:
+    """One figure with every artist of the diagram; update() moves them to a new molecule."""
+
+    _LABEL_BOX = dict(facecolor='white', alpha=0.8, edgecolor='none', pad=1)
+
+    def __init__(self, dpi: int = DPI):
+        # matplotlib is only imported once a figure is drawn, so `pet pes --help` does not load it
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        self.fig, ax = plt.subplots(figsize=(8.5, 6.5), dpi=dpi)
+        self.ax = ax
+        self.s0, = ax.plot([], [], color=COLOR_S0, linewidth=2.5, label='S0')
+        self.le, = ax.plot([], [], color=COLOR_LE, linewidth=2.5, label='LE')
+        self.ct, = ax.plot([], [], color=COLOR_CT, linewidth=2.5, label='CT')
+        self.points = ax.scatter([], [], s=120, edgecolors='black', zorder=10)
+        # S0 min, VES (LE), AES (LE), S0 at LE, AES (ET), VES (ET), S0 at CT
+        self.labels = [ax.text(0, 0, "", ha='center', fontsize=10, fontweight='bold', bbox=self._LABEL_BOX)
+                       for _ in range(7)]
+        arrow = dict(arrowstyle="->", color='black')
+        self.absorption = ax.annotate("", xy=(0, 0), xytext=(0, 0), arrowprops=dict(arrow, lw=2))
+        self.emission = ax.annotate("", xy=(0, 0), xytext=(0, 0), arrowprops=dict(arrow, lw=2))
+        self.relax = ax.annotate("", xy=(0, 0), xytext=(0, 0), arrowprops=dict(arrow, lw=1.5, ls="--"))
+        self.transfer = ax.annotate("", xy=(0, 0), xytext=(0, 0),
+                                    arrowprops=dict(arrow, lw=1.5, connectionstyle="arc3,rad=-0.3"))
+        self.zigzag, = ax.plot([], [], color='black', lw=1.5)
+        self.zigzag_head = ax.annotate("", xy=(0, 0), xytext=(0, 0), arrowprops=dict(arrow, lw=1.5))
+
+        ax.set_ylabel("Energy Level / eV", fontsize=12)
+        ax.set_xlabel("Photodeactivation pathway", fontsize=12)
+        ax.set_title(" ", fontsize=14, fontweight='bold')
+        ax.set_xticks([])
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        self._layout = None   # (title, y range) the current layout was computed for
+        self.update(user_input())
+
+    def _label(self, i, x, y, label=None, sublabel=None, top=True, offset=None):
+        txt = f"{label}\n{y:.2f}" if label else f"{y:.2f}"
         if sublabel: txt += f"\n{sublabel}"
-        ax.text(x, y + offset, txt, ha='center', va=va, fontsize=10, fontweight='bold',
-                bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', pad=1))
-
-    # Points
-    add_point(X_GS, E_S0_min, 'royalblue', top=False)
-    add_point(X_GS, E_VES_LE, '#FF8C00', "VES (LE)", f"f={f_VES_LE}")
-    add_point(X_LE, E_AES_LE, '#FF8C00', "AES (LE)", f"f={f_AES_LE}")
-    
-    # S0 Landings
-    ax.scatter(X_LE, E_S0_at_LE_geom, s=120, color='royalblue', edgecolors='black', zorder=10)
-    ax.text(X_LE, E_S0_at_LE_geom - 0.35, f"{E_S0_at_LE_geom:.2f}", ha='center', va='top', fontsize=10, fontweight='bold',
-            bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', pad=0.5))
-    
-    add_point(X_CT, E_AES_CT, '#32CD32', "AES (ET)", f"f={f_AES_CT}")
-    
-    if E_VES_CT is not None:
-        add_point(X_GS, E_VES_CT, '#32CD32', "VES (ET)", top=True)
-
-    ax.scatter(X_CT, E_S0_at_CT_geom, s=120, color='royalblue', edgecolors='black', zorder=10)
-    ax.text(X_CT, E_S0_at_CT_geom - 0.35, f"{E_S0_at_CT_geom:.2f}", ha='center', va='top', fontsize=10, fontweight='bold',
-             bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', pad=0.5))
-
-    # --- 3. ARROWS ---
-    ax.annotate("", xy=(X_GS, E_VES_LE), xytext=(X_GS, E_S0_min), arrowprops=dict(arrowstyle="->", color='black', lw=2))
-    ax.annotate("", xy=(X_LE, E_S0_at_LE_geom), xytext=(X_LE, E_AES_LE), arrowprops=dict(arrowstyle="->", color='black', lw=2))
-    ax.annotate("", xy=(X_LE, E_AES_LE), xytext=(X_GS, E_VES_LE), arrowprops=dict(arrowstyle="->", color='black', lw=1.5, ls="--"))
-    ax.annotate("", xy=(X_CT, E_AES_CT), xytext=(X_LE, E_AES_LE),
-                arrowprops=dict(arrowstyle="->", color='black', lw=1.5, connectionstyle="arc3,rad=-0.3"))
-    draw_zigzag(ax, (X_CT, E_AES_CT), (X_CT, E_S0_at_CT_geom))
-
-    # --- 4. FORMATTING ---
-    ax.set_ylabel("Energy Level / eV", fontsize=12)
-    ax.set_xlabel("Photodeactivation pathway", fontsize=12)
-    ax.set_title(MOLECULE_NAME, fontsize=14, fontweight='bold')
-    ax.set_xticks([])
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    
-    y_max = max(E_VES_LE, E_AES_LE) + 1.2
-    if E_VES_CT: y_max = max(y_max, E_VES_CT + 1.0)
-    ax.set_ylim(-1.0, y_max)
-
-    plt.tight_layout()
-    
-    # --- SAVE IN MULTIPLE FORMATS ---
-    # Customize filename based on molecule name
-    fname = "PES_" + MOLECULE_NAME.replace(" ", "_")
-    plt.savefig(f"{fname}.png", dpi=300)
-    plt.savefig(f"{fname}.svg", format='svg')
-    plt.savefig(f"{fname}.jpg", dpi=300, format='jpg')
-    
-    print(f"Graphs saved as {fname}.png, .svg, and .jpg")
-    plt.show()
+        t = self.labels[i]
+        t.set_visible(True)
+        t.set_text(txt)
+        t.set_position((x, y + (offset if offset is not None else (0.25 if top else -0.45))))
+        t.set_va('bottom' if top else 'top')
+
+    def update(self, d: PESData) -> None:
+        x_ct = d.X_POS_CT
+        self.s0.set_data(*fitted_curve([X_GS, X_LE, x_ct], [d.E_S0_min, d.E_S0_at_LE_geom, d.E_S0_at_CT_geom], 0.8, 0.4))
+        self.le.set_data(*parabola(X_LE, d.E_AES_LE, X_GS, d.E_VES_LE, d.WIDTH_FACTOR, 1.2, 1.2))
+        self.ct.set_data(*parabola(x_ct, d.E_AES_CT, X_GS, d.E_VES_CT, d.WIDTH_FACTOR, 1.5, 0.8))
+
+        pts = [(X_GS, d.E_S0_min, COLOR_POINT), (X_GS, d.E_VES_LE, COLOR_LE), (X_LE, d.E_AES_LE, COLOR_LE),
+               (X_LE, d.E_S0_at_LE_geom, COLOR_POINT), (x_ct, d.E_AES_CT, COLOR_CT)]
+        if d.E_VES_CT is not None:
+            pts.append((X_GS, d.E_VES_CT, COLOR_CT))
+        pts.append((x_ct, d.E_S0_at_CT_geom, COLOR_POINT))
+        self.points.set_offsets([(x, y) for x, y, _ in pts])
+        self.points.set_facecolors([c for _, _, c in pts])
+
+        self._label(0, X_GS, d.E_S0_min, top=False)
+        self._label(1, X_GS, d.E_VES_LE, "VES (LE)", f"f={d.f_VES_LE}")
+        self._label(2, X_LE, d.E_AES_LE, "AES (LE)", f"f={d.f_AES_LE}")
+        self._label(3, X_LE, d.E_S0_at_LE_geom, top=False, offset=-0.35)
+        self._label(4, x_ct, d.E_AES_CT, "AES (ET)", f"f={d.f_AES_CT}")
+        if d.E_VES_CT is not None:
+            self._label(5, X_GS, d.E_VES_CT, "VES (ET)")
+        else:
+            self.labels[5].set_visible(False)
+        self._label(6, x_ct, d.E_S0_at_CT_geom, top=False, offset=-0.35)
+
+        self.absorption.xy, self.absorption.xyann = (X_GS, d.E_VES_LE), (X_GS, d.E_S0_min)
+        self.emission.xy, self.emission.xyann = (X_LE, d.E_S0_at_LE_geom), (X_LE, d.E_AES_LE)
+        self.relax.xy, self.relax.xyann = (X_LE, d.E_AES_LE), (X_GS, d.E_VES_LE)
+        self.transfer.xy, self.transfer.xyann = (x_ct, d.E_AES_CT), (X_LE, d.E_AES_LE)
+        xs, ys = zigzag((x_ct, d.E_AES_CT), (x_ct, d.E_S0_at_CT_geom))
+        self.zigzag.set_data(xs, ys)
+        self.zigzag_head.xy, self.zigzag_head.xyann = (xs[-1], ys[-1]), (xs[-2], ys[-2])
+
+        self.ax.title.set_text(d.Molecule)
+        y_max = max(d.E_VES_LE, d.E_AES_LE) + 1.2
+        if d.E_VES_CT: y_max = max(y_max, d.E_VES_CT + 1.0)
+        x_lo = min(line.get_xdata()[0] for line in (self.s0, self.le, self.ct))
+        x_hi = max(line.get_xdata()[-1] for line in (self.s0, self.le, self.ct))
+        pad = 0.05 * (x_hi - x_lo)
+        self.ax.set_xlim(x_lo - pad, x_hi + pad)
+        self.ax.set_ylim(-1.0, y_max)
+        if (d.Molecule, y_max) != self._layout:
+            self._layout = (d.Molecule, y_max)
+            self.fig.tight_layout()
+
+    def save(self, stem: str, formats: Sequence[str] = FORMATS) -> List[str]:
+        """Write <stem>.<fmt> for every format; PNG and JPG share one Agg rendering."""
+        from PIL import Image
+
+        written = []
+        raster = [f for f in formats if f in ("png", "jpg", "jpeg")]
+        if raster:
+            self.fig.canvas.draw()
+            # the figure background is opaque, so the alpha channel is dropped before encoding
+            image = Image.fromarray(np.asarray(self.fig.canvas.buffer_rgba())).convert("RGB")
+            dpi = (self.fig.dpi, self.fig.dpi)
+            for fmt in raster:
+                path = f"{stem}.{fmt}"
+                image.save(path, dpi=dpi, **({"quality": 95} if fmt != "png" else {}))
+                written.append(path)
+        for fmt in formats:
+            if fmt not in raster:
+                path = f"{stem}.{fmt}"
+                self.fig.savefig(path, format=fmt)
+                written.append(path)
+        return written
+
+
+# -- input tables ----------------------------------------------------------------
+def _value(v) -> Optional[float]:
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return None
+    v = float(v)
+    return None if np.isnan(v) else v
+
+def rows_to_data(rows: Sequence[Dict[str, object]]) -> List[PESData]:
+    """PESData from dict rows keyed by the PESData field names; blank optional fields use the defaults."""
+    out = []
+    for n, row in enumerate(rows):
+        values = {"Molecule": str(row.get("Molecule") or f"Molecule_{n + 1}")}
+        for field in PESData._fields[1:]:
+            v = _value(row.get(field))
+            if v is not None:
+                values[field] = v
+            elif field not in PESData._field_defaults:
+                raise ValueError(f"row {n + 1} ({values['Molecule']}): missing {field}")
+        out.append(PESData(**values))
+    return out
+
+def read_table(path: str) -> List[PESData]:
+    """Rows of a .csv (or, with pandas, .xlsx) table."""
+    if path.lower().endswith((".xlsx", ".xls")):
+        import pandas as pd
+        rows = pd.read_excel(path).to_dict("records")
+    else:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+    return rows_to_data(rows)
+
+def write_table(data: Sequence[PESData], path: str) -> str:
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(PESData._fields)
+        w.writerows(["" if v is None else v for v in d] for d in data)
+    return path
+
+def _step_logs(folder: str) -> Dict[str, str]:
+    """{step: log} for the numbered logs of a folder (first two digits of the name)."""
+    out = {}
+    if os.path.isdir(folder):
+        for f in sorted(unique_logs(f for f in os.listdir(folder) if is_log_file(f, (".log",)))):
+            if f[:2].isdigit():
+                out.setdefault(f[:2], os.path.join(folder, f))
+    return out
+
+def data_from_steps(folder: str, name: Optional[str] = None, cache=None) -> PESData:
+    """Diagram values of one molecule folder from its step logs (see STEP_SOURCES), via extract_all_results."""
+    from extract_all_results import extract_gaussian_data
+
+    logs = {step: path for step, path in _step_logs(folder).items()}
+    for sub in CT_SUBDIRS:
+        logs.update({f"CT/{step}": path for step, path in _step_logs(os.path.join(folder, sub)).items()})
+
+    def extract(path):
+        rec = None if cache is None else cache.get("extract", path)
+        if rec is None:
+            rec = extract_gaussian_data(path)
+            if cache is not None and "error" not in rec:
+                cache.put("extract", path, rec)
+        return rec
+
+    if S0_STEP not in logs:
+        raise ValueError(f"{folder}: no step {S0_STEP} log for the S0 minimum")
+    e0 = extract(logs[S0_STEP])["Energy_Hartree"]
+    values = {"Molecule": name or os.path.basename(os.path.normpath(folder))}
+    for field, step in STEP_SOURCES.items():
+        if step not in logs:
+            raise ValueError(f"{folder}: no step {step} log for {field}")
+        r = extract(logs[step])
+        if field.startswith("f_"):
+            values[field] = r["Oscillator_Strength"] or 0.0
+        elif r["Energy_Hartree"] is None or e0 is None:
+            raise ValueError(f"{folder}: no energy in {os.path.basename(logs[step])} for {field}")
+        else:
+            values[field] = round((r["Energy_Hartree"] - e0) * HARTREE_TO_EV, 4)
+    return PESData(**values)
+
+
+# -- rendering -------------------------------------------------------------------
+_FIGURE: Optional[PESFigure] = None
+
+def _init_worker(dpi: int) -> None:
+    global _FIGURE
+    _FIGURE = PESFigure(dpi)
+
+def _render(args) -> List[str]:
+    data, outdir, formats = args
+    _FIGURE.update(data)
+    return _FIGURE.save(os.path.join(outdir, "PES_" + data.Molecule.replace(" ", "_")), formats)
+
+def render_all(data: Sequence[PESData], outdir: str = ".", formats: Sequence[str] = FORMATS,
+               dpi: int = DPI, jobs: int = JOBS) -> List[List[str]]:
+    """One diagram per molecule; files written per molecule, in input order."""
+    os.makedirs(outdir, exist_ok=True)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    work = [(d, outdir, tuple(formats)) for d in data]
+    if jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(work)), initializer=_init_worker,
+                                 initargs=(dpi,)) as pool:
+            return list(pool.map(_render, work, chunksize=8))
+    _init_worker(dpi)
+    return [_render(w) for w in work]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Draw PET potential energy surface diagrams.")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--table", type=str, default=None, help="CSV/XLSX with one row per molecule.")
+    src.add_argument("--steps", nargs="+", default=None,
+                     help="Molecule folders with numbered step logs (and a CT/ or ET/ sub-folder).")
+    ap.add_argument("--save-table", type=str, default=None, help="Write the values used to this CSV.")
+    ap.add_argument("--outdir", type=str, default=".", help="Folder for the diagrams.")
+    ap.add_argument("--formats", nargs="+", default=list(FORMATS), help="Any of png jpg svg pdf.")
+    ap.add_argument("--dpi", type=int, default=DPI)
+    ap.add_argument("--jobs", "-j", type=int, default=JOBS, help="Worker processes (0 = all cores).")
+    args = ap.parse_args()
+
+    if args.table:
+        data = read_table(args.table)
+    elif args.steps:
+        from parse_cache import ParseCache
+        data = []
+        with ParseCache() as cache:
+            for folder in args.steps:
+                try:
+                    data.append(data_from_steps(folder, cache=cache))
+                except ValueError as e:
+                    print(f"Skipped: {e}")
+    else:
+        data = [user_input()]
+    if args.save_table:
+        print(f"Wrote: {write_table(data, args.save_table)}")
+
+    written = render_all(data, args.outdir, args.formats, args.dpi, args.jobs)
+    for d, files in zip(data, written):
+        print(f"{d.Molecule}: {', '.join(os.path.basename(f) for f in files)}")
+    print(f"{len(data)} diagram(s) saved to {os.path.abspath(args.outdir)}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,204 @@
+"""
+Memoised per-state analysis results (dCT, Lambda) keyed on fchk content.
+
+Re-running calc_dct / calc_lambda on a scan folder where only a few files are
+new used to recompute every value. ResultStore keeps each value in a SQLite
+file (.petcache/results.sqlite) keyed by
+
+    (fchk content hash, kind, params)  ->  value
+
+where kind names the quantity and engine ("dct/multiwfn", "lambda/native",
+...) and params is everything else the value depends on: the Multiwfn command
+script, the orbital pair or state, the transition amplitudes from the log.
+Keying on content rather than path means renamed or copied fchks still hit.
+The content hash itself is remembered per (path, size, mtime_ns), so an
+unchanged fchk is not re-read. The store keeps at most max_entries values and
+drops the least recently used ones on close().
+
+    with ResultStore() as store:
+        results = memoised_batch(store, "dct/native", specs, params, compute)
+        print(store.summary())
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from parse_cache import CACHE_DIR, xxhash
+
+PathLike = Union[str, Path]
+Result = Tuple[Dict[int, Optional[float]], Optional[str]]
+
+STORE_FILE = "results.sqlite"
+MAX_ENTRIES = 200_000
+HASH_BLOCK = 8 * 1024 * 1024
+SCHEMA_VERSION = 1
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS results (
+        digest    TEXT    NOT NULL,
+        kind      TEXT    NOT NULL,
+        params    TEXT    NOT NULL,
+        value     TEXT    NOT NULL,
+        last_used INTEGER NOT NULL,
+        PRIMARY KEY (digest, kind, params)
+    )""",
+    "CREATE INDEX IF NOT EXISTS results_lru ON results (last_used)",
+    """CREATE TABLE IF NOT EXISTS hashes (
+        path     TEXT    PRIMARY KEY,
+        size     INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest   TEXT    NOT NULL
+    )""",
+)
+
+
+def file_digest(path: PathLike) -> str:
+    """Hash of the whole file (xxh64 if available, else blake2b)."""
+    h = xxhash.xxh64() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultStore:
+    """SQLite-backed LRU value store. With enabled=False every lookup misses and nothing is written."""
+
+    def __init__(self, root: PathLike = ".", enabled: bool = True, rebuild: bool = False,
+                 max_entries: int = MAX_ENTRIES):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._touched: List[Tuple[int, str, str, str]] = []
+        if not enabled:
+            return
+        cache_dir = Path(root) / CACHE_DIR
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(cache_dir / STORE_FILE))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if rebuild or version != SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS results")
+            self._conn.execute("DROP TABLE IF EXISTS hashes")
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+        self._conn.commit()
+
+    # -- context manager -----------------------------------------------------
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.executemany(
+                "UPDATE results SET last_used=? WHERE digest=? AND kind=? AND params=?", self._touched)
+            self._touched = []
+            self.evict()
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    # -- core ----------------------------------------------------------------
+    def digest(self, path: PathLike) -> str:
+        """Content hash of path, recomputed only when its size or mtime changed."""
+        p = os.path.abspath(path)
+        st = os.stat(p)
+        if self._conn is not None:
+            row = self._conn.execute("SELECT size, mtime_ns, digest FROM hashes WHERE path=?", (p,)).fetchone()
+            if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                return row[2]
+        d = file_digest(p)
+        if self._conn is not None:
+            self._conn.execute("INSERT OR REPLACE INTO hashes (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                               (p, st.st_size, st.st_mtime_ns, d))
+        return d
+
+    def get(self, digest: str, kind: str, params: str) -> Optional[object]:
+        if self._conn is None:
+            self.misses += 1
+            return None
+        row = self._conn.execute("SELECT value FROM results WHERE digest=? AND kind=? AND params=?",
+                                 (digest, kind, params)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.append((time.time_ns(), digest, kind, params))
+        return json.loads(row[0])
+
+    def put(self, digest: str, kind: str, params: str, value: object) -> None:
+        if self._conn is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (digest, kind, params, value, last_used) VALUES (?, ?, ?, ?, ?)",
+            (digest, kind, params, json.dumps(value), time.time_ns()),
+        )
+
+    def evict(self) -> int:
+        """Drop the least recently used values beyond max_entries; returns how many were dropped."""
+        if self._conn is None:
+            return 0
+        n = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = n - self.max_entries
+        if excess > 0:
+            self._conn.execute("DELETE FROM results WHERE rowid IN "
+                               "(SELECT rowid FROM results ORDER BY last_used LIMIT ?)", (excess,))
+        return max(0, excess)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Results store: disabled"
+        return f"Results store: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def memoised_batch(store: ResultStore, kind: str, items: Sequence[Tuple[PathLike, Sequence[tuple]]],
+                   params: Callable[[tuple], str],
+                   compute: Callable[[List[Tuple[PathLike, List[tuple]]]], List[Result]]) -> List[Result]:
+    """
+    Per-file (results, error) like the *_batch() engines, computing only what the store lacks.
+
+    items are (fchk, specs) with spec[0] the state index; params(spec) is the
+    key text for one state; compute() gets the same shape restricted to the
+    missing states and returns one (results, error) per item it was given.
+    Values of None (nothing found) are not stored.
+    """
+    out: List[Result] = []
+    todo: List[Tuple[int, str, PathLike, List[tuple]]] = []
+    for n, (fchk, specs) in enumerate(items):
+        digest = store.digest(fchk) if store.enabled else ""
+        found: Dict[int, Optional[float]] = {}
+        missing = []
+        for spec in specs:
+            value = store.get(digest, kind, params(spec))
+            if value is None:
+                missing.append(spec)
+            else:
+                found[spec[0]] = value
+        out.append((found, None))
+        if missing:
+            todo.append((n, digest, fchk, missing))
+
+    if todo:
+        computed = compute([(fchk, missing) for _, _, fchk, missing in todo])
+        for (n, digest, _, missing), (values, err) in zip(todo, computed):
+            found = out[n][0]
+            for spec in missing:
+                value = values.get(spec[0])
+                found[spec[0]] = value
+                if value is not None:
+                    store.put(digest, kind, params(spec), value)
+            out[n] = (found, err)
+    return out
@@ -0,0 +1,209 @@
+"""
+Columnar table of every excited state of every TD block in a set of logs.
+
+tddft_parser keeps one state per file and flattens its transitions into a
+string. For benchmarking sweeps (thousands of states across functionals)
+build_table() instead keeps everything, as two NumPy structured arrays:
+
+    states       one row per (file, TD block, state)
+                 file_id, link, block, opt_step, state, multiplicity,
+                 e_eV, lam_nm, fosc, td_energy, opt_root, trans_start, n_trans
+    transitions  one row per 'src -> dst coeff' line
+                 state_row, src, dst, coeff
+
+file_id indexes into table.files; the transitions of states[i] are
+transitions[trans_start:trans_start + n_trans], and state_row points back
+into states. opt_step is the 'Step number' printed after the block within
+its job link (-1 if none follows), td_energy is set on the state whose
+'Total Energy, E(TD-HF/TD-DFT)' line follows it (NaN elsewhere) and opt_root
+marks the state flagged 'for optimization'.
+
+    table = build_table(gather_files(["DATA"]), jobs=4)
+    s = table.states
+    bright = s[(s["fosc"] > 0.1) & (s["e_eV"] < 3.0)]
+    save_table(table, "states.npz")          # or states.parquet (pyarrow/fastparquet)
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from log_scanner import ExcitedState, OptFlag, OptStep, TdBlock, TdEnergy, Termination, Transition, scan_log
+
+PathLike = Union[str, Path]
+
+STATE_DTYPE = np.dtype([
+    ("file_id", "i4"),
+    ("link", "i2"),           # 0-based job link (Termination lines seen before the block)
+    ("block", "i4"),          # 0-based TD block within the file
+    ("opt_step", "i4"),
+    ("state", "i2"),
+    ("multiplicity", "U16"),  # e.g. 'Singlet-A'
+    ("e_eV", "f8"),
+    ("lam_nm", "f8"),
+    ("fosc", "f8"),
+    ("td_energy", "f8"),
+    ("opt_root", "?"),
+    ("trans_start", "i8"),
+    ("n_trans", "i4"),
+])
+
+TRANS_DTYPE = np.dtype([
+    ("state_row", "i8"),
+    ("src", "i4"),
+    ("dst", "i4"),
+    ("coeff", "f8"),
+])
+
+SCAN_EVENTS = (TdBlock, ExcitedState, Transition, OptFlag, TdEnergy, OptStep, Termination)
+
+
+class StateTable(NamedTuple):
+    files: List[str]
+    states: np.ndarray
+    transitions: np.ndarray
+
+    def transitions_of(self, row: int) -> np.ndarray:
+        s = self.states[row]
+        return self.transitions[s["trans_start"]:s["trans_start"] + s["n_trans"]]
+
+
+def parse_states(path: PathLike) -> Tuple[np.ndarray, np.ndarray]:
+    """States and transitions of one log (file_id 0, state_row local to the file)."""
+    rows: list = []
+    trans: list = []
+    link = 0
+    block = -1
+    pending: List[int] = []   # rows of the current link still waiting for their 'Step number'
+    cur = -1
+
+    for ev in scan_log(path, SCAN_EVENTS):
+        kind = type(ev)
+        if kind is Transition:
+            if cur >= 0:
+                trans.append((cur, ev.src, ev.dst, ev.coeff))
+                rows[cur][12] += 1
+        elif kind is ExcitedState:
+            cur = len(rows)
+            rows.append([0, link, block, -1, ev.state, ev.multiplicity, ev.e_eV, ev.lam_nm, ev.fosc,
+                         np.nan, False, len(trans), 0])
+            pending.append(cur)
+        elif kind is TdBlock:
+            block += 1
+            cur = -1
+        elif kind is OptFlag:
+            if cur >= 0:
+                rows[cur][10] = True
+        elif kind is TdEnergy:
+            if cur >= 0 and np.isnan(rows[cur][9]):
+                rows[cur][9] = ev.energy
+        elif kind is OptStep:
+            for r in pending:
+                rows[r][3] = ev.step
+            pending = []
+        elif kind is Termination:
+            link += 1
+            pending = []
+            cur = -1
+
+    states = np.array([tuple(r) for r in rows], dtype=STATE_DTYPE)
+    transitions = np.array(trans, dtype=TRANS_DTYPE)
+    return states, transitions
+
+def _parse_job(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    try:
+        return parse_states(path)
+    except Exception as e:
+        print(f"Skipping {Path(path).name}: {e}")
+        return np.empty(0, STATE_DTYPE), np.empty(0, TRANS_DTYPE)
+
+def build_table(paths: List[PathLike], jobs: int = 1) -> StateTable:
+    """Parse every log and concatenate the per-file arrays (in the order of paths)."""
+    files = [str(p) for p in paths]
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(_parse_job, files, chunksize=8))
+    else:
+        parts = [_parse_job(f) for f in files]
+
+    state_parts, trans_parts = [], []
+    n_states = n_trans = 0
+    for file_id, (s, t) in enumerate(parts):
+        s["file_id"] = file_id
+        s["trans_start"] += n_trans
+        t["state_row"] += n_states
+        n_states += len(s)
+        n_trans += len(t)
+        state_parts.append(s)
+        trans_parts.append(t)
+    states = np.concatenate(state_parts) if state_parts else np.empty(0, STATE_DTYPE)
+    transitions = np.concatenate(trans_parts) if trans_parts else np.empty(0, TRANS_DTYPE)
+    return StateTable(files, states, transitions)
+
+
+def _parquet_paths(path: Path) -> Tuple[Path, Path]:
+    stem = path.with_suffix("")
+    return Path(f"{stem}.states.parquet"), Path(f"{stem}.transitions.parquet")
+
+def save_table(table: StateTable, path: PathLike) -> List[Path]:
+    """Write the table as one .npz, or as <stem>.states/.transitions.parquet; returns the files written."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pandas as pd
+        states_path, trans_path = _parquet_paths(path)
+        df = pd.DataFrame(table.states)
+        df.insert(0, "file", np.asarray(table.files, dtype=object)[table.states["file_id"]])
+        df.to_parquet(states_path, index=False)
+        pd.DataFrame(table.transitions).to_parquet(trans_path, index=False)
+        return [states_path, trans_path]
+    np.savez(path, files=np.asarray(table.files, dtype=str), states=table.states, transitions=table.transitions)
+    return [path if path.suffix == ".npz" else Path(f"{path}.npz")]
+
+def load_table(path: PathLike) -> StateTable:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pandas as pd
+        states_path, trans_path = _parquet_paths(path)
+        df = pd.read_parquet(states_path)
+        # files without any state are not in the Parquet file and come back as ""
+        files = [""] * (int(df["file_id"].max()) + 1 if len(df) else 0)
+        for fid, name in zip(df["file_id"], df["file"]):
+            files[fid] = name
+        states = np.empty(len(df), STATE_DTYPE)
+        for name in STATE_DTYPE.names:
+            states[name] = df[name].to_numpy()
+        tdf = pd.read_parquet(trans_path)
+        transitions = np.empty(len(tdf), TRANS_DTYPE)
+        for name in TRANS_DTYPE.names:
+            transitions[name] = tdf[name].to_numpy()
+        return StateTable(files, states, transitions)
+    with np.load(path) as z:
+        return StateTable([str(f) for f in z["files"]], z["states"], z["transitions"])
+
+
+def cli():
+    from tddft_parser import gather_files
+
+    ap = argparse.ArgumentParser(description="Build a columnar table of all excited states in Gaussian TD-DFT logs.")
+    ap.add_argument("paths", nargs="*", help="Paths/globs/dirs to scan. Default: current directory.")
+    ap.add_argument("--output", type=str, default="td_states.npz", help="Output .npz or .parquet file.")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for parsing.")
+    args = ap.parse_args()
+
+    files = gather_files(args.paths)
+    table = build_table(files, jobs=args.jobs)
+    print(f"{len(files)} files, {len(table.states)} states, {len(table.transitions)} transitions.")
+    try:
+        written = save_table(table, args.output)
+    except ImportError as e:
+        print(f"Could not write {args.output}: {str(e).splitlines()[0]}")
+        return
+    for p in written:
+        print(f"Wrote: {p.resolve()}")
+
+if __name__ == "__main__":
+    cli()
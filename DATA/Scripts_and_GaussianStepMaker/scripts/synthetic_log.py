@@ -0,0 +1,406 @@
+"""
+Synthetic Gaussian TD-DFT optimisation logs of any size, built from a real log.
+
+The template (by default the explicit-solvation BDP-NH2 + 2 water LE log,
+opt freq td=(nstates=5,root=2)) is cut into four parts:
+
+    prologue    everything before the first orientation block
+    cycle       the first optimisation cycle (orientation, SCF, TD block,
+                forces, Berny step and convergence table)
+    final       the last cycle of the optimisation link through its
+                'Normal termination' (Stationary point found, ...)
+    freq        the frequency link (Link1 ... end), if the template has one
+
+and written back as prologue + cycle x (steps - 1) + final [+ freq]. While
+streaming, every block the parsers read is regenerated for the requested
+size instead of copied: the route (nstates/root), 'NAtoms=', the orientation
+and forces tables (atoms beyond the template's are translated copies of the
+molecule), 'SCF Done:', the TD block (EXCITED_HEADER_RE headers, TRANSITION_RE
+lines, the optimisation flag and TD_TOTAL_E_RE energy of the root), 'Step
+number', the convergence table and the 'Low frequencies ---' lines (with an
+optional imaginary-frequency warning). Numbers are printed with Gaussian's
+own field widths (formatting the template's values reproduces its lines).
+Everything else (population analysis, per-state dipole
+tables, Berny internals) is copied from the template as filler, so the
+file size per cycle stays realistic.
+
+Energies relax exponentially from the template's first to its last SCF
+energy, excited states jitter around the template's last TD block and the
+convergence values fall below their thresholds at the last step. All random
+numbers come from one seeded generator.
+
+    python synthetic_log.py big.log --steps 2000 --atoms 300 --states 20 --transitions 8
+    python synthetic_log.py bad.log --steps 5 --imaginary 1
+    python synthetic_log.py corpus/ --count 100 --steps 50 --no-freq
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import re
+from pathlib import Path
+from typing import IO, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from log_scanner import (
+    EXCITED_HEADER_RE, FLOAT_RE, SCF_DONE_RE, TRANSITION_RE, find_root_in_route,
+)
+
+PathLike = Union[str, Path]
+
+HERE = Path(__file__).resolve().parent
+TEMPLATE = HERE.parent.parent / "Explicit_Solvation" / "BDP" / "LE" / "04BDP-NH2_2_water_m062x_def2SVP_ethanol.log"
+
+HARTREE_EV = 27.211386
+EV_NM = 1239.84198
+COPY_SHIFT = 12.0          # Angstrom along x between copies of the molecule when atoms > template atoms
+ROUTE_WIDTH = 70           # route lines are wrapped at this many characters, as Gaussian does
+CONVERGENCE_ITEMS = ("Maximum Force", "RMS Force", "Maximum Displacement", "RMS Displacement")
+CONVERGENCE_THRESHOLDS = (0.000450, 0.000300, 0.001800, 0.001200)   # Gaussian's default opt criteria
+
+_NSTATES_RE = re.compile(r"(nstates\s*=\s*)(\d+)", re.IGNORECASE)
+_ROOT_SUB_RE = re.compile(r"(root\s*=\s*)(\d+)", re.IGNORECASE)
+_NATOMS_RE = re.compile(r"NAtoms=\s*(\d+)")
+
+TD_HEADER = " Excitation energies and oscillator strengths:"
+OPT_FLAG = " This state for optimization and/or second-order correction.\n"
+DENSITY_COPY = " Copying the excited state density for this state as the 1-particle RhoCI density.\n"
+
+
+class LogTemplate(NamedTuple):
+    path: str
+    prologue: List[str]
+    cycle: List[str]
+    final: List[str]
+    freq: List[str]
+    atoms: List[Tuple[int, float, float, float]]   # first geometry of the template
+    scf_first: float
+    scf_last: float
+    states: List[Tuple[float, float]]              # (eV, f) of the last TD block of the optimisation
+    transitions: int                               # most transitions printed for one state
+    homo: int
+    root: int
+    max_steps: int
+
+
+# ----------------------------------------------------------------------------
+# Template
+# ----------------------------------------------------------------------------
+def _is_orientation(line: str) -> bool:
+    s = line.strip()
+    return s == "Standard orientation:" or s == "Input orientation:"
+
+def load_template(path: PathLike = TEMPLATE) -> LogTemplate:
+    """Cut a finished opt(+freq) TD-DFT log into its parts and read the values the generator varies."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        lines = f.readlines()
+
+    term = next((i for i, ln in enumerate(lines) if ln.startswith(" Normal termination")), None)
+    if term is None:
+        raise ValueError(f"{path}: no Normal termination line")
+    orients = [i for i in range(term) if _is_orientation(lines[i])]
+    steps = [i for i in range(term) if lines[i].startswith(" Step number")]
+    if len(orients) < 2 or not steps:
+        raise ValueError(f"{path}: not an optimisation log (needs two cycles before the first termination)")
+    last_cycle = max(i for i in orients if i < steps[-1])
+
+    atoms, scf, block, states = [], [], [], []
+    homo, ntrans, cur, root, route = 10 ** 9, 0, 0, None, None
+    for i in range(term):
+        ln = lines[i]
+        if route is None and ln.startswith(" #"):
+            route = "".join(x.rstrip("\n")[1:] for x in lines[i:next(j for j in range(i, term)
+                                                                       if lines[j].startswith(" ---"))])
+        elif i == orients[0] + 5:
+            j = i
+            while not lines[j].startswith(" ---"):
+                p = lines[j].split()
+                atoms.append((int(p[1]), float(p[3]), float(p[4]), float(p[5])))
+                j += 1
+        elif ln.startswith(" SCF Done:"):
+            scf.append(float(SCF_DONE_RE.search(ln).group(2)))
+        elif ln.startswith(TD_HEADER):
+            block = []
+        elif ln.startswith(" Excited State"):
+            m = EXCITED_HEADER_RE.search(ln)
+            block.append((float(m.group(4)), float(m.group(6))))
+            states, cur = block, 0
+        elif "->" in ln:
+            m = TRANSITION_RE.match(ln)
+            if m:
+                homo = min(homo, int(m.group(2)) - 1)
+                cur += 1
+                ntrans = max(ntrans, cur)
+    max_steps = int(lines[steps[0]].split()[-1])
+    return LogTemplate(str(path), lines[:orients[0]], lines[orients[0]:orients[1]], lines[last_cycle:term + 1],
+                       lines[term + 1:], atoms, scf[0], scf[-1], states, max(ntrans, 1), homo,
+                       find_root_in_route(route or "") or 1, max_steps)
+
+
+# ----------------------------------------------------------------------------
+# Line formats (Gaussian's Fortran field widths)
+# ----------------------------------------------------------------------------
+def orientation_row(n: int, z: int, x: float, y: float, zc: float) -> str:
+    return f" {n:6d}{z:11d}{0:12d}    {x:12.6f}{y:12.6f}{zc:12.6f}\n"
+
+def force_row(n: int, z: int, fx: float, fy: float, fz: float) -> str:
+    return f" {n:6d}{z:9d}       {fx:15.9f}{fy:15.9f}{fz:15.9f}\n"
+
+def excited_state_line(n: int, e_ev: float, fosc: float, mult: str = "Singlet-A", nm: Optional[float] = None) -> str:
+    nm = EV_NM / e_ev if nm is None else nm
+    return f" Excited State {n:3d}:      {mult} {e_ev:11.4f} eV {nm:7.2f} nm  f={fosc:.4f}  <S**2>=0.000\n"
+
+def transition_line(src: int, dst: int, coeff: float) -> str:
+    return f" {src:7d} ->{dst:<4d}{coeff:15.5f}\n"
+
+def low_frequency_lines(values: Sequence[float]) -> List[str]:
+    return [" Low frequencies ---" + "".join(f"{v:10.4f}" for v in values[i:i + 6]) + "\n"
+            for i in range(0, len(values), 6)]
+
+def replace_numbers(line: str, values: Sequence[object], pattern: re.Pattern = FLOAT_RE, group: int = 0) -> str:
+    """Put new values in place of the numbers matched by pattern (or its group), keeping each field's right edge.
+
+    Floats are printed with as many decimals as the number they replace.
+    """
+    out, pos = [], 0
+    for m, v in zip(pattern.finditer(line), values):
+        start, end = m.span(group)
+        digits = f"{v:.{len(m.group(group).split('.')[1])}f}" if isinstance(v, float) else str(v)
+        # widen into the spaces in front of the field when the new value is longer
+        while len(digits) > end - start and start > pos and line[start - 1] == " ":
+            start -= 1
+        out.append(line[pos:start] + digits.rjust(end - start))
+        pos = end
+    out.append(line[pos:])
+    return "".join(out)
+
+def wrap_route(text: str, width: int = ROUTE_WIDTH) -> List[str]:
+    return [f" {text[i:i + width]}\n" for i in range(0, len(text), width)] or [" #\n"]
+
+
+# ----------------------------------------------------------------------------
+# Generation
+# ----------------------------------------------------------------------------
+class Cycle(NamedTuple):
+    """Values printed for one optimisation cycle."""
+    step: int
+    coords: List[Tuple[int, float, float, float]]
+    forces: List[Tuple[float, float, float]]
+    scf: float
+    states: List[Tuple[float, float, List[Tuple[int, int, float]]]]   # (eV, f, [(src, dst, coeff)])
+    convergence: List[Tuple[float, bool]]
+
+
+class SyntheticLog:
+    """Streams one synthetic log; the size parameters default to the template's."""
+
+    def __init__(self, template: LogTemplate, atoms: Optional[int] = None, steps: Optional[int] = None,
+                 states: Optional[int] = None, transitions: Optional[int] = None, freq: bool = True,
+                 imaginary: int = 0, seed: int = 0):
+        self.t = template
+        self.n_atoms = atoms or len(template.atoms)
+        self.steps = max(1, steps or 2)
+        self.n_states = states or len(template.states)
+        self.n_trans = transitions or template.transitions
+        self.freq = freq and bool(template.freq)
+        self.imaginary = imaginary
+        self.root = min(template.root, self.n_states)
+        self.max_steps = max(template.max_steps, self.steps)
+        self.rng = random.Random(seed)
+        self.base = self._atoms()
+        self.state_base = self._state_energies()
+
+    def _atoms(self) -> List[Tuple[int, float, float, float]]:
+        mol = self.t.atoms
+        out = []
+        for i in range(self.n_atoms):
+            z, x, y, zc = mol[i % len(mol)]
+            out.append((z, x + COPY_SHIFT * (i // len(mol)), y, zc))
+        return out
+
+    def _state_energies(self) -> List[Tuple[float, float]]:
+        out = list(self.t.states[:self.n_states])
+        while len(out) < self.n_states:
+            e = (out[-1][0] if out else 2.0) + self.rng.uniform(0.05, 0.25)
+            out.append((e, self.rng.uniform(0.0, 0.3) ** 2))
+        return out
+
+    def _transitions(self) -> List[Tuple[int, int, float]]:
+        homo = self.t.homo
+        pairs = sorted(((homo - a, homo + 1 + b) for a in range(self.n_trans) for b in range(self.n_trans)),
+                       key=lambda p: (homo - p[0]) + (p[1] - homo - 1))[:self.n_trans]
+        weights = [self.rng.random() ** (k + 1) for k in range(len(pairs))]
+        norm = math.sqrt(2 * sum(weights))
+        return [(s, d, self.rng.choice((1, -1)) * max(math.sqrt(w) / norm, 0.1)) for (s, d), w in zip(pairs, weights)]
+
+    def cycle(self, step: int) -> Cycle:
+        """Values of optimisation cycle `step` (1-based; the last step is converged)."""
+        frac = math.exp(-5.0 * (step - 1) / max(1, self.steps - 1))
+        amp = 0.05 * frac
+        coords = [(z, x + self.rng.gauss(0, amp), y + self.rng.gauss(0, amp), zc + self.rng.gauss(0, amp))
+                  for z, x, y, zc in self.base]
+        fmax = 0.05 * frac if step < self.steps else 4e-5
+        forces = [(self.rng.gauss(0, fmax / 3), self.rng.gauss(0, fmax / 3), self.rng.gauss(0, fmax / 3))
+                  for _ in coords]
+        scf = self.t.scf_last + (self.t.scf_first - self.t.scf_last) * frac + self.rng.gauss(0, 1e-7)
+        states = [(e + self.rng.gauss(0, 0.01), min(1.5, f * self.rng.uniform(0.9, 1.1)), self._transitions())
+                  for e, f in self.state_base]
+        states.sort(key=lambda s: s[0])
+        last = step == self.steps
+        conv = [(thr * (0.1 if last else 50 * frac + self.rng.uniform(0.5, 2.0)), last) for thr in CONVERGENCE_THRESHOLDS]
+        return Cycle(step, coords, forces, scf, states, conv)
+
+    # -- writing -----------------------------------------------------------
+    def lines(self) -> Iterator[str]:
+        yield from self._rewrite(self.t.prologue, None)
+        for step in range(1, self.steps):
+            yield from self._rewrite(self.t.cycle, self.cycle(step))
+        final = self.cycle(self.steps)
+        yield from self._rewrite(self.t.final, final)
+        if self.freq:
+            yield from self._rewrite(self.t.freq, final, opt=False)
+
+    def write(self, dest: PathLike) -> Path:
+        dest = Path(dest)
+        with open(dest, "w", encoding="utf-8") as f:
+            _write_all(f, self.lines())
+        return dest
+
+    def _rewrite(self, src: List[str], c: Optional[Cycle], opt: bool = True) -> Iterator[str]:
+        """Template lines with the blocks of cycle c regenerated; opt=False keeps Step/convergence lines."""
+        i, n = 0, len(src)
+        while i < n:
+            ln = src[i]
+            head = ln.lstrip()[:4]
+            if ln.startswith(" #") and c is None:
+                j = next(k for k in range(i, n) if src[k].startswith(" ---"))
+                text = "".join(x.rstrip("\n")[1:] for x in src[i:j])
+                text = _NSTATES_RE.sub(lambda m: f"{m.group(1)}{self.n_states}", text)
+                text = _ROOT_SUB_RE.sub(lambda m: f"{m.group(1)}{self.root}", text)
+                yield from wrap_route(text)
+                i = j
+                continue
+            if c is not None and _is_orientation(ln):
+                yield from src[i:i + 5]
+                yield from (orientation_row(k + 1, *a) for k, a in enumerate(c.coords))
+                i = _skip_table(src, i + 5)
+                continue
+            if c is not None and head == "Cent" and "Forces (Hartrees/Bohr)" in ln:
+                yield from src[i:i + 3]
+                yield from (force_row(k + 1, a[0], *fr) for k, (a, fr) in enumerate(zip(c.coords, c.forces)))
+                i = _skip_table(src, i + 3)
+                continue
+            if c is not None and ln.startswith(TD_HEADER):
+                yield ln
+                yield from self._td_block(c)
+                i += 1
+                while i < n and _in_td_block(src[i]):
+                    i += 1
+                continue
+            if head == "NAto" and "NAtoms=" in ln:
+                yield replace_numbers(ln, [self.n_atoms], _NATOMS_RE)
+            elif c is not None and head == "SCF " and ln.startswith(" SCF Done:"):
+                yield replace_numbers(ln, [c.scf], SCF_DONE_RE, group=2)
+            elif c is not None and opt and head == "Step" and ln.startswith(" Step number"):
+                yield f" Step number {c.step:3d} out of a maximum of {self.max_steps:4d}\n"
+            elif c is not None and opt and (head == "Maxi" or head == "RMS ") and _is_convergence_row(ln):
+                value, ok = c.convergence[CONVERGENCE_ITEMS.index(" ".join(ln.split()[:2]))]
+                row = replace_numbers(ln, [value])
+                yield row[:row.rfind("YES" if "YES" in row else "NO")] + ("YES" if ok else "NO ") + "\n"
+            elif head == "Low " and ln.startswith(" Low frequencies ---"):
+                j = i
+                while j < n and src[j].startswith(" Low frequencies ---"):
+                    j += 1
+                yield from self._low_frequencies()
+                if j < n and "imaginary frequencies (negative Signs)" in src[j]:
+                    j += 1
+                i = j
+                continue
+            else:
+                yield ln
+            i += 1
+
+    def _td_block(self, c: Cycle) -> Iterator[str]:
+        td = c.scf + c.states[self.root - 1][0] / HARTREE_EV
+        for k, (e, fosc, trans) in enumerate(c.states, start=1):
+            yield " \n"
+            yield excited_state_line(k, e, fosc)
+            yield from (transition_line(*t) for t in trans)
+            if k == self.root:
+                yield OPT_FLAG
+                yield f" Total Energy, E(TD-HF/TD-DFT) = {td:15.8f}    \n"
+                yield DENSITY_COPY
+
+    def _low_frequencies(self) -> Iterator[str]:
+        vib = sorted(self.rng.uniform(8.0, 40.0) for _ in range(3))
+        rot = [self.rng.uniform(-5.0, 6.0) for _ in range(6)]
+        imag = [-self.rng.uniform(20.0, 80.0) for _ in range(self.imaginary)]
+        yield from low_frequency_lines(imag + rot + vib)
+        if self.imaginary:
+            yield f" ******{self.imaginary:5d} imaginary frequencies (negative Signs) ****** \n"
+
+
+def _is_convergence_row(line: str) -> bool:
+    parts = line.split()
+    return len(parts) == 5 and parts[1] in ("Force", "Displacement") and parts[4] in ("YES", "NO")
+
+def _skip_table(src: List[str], i: int) -> int:
+    """Index just past the closing dashes of a table whose rows start at i."""
+    while i < len(src) and not src[i].startswith(" ---"):
+        i += 1
+    return i
+
+def _in_td_block(line: str) -> bool:
+    s = line.strip()
+    return (not s or s.startswith("Excited State") or s.startswith("This state for optimization")
+            or s.startswith("Total Energy, E(TD") or s.startswith("Copying the excited state")
+            or bool(TRANSITION_RE.match(line)))
+
+def _write_all(f: IO[str], lines: Iterator[str], batch: int = 4096) -> None:
+    buf: List[str] = []
+    for ln in lines:
+        buf.append(ln)
+        if len(buf) >= batch:
+            f.write("".join(buf))
+            buf.clear()
+    f.write("".join(buf))
+
+
+def generate(dest: PathLike, atoms: Optional[int] = None, steps: Optional[int] = None, states: Optional[int] = None,
+             transitions: Optional[int] = None, freq: bool = True, imaginary: int = 0, seed: int = 0,
+             template: Union[PathLike, LogTemplate] = TEMPLATE) -> Path:
+    """Write one synthetic log; None keeps the template's atom/state/transition counts (and 2 opt steps)."""
+    if not isinstance(template, LogTemplate):
+        template = load_template(template)
+    return SyntheticLog(template, atoms, steps, states, transitions, freq, imaginary, seed).write(dest)
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Write synthetic Gaussian TD-DFT opt(+freq) logs built from a real log.")
+    ap.add_argument("output", help="Log to write, or a folder with --count.")
+    ap.add_argument("--template", type=str, default=str(TEMPLATE), help="Finished opt(+freq) TD-DFT log.")
+    ap.add_argument("--atoms", type=int, default=None, help="Atoms (default: as in the template).")
+    ap.add_argument("--steps", type=int, default=10, help="Optimisation steps.")
+    ap.add_argument("--states", type=int, default=None, help="Excited states per TD block (default: as in the template).")
+    ap.add_argument("--transitions", type=int, default=None, help="Transitions printed per state.")
+    ap.add_argument("--no-freq", action="store_true", help="Leave out the frequency link.")
+    ap.add_argument("--imaginary", type=int, default=0, help="Imaginary frequencies to report.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--count", type=int, default=None, help="Write this many logs (seeds seed..seed+count-1) into output/.")
+    args = ap.parse_args()
+
+    template = load_template(args.template)
+    if args.count:
+        folder = Path(args.output)
+        folder.mkdir(parents=True, exist_ok=True)
+        dests = [folder / f"{Path(args.template).stem}_syn{k:05d}.log" for k in range(args.count)]
+    else:
+        dests = [Path(args.output)]
+    for k, dest in enumerate(dests):
+        generate(dest, args.atoms, args.steps, args.states, args.transitions, not args.no_freq, args.imaginary,
+                 args.seed + k, template)
+    size = sum(d.stat().st_size for d in dests)
+    print(f"Wrote {len(dests)} log(s), {size / 1e6:.1f} MB ({dests[0]}{' ...' if len(dests) > 1 else ''})")
+
+if __name__ == "__main__":
+    cli()
@@ -9,32 +9,17 @@ import csv
 import glob
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-EXCITED_HEADER_RE = re.compile(
-    r"Excited State\s+(\d+)\s*:\s*([A-Za-z\-]+)\s+([A-Za-z]+)?\s*([0-9.]+)\s*eV\s*([0-9.]+)\s*nm\s*f\s*=\s*([0-9.]+)",
-    re.IGNORECASE,
+from compressed_log import is_log_file, unique_logs
+from log_scanner import (
+    EXCITED_HEADER_RE, OPTIM_FLAG_RE, ROOT_RE, TD_TOTAL_E_RE, TRANSITION_RE,
+    ExcitedState, OptFlag, Route, TdEnergy, Transition, find_root_in_route, scan_log,
 )
-TRANSITION_RE = re.compile(r"^\s*(\d+)\s*->\s*(\d+)\s*([\-+]?[0-9]*\.?[0-9]+)\s*$")
-OPTIM_FLAG_RE = re.compile(r"This state for optimization and/or second-order correction\.", re.IGNORECASE)
-TD_TOTAL_E_RE = re.compile(r"Total Energy,\s*E\(TD-HF/TD-DFT\)\s*=\s*([\-+]?[0-9]*\.?[0-9]+)")
-ROOT_RE = re.compile(r"Root\s*=\s*(\d+)", re.IGNORECASE)
-
-def read_lines(path: Path) -> List[str]:
-    with open(path, "r", errors="ignore") as f:
-        return f.readlines()
-
-def find_root(lines: List[str]) -> Optional[int]:
-    for span in (lines[:400], lines):
-        for ln in span:
-            m = ROOT_RE.search(ln)
-            if m:
-                try:
-                    return int(m.group(1))
-                except Exception:
-                    pass
-    return None
+from parse_cache import ParseCache, add_cache_arguments
+from parse_profile import NO_PROFILE, Profile, add_profile_argument
 
 def natural_key(p: Path) -> tuple:
     """Return a tuple for human sorting: split name into text and integer chunks.
@@ -59,104 +44,87 @@ def gather_files(patterns: List[str]) -> List[Path]:
         if matched:
             for m in matched:
                 mp = Path(m)
-                if mp.is_file() and mp.suffix.lower() in [".log", ".out"]:
+                if mp.is_file() and is_log_file(mp):
                     out.append(mp)
                 elif mp.is_dir():
-                    out.extend(list(mp.rglob("*.log")))
-                    out.extend(list(mp.rglob("*.out")))
+                    out.extend(q for q in mp.rglob("*") if is_log_file(q) and q.is_file())
         else:
             mp = Path(p)
-            if mp.is_file() and mp.suffix.lower() in [".log", ".out"]:
+            if mp.is_file() and is_log_file(mp):
                 out.append(mp)
             elif mp.is_dir():
-                out.extend(list(mp.rglob("*.log")))
-                out.extend(list(mp.rglob("*.out")))
+                out.extend(q for q in mp.rglob("*") if is_log_file(q) and q.is_file())
     # de-duplicate while preserving order then sort naturally
-    seen = set()
-    uniq = []
-    for p in out:
-        if p not in seen:
-            uniq.append(p)
-            seen.add(p)
+    # (a plain log and its compressed copy count once, as the plain file)
+    uniq = unique_logs(dict.fromkeys(out))
     uniq.sort(key=natural_key)
     return uniq
 
-def collect_transitions_from(lines: List[str], header_idx: int) -> List[Tuple[int,int,float]]:
-    trans: List[Tuple[int,int,float]] = []
-    i = header_idx + 1
-    while i < len(lines):
-        ln = lines[i]
-        if ln.strip().startswith("Excited State"):
-            break
-        mt = TRANSITION_RE.match(ln)
-        if mt:
-            src = int(mt.group(1)); dst = int(mt.group(2)); coeff = float(mt.group(3))
-            trans.append((src, dst, coeff))
-        i += 1
-    return trans
-
-def find_td_energy_near(lines: List[str], start_idx: int, search_span: int = 30) -> Optional[float]:
-    end = min(len(lines), start_idx + search_span)
-    for i in range(start_idx, end):
-        me = TD_TOTAL_E_RE.search(lines[i])
-        if me:
-            try:
-                return float(me.group(1))
-            except Exception:
-                return None
-    return None
-
-def parse_file(path: Path, threshold: float = 0.30, topk: int = 3, debug: bool = False) -> Dict[str, object]:
-    lines = read_lines(path)
-    root = find_root(lines)
-
-    headers: List[Dict[str, object]] = []
-    for idx, ln in enumerate(lines):
-        mh = EXCITED_HEADER_RE.search(ln)
-        if mh:
-            state = int(mh.group(1))
-            e_eV  = float(mh.group(4))
-            lam   = float(mh.group(5))
-            fosc  = float(mh.group(6))
-            headers.append({"idx": idx, "state": state, "e_eV": e_eV, "lam_nm": lam, "fosc": fosc})
-
-    flagged_steps: List[Dict[str, object]] = []
-    last_seen_state = None
-    last_header_idx = -1
-    for idx, ln in enumerate(lines):
-        mh = EXCITED_HEADER_RE.search(ln)
-        if mh:
-            last_seen_state = int(mh.group(1))
-            last_header_idx = idx
-            continue
-        if OPTIM_FLAG_RE.search(ln) and last_seen_state is not None:
-            e_td = find_td_energy_near(lines, idx, search_span=8) or find_td_energy_near(lines, last_header_idx, 25)
-            trans = collect_transitions_from(lines, last_header_idx)
-            h = next((h for h in headers if h["idx"] == last_header_idx), None)
-            flagged_steps.append({
-                "state": last_seen_state, "idx": last_header_idx, "e_td": e_td,
-                "e_eV": h["e_eV"] if h else None, "lam_nm": h["lam_nm"] if h else None,
-                "fosc": h["fosc"] if h else None, "trans": trans,
-            })
+def rank_transitions(trans: List[Tuple[int, int, float]], threshold: float = 0.30,
+                     topk: int = 3) -> Dict[str, object]:
+    """Top-|coeff| transitions of one state and its adjacency flags.
+
+    transition_analysis.analyse() is the batched equivalent for whole tables.
+    """
+    sorted_trans = sorted(trans, key=lambda t: abs(t[2]), reverse=True)
+    top = sorted_trans[:max(0, min(len(sorted_trans), topk))]
+    adjacent_present  = any(abs(dst - src) == 1 and abs(coeff) >= threshold for src, dst, coeff in sorted_trans)
+    adjacent_dominant = any(abs(dst - src) == 1 for src, dst, coeff in top)
+    labels = []
+    for src, dst, coeff in top:
+        delta = dst - src
+        tag = []
+        if abs(delta) == 1: tag.append("adjacent")
+        if abs(coeff) >= threshold: tag.append("significant")
+        tag_str = (", " + ", ".join(tag)) if tag else ""
+        labels.append(f"{src}->{dst} (Δ={delta}, coeff={coeff:.5f}{tag_str})")
+    return {
+        "dominant_transitions": "; ".join(labels),
+        "adjacent_present": adjacent_present,
+        "adjacent_dominant": adjacent_dominant,
+    }
+
+def parse_file(path: Path, threshold: float = 0.30, topk: int = 3, debug: bool = False,
+               prof: Profile = NO_PROFILE) -> Dict[str, object]:
+    root = None
+    # Per-header records, each with its own transition list. Only the current
+    # header, the last one per state and the last flagged step are kept alive.
+    cur: Optional[Dict[str, object]] = None
+    last_by_state: Dict[int, Dict[str, object]] = {}
+    flagged: Optional[Dict[str, object]] = None
+    flag_idx = -1
+
+    for ev in prof.events(scan_log(path, (Route, ExcitedState, Transition, OptFlag, TdEnergy))):
+        kind = type(ev)
+        if kind is Transition:
+            if cur is not None:
+                cur["trans"].append((ev.src, ev.dst, ev.coeff))
+        elif kind is ExcitedState:
+            cur = {"state": ev.state, "idx": ev.lineno, "e_td": None, "e_td_flag": None,
+                   "e_eV": ev.e_eV, "lam_nm": ev.lam_nm, "fosc": ev.fosc, "trans": []}
+            last_by_state[ev.state] = cur
+        elif kind is TdEnergy:
+            if flagged is not None and flagged["e_td_flag"] is None and ev.lineno - flag_idx < 8:
+                flagged["e_td_flag"] = ev.energy
+            if cur is not None and cur["e_td"] is None and ev.lineno - cur["idx"] < 25:
+                cur["e_td"] = ev.energy
+        elif kind is OptFlag:
+            if cur is not None:
+                flagged = cur
+                flagged["e_td_flag"] = None
+                flag_idx = ev.lineno
+        elif kind is Route:
+            if root is None:
+                root = find_root_in_route(ev.text)
 
     chosen = None
-    if flagged_steps:
-        chosen = flagged_steps[-1]
-    else:
-        if root is not None:
-            for h in reversed(headers):
-                if h["state"] == root:
-                    trans = collect_transitions_from(lines, h["idx"])
-                    e_td  = find_td_energy_near(lines, h["idx"], 25)
-                    chosen = {"state": h["state"], "idx": h["idx"], "e_td": e_td,
-                              "e_eV": h["e_eV"], "lam_nm": h["lam_nm"], "fosc": h["fosc"], "trans": trans}
-                    break
-        if chosen is None and headers:
-            h = headers[-1]
-            trans = collect_transitions_from(lines, h["idx"])
-            e_td  = find_td_energy_near(lines, h["idx"], 25)
-            chosen = {"state": h["state"], "idx": h["idx"], "e_td": e_td,
-                      "e_eV": h["e_eV"], "lam_nm": h["lam_nm"], "fosc": h["fosc"], "trans": trans}
+    if flagged is not None:
+        chosen = dict(flagged)
+        chosen["e_td"] = flagged["e_td_flag"] or flagged["e_td"]
+    elif root is not None and root in last_by_state:
+        chosen = last_by_state[root]
+    elif cur is not None:
+        chosen = cur
 
     result: Dict[str, object] = {
         "file": str(path.name),
@@ -185,41 +153,88 @@ def parse_file(path: Path, threshold: float = 0.30, topk: int = 3, debug: bool =
             "f_osc_final": chosen["fosc"],
             "num_transitions_final": len(trans),
         })
-        sorted_trans = sorted(trans, key=lambda t: abs(t[2]), reverse=True)
-        top = sorted_trans[:max(0, min(len(sorted_trans), topk))]
-        adjacent_present  = any(abs(dst - src) == 1 and abs(coeff) >= threshold for src, dst, coeff in sorted_trans)
-        adjacent_dominant = any(abs(dst - src) == 1 for src, dst, coeff in top)
-        labels = []
-        for src, dst, coeff in top:
-            delta = dst - src
-            tag = []
-            if abs(delta) == 1: tag.append("adjacent")
-            if abs(coeff) >= threshold: tag.append("significant")
-            tag_str = (", " + ", ".join(tag)) if tag else ""
-            labels.append(f"{src}->{dst} (Δ={delta}, coeff={coeff:.5f}{tag_str})")
-        result["dominant_transitions"] = "; ".join(labels)
-        result["adjacent_present"] = adjacent_present
-        result["adjacent_dominant"] = adjacent_dominant
+        result.update(rank_transitions(trans, threshold, topk))
 
     if debug:
         print(f"[{Path(path).name}] Root={root}  State={result['optimized_state_final']}  "
               f"Match={result['root_matches_final']}  E_TD={result['TD_total_energy_Ha_final']}")
     return result
 
-def run(paths: List[str], threshold: float = 0.30, top: int = 3, output: str = "td_tddft_summary.csv", debug: bool = False) -> Path:
+def _parse_job(f: Path, threshold: float, topk: int, debug: bool,
+               profile: Optional[str] = None) -> Dict[str, object]:
+    """parse_file() wrapper that turns any failure into an error row (runs in pool workers).
+
+    `profile` is the trace path of --profile; the worker appends its stages to it.
+    """
+    try:
+        prof = Profile("tddft", profile) if profile else NO_PROFILE
+        with prof.stage("parse", f):
+            return parse_file(Path(f), threshold=threshold, topk=topk, debug=debug, prof=prof)
+    except Exception as e:
+        return {"file": Path(f).name, "error": str(e)}
+
+def parse_files_parallel(files: List[Path], threshold: float = 0.30, topk: int = 3,
+                         debug: bool = False, jobs: int = 1,
+                         profile: Optional[str] = None) -> List[Dict[str, object]]:
+    """Parse files in a process pool; rows come back in the order of `files`.
+
+    Results are collected as workers finish (as_completed), so one slow or
+    failing log never holds up the others; a crashed worker yields an error row.
+    """
+    rows: List[Optional[Dict[str, object]]] = [None] * len(files)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_parse_job, f, threshold, topk, debug, profile): i for i, f in enumerate(files)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                rows[i] = fut.result()
+            except Exception as e:
+                rows[i] = {"file": Path(files[i]).name, "error": f"worker failed: {e}"}
+    return rows
+
+def run(paths: List[str], threshold: float = 0.30, top: int = 3, output: str = "td_tddft_summary.csv",
+        debug: bool = False, jobs: int = 1, use_cache: bool = True, rebuild_cache: bool = False,
+        states_table: Optional[str] = None, profile: Optional[str] = None) -> Path:
+    prof = Profile("tddft", profile, reset=True) if profile else NO_PROFILE
     files = gather_files(paths)
     print(f"Found {len(files)} files.")
     if files[:5]:
         ex = [Path(f).name for f in files[:5]]
         print("Examples:", ", ".join(ex))
 
-    rows = []
-    for f in files:
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    if states_table:
+        # Every state of every TD block, as columnar arrays (see state_table.py)
+        from state_table import build_table, save_table
+        table = build_table(files, jobs=jobs)
         try:
-            rec = parse_file(Path(f), threshold=threshold, topk=top, debug=debug)
-        except Exception as e:
-            rec = {"file": Path(f).name, "error": str(e)}
-        rows.append(rec)
+            for p in save_table(table, states_table):
+                print(f"Wrote {len(table.states)} states / {len(table.transitions)} transitions to: {p.resolve()}")
+        except ImportError as e:
+            print(f"Skipping {states_table}: {str(e).splitlines()[0]}")
+
+    # Reuse records of unchanged logs; only new or grown files are parsed.
+    params = f"threshold={threshold};top={top}"
+    with ParseCache(enabled=use_cache, rebuild=rebuild_cache) as cache:
+        with prof.stage("cache"):
+            rows: List[Optional[Dict[str, object]]] = [cache.get("tddft", f, params) for f in files]
+        todo = [i for i, r in enumerate(rows) if r is None]
+
+        todo_files = [files[i] for i in todo]
+        if jobs > 1 and len(todo_files) > 1:
+            parsed = parse_files_parallel(todo_files, threshold=threshold, topk=top, debug=debug, jobs=jobs,
+                                          profile=profile)
+        else:
+            parsed = [_parse_job(f, threshold, top, debug, profile) for f in todo_files]
+
+        for i, rec in zip(todo, parsed):
+            rows[i] = rec
+            if "error" not in rec:
+                cache.put("tddft", files[i], rec, params)
+        cache.evict_missing()
+        print(cache.summary())
 
     # Natural-sort rows by 'file' to ensure CSV comes out human-ordered too
     rows.sort(key=lambda r: natural_key(Path(r.get("file",""))))
@@ -231,12 +246,14 @@ def run(paths: List[str], threshold: float = 0.30, top: int = 3, output: str = "
         "dominant_transitions","error",
     ]
     out_path = Path(output)
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
+    with prof.stage("write_csv"), open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=headers)
         writer.writeheader()
         for r in rows:
             writer.writerow({h: r.get(h) for h in headers})
     print(f"Wrote {len(rows)} rows to: {out_path.resolve()}")
+    if prof:
+        print(prof.summary())
     return out_path
 
 def cli():
@@ -246,8 +263,15 @@ def cli():
     ap.add_argument("--top", type=int, default=3, help="How many top-|coeff| transitions to list.")
     ap.add_argument("--output", type=str, default="td_tddft_summary.csv", help="CSV output filename.")
     ap.add_argument("--debug", action="store_true", help="Print per-file diagnostics.")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for parsing (0 = all cores).")
+    ap.add_argument("--states-table", type=str, default=None,
+                    help="Also write every state of every TD block to this .npz or .parquet table.")
+    add_cache_arguments(ap)
+    add_profile_argument(ap, "tddft")
     args = ap.parse_args()
-    run(args.paths, threshold=args.threshold, top=args.top, output=args.output, debug=args.debug)
+    run(args.paths, threshold=args.threshold, top=args.top, output=args.output, debug=args.debug, jobs=args.jobs,
+        use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache, states_table=args.states_table,
+        profile=args.profile)
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,100 @@
+"""
+job_monitor.LogFollower on a log that grows the way a running job's does
+(gaussian_log_stub.replay_chunks): after every poll the events it has parsed
+must be exactly those one scan_log() of the finished file has up to the
+same line.
+
+    python -m pytest DATA/Scripts_and_GaussianStepMaker/scripts/tests
+"""
+import bisect
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1]
+DATA = SCRIPTS.parents[1]
+sys.path.insert(0, str(SCRIPTS))
+
+import job_monitor  # noqa: E402
+from gaussian_log_stub import replay_chunks  # noqa: E402
+from job_monitor import EVENTS, LogFollower  # noqa: E402
+from log_scanner import OptStep, Route, ScfDone, TdEnergy, Termination, scan_log  # noqa: E402
+
+LOGS = [
+    DATA / "Explicit_Solvation/BDP/CT/04BDP-NH2_m062x_def2SVP_ethanol.log",     # TD opt, 2 steps
+    DATA / "Case_Study_C_Rhodamine/Si-RDM/04Si_RDM_m062x_def2SVP_ethanol.log",  # opt + freq links
+]
+
+
+class Recorder:
+    """Wraps job_monitor.scan_lines to collect the follower's events with file line numbers."""
+
+    def __init__(self, monkeypatch):
+        self.events = []
+        self.follower = None
+        real = job_monitor.scan_lines
+
+        def scan_lines(lines, kinds=None):
+            base = self.follower.lineno   # feed() counts the lines after scanning them
+            for ev in real(lines, kinds):
+                self.events.append(ev._replace(lineno=ev.lineno + base))
+                yield ev
+
+        monkeypatch.setattr(job_monitor, "scan_lines", scan_lines)
+
+
+def _follow(src, dest, sizes, monkeypatch):
+    """Poll after every write in sizes (bytes written so far) and compare with the finished file."""
+    expected = list(scan_log(src, EVENTS))
+    lines = [ev.lineno for ev in expected]
+    rec = Recorder(monkeypatch)
+    rec.follower = follower = LogFollower(str(dest))
+    data = Path(src).read_bytes()
+    for written in sizes:
+        follower.poll()
+        assert follower.offset <= written
+        assert data[follower.offset - 1:follower.offset] in (b"", b"\n")   # stops at a line end
+        assert rec.events == expected[:bisect.bisect_left(lines, follower.lineno)]
+    assert follower.offset == len(data)
+
+    # the summary of the finished log
+    last = {kind: [ev for ev in expected if type(ev) is kind][-1] for kind in (ScfDone, TdEnergy, OptStep, Termination)}
+    assert follower.route == [ev for ev in expected if type(ev) is Route][0].text.strip()
+    assert follower.scf == last[ScfDone].energy
+    assert follower.td == last[TdEnergy].energy
+    assert follower.step == last[OptStep].step
+    assert follower.termination is last[Termination].normal
+    return follower
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("src", LOGS, ids=lambda p: p.name)
+def test_random_chunks(src, seed, tmp_path, monkeypatch):
+    dest = tmp_path / src.name
+    _follow(src, dest, replay_chunks(str(src), str(dest), chunk=3000, jitter=0.95, seed=seed), monkeypatch)
+
+
+def test_cut_inside_route(tmp_path, monkeypatch):
+    src = LOGS[0]
+    data = src.read_bytes()
+    start = data.index(b"\n #") + 1
+    end = data.index(b"\n ---", start) + 1
+    assert data.count(b"\n", start, end) > 1, "route on one line: pick a log with a longer route"
+    # mid-line in the first route line, at a route line end, one byte before the closing dashes,
+    # then the rest in random chunks
+    second = data.index(b"\n", start) + 1
+    cuts = [start + 5, second, second + 3, end - 1, end + 2]
+    dest = tmp_path / src.name
+
+    def sizes():
+        with open(dest, "wb") as out:
+            pos = 0
+            for cut in cuts + list(range(end + 5000, len(data), 7919)) + [len(data)]:
+                out.write(data[pos:cut])
+                out.flush()
+                pos = cut
+                yield cut
+
+    follower = _follow(src, dest, sizes(), monkeypatch)
+    assert follower.root is not None or "root" not in follower.route.lower()
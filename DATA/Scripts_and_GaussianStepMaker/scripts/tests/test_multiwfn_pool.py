@@ -0,0 +1,64 @@
+"""
+multiwfn_pool against the stand-in executable multiwfn_stub.py:
+
+    python -m pytest DATA/Scripts_and_GaussianStepMaker/scripts/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS))
+
+from multiwfn_pool import multiwfn_dct_batch, multiwfn_lambda_batch  # noqa: E402
+from multiwfn_stub import _dct, _lambda  # noqa: E402
+
+STUB = str(SCRIPTS / "multiwfn_stub.py")
+
+
+@pytest.fixture
+def fchks(tmp_path):
+    paths = [tmp_path / f"scan_{i:02d}.fchk" for i in range(3)]
+    for p in paths:
+        p.touch()   # the stub does not read the fchk
+    return paths
+
+
+def test_dct_values_per_state_in_order(fchks):
+    items = [(f, [(s, (70 + s + i, 74 + 2 * s)) for s in (3, 1, 2)]) for i, f in enumerate(fchks)]
+    results = multiwfn_dct_batch(STUB, items, jobs=2)
+    assert len(results) == len(items)
+    for (_, specs), (values, err) in zip(items, results):
+        assert err is None
+        assert list(values) == [s for s, _ in specs]
+        assert values == {s: pytest.approx(_dct(*pair)) for s, pair in specs}
+
+
+def test_lambda_values_per_state_in_order(fchks):
+    items = [(fchks[0], [2, 1, 3]), (fchks[1], [5]), (fchks[2], [1, 4])]
+    results = multiwfn_lambda_batch(STUB, items, jobs=2)
+    for (_, states), (values, err) in zip(items, results):
+        assert err is None
+        assert list(values) == states
+        assert values == {s: pytest.approx(_lambda(s)) for s in states}
+
+
+def test_missing_executable_is_an_error_row(fchks, tmp_path):
+    exe = str(tmp_path / "no_such_multiwfn")
+    for results in (multiwfn_dct_batch(exe, [(fchks[0], [(1, (73, 74))])]),
+                    multiwfn_lambda_batch(exe, [(fchks[0], [1, 2])])):
+        assert len(results) == 1
+        values, err = results[0]
+        assert values == {} and err
+
+
+def test_timeout_is_retried_then_reported(fchks, monkeypatch):
+    monkeypatch.setenv("MULTIWFN_STUB_DELAY", "2")
+    timings = {}
+    results = multiwfn_dct_batch(STUB, [(fchks[0], [(1, (73, 74))])], timeout=0.3, retries=1, timings=timings)
+    values, err = results[0]
+    assert values == {}
+    assert "timed out after 0.3 s" in err
+    # both attempts ran into the timeout before the error was returned
+    assert 0.6 <= timings[str(fchks[0])] < 2.0
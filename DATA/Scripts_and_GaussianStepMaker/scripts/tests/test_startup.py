@@ -0,0 +1,29 @@
+"""
+Start-up budget of the log-only pet.py commands (same measurement as
+`python benchmark_parsers.py startup --check`):
+
+    python -m pytest DATA/Scripts_and_GaussianStepMaker/scripts/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmark_parsers import command_startup  # noqa: E402
+from pet import HEAVY_MODULES, LIGHT_COMMANDS, STARTUP_BUDGET_MS  # noqa: E402
+
+ATTEMPTS = 3   # best-of-N import time, so one slow interpreter start does not fail the test
+
+
+@pytest.mark.parametrize("cmd", [""] + list(LIGHT_COMMANDS), ids=lambda c: c or "pet")
+def test_light_command_startup(cmd):
+    best = None
+    for _ in range(ATTEMPTS):
+        total, heavy, _ = command_startup(cmd)
+        assert not heavy, f"pet {cmd} --help imports {', '.join(heavy)} (none of {HEAVY_MODULES} allowed)"
+        best = total if best is None else min(best, total)
+        if best <= STARTUP_BUDGET_MS:
+            break
+    assert best <= STARTUP_BUDGET_MS, f"pet {cmd} --help: {best:.1f} ms of imports > {STARTUP_BUDGET_MS:g} ms"
@@ -0,0 +1,197 @@
+"""
+Geometry path of a Gaussian optimisation as NumPy arrays.
+
+log_to_com keeps only the last orientation block; read_trajectory() keeps
+them all, in one streaming pass over the log:
+
+    coords        (n_steps, n_atoms, 3) float64, Angstrom
+    atomic_numbers (n_atoms,)
+    link          0-based job link of each frame (Termination lines seen before it)
+    step          'Step number' of each frame (0 if none was printed)
+    scf_energy    SCF Done energy of the frame (Hartree, NaN if absent)
+    td_energy     Total Energy, E(TD-HF/TD-DFT) of the frame (NaN if absent)
+    max_force, rms_force, max_disp, rms_disp
+                  the frame's convergence table (NaN if absent)
+
+A frame starts at each orientation block of the chosen kind ("Input" by
+default: it keeps the frame of the input, so frames do not jump between
+steps; "Standard" as printed for symmetry); energies, step number and
+convergence values that follow are attached to it. With opt_only=True only
+the frames of the first job link are kept, so the frequency job of an
+opt+freq run is dropped.
+
+    traj = read_trajectory("CT_opt_B3LYP.log")
+    d = traj.distance(0, 12)                  # (n_steps,) Angstrom
+    phi = traj.dihedral(3, 4, 10, 11)          # (n_steps,) degrees
+    save_trajectory(traj, "CT_opt.npz")        # or .npy (coords only, np.load(mmap_mode="r")) or .xyz
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, NamedTuple, Union
+
+import numpy as np
+
+from compressed_log import strip_compression
+from log_scanner import Convergence, Geometry, OptStep, ScfDone, TdEnergy, Termination, element_symbol, scan_log
+
+PathLike = Union[str, Path]
+
+ORIENTATIONS = ("Input", "Standard")
+# Convergence item -> Trajectory field
+CONVERGENCE_FIELDS = {
+    "Maximum Force": "max_force",
+    "RMS Force": "rms_force",
+    "Maximum Displacement": "max_disp",
+    "RMS Displacement": "rms_disp",
+}
+FRAME_FIELDS = ("link", "step", "scf_energy", "td_energy", "max_force", "rms_force", "max_disp", "rms_disp")
+
+
+class Trajectory(NamedTuple):
+    coords: np.ndarray
+    atomic_numbers: np.ndarray
+    link: np.ndarray
+    step: np.ndarray
+    scf_energy: np.ndarray
+    td_energy: np.ndarray
+    max_force: np.ndarray
+    rms_force: np.ndarray
+    max_disp: np.ndarray
+    rms_disp: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def distance(self, i: int, j: int) -> np.ndarray:
+        """Distance between atoms i and j (0-based) in every frame."""
+        return np.linalg.norm(self.coords[:, i] - self.coords[:, j], axis=1)
+
+    def angle(self, i: int, j: int, k: int) -> np.ndarray:
+        """Angle i-j-k in degrees in every frame."""
+        a = self.coords[:, i] - self.coords[:, j]
+        b = self.coords[:, k] - self.coords[:, j]
+        cos = np.einsum("nd,nd->n", a, b) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+        return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+    def dihedral(self, i: int, j: int, k: int, l: int) -> np.ndarray:
+        """Dihedral angle i-j-k-l in degrees (-180, 180] in every frame."""
+        b0 = self.coords[:, i] - self.coords[:, j]
+        b1 = self.coords[:, k] - self.coords[:, j]
+        b2 = self.coords[:, l] - self.coords[:, k]
+        b1 = b1 / np.linalg.norm(b1, axis=1, keepdims=True)
+        v = b0 - np.einsum("nd,nd->n", b0, b1)[:, None] * b1
+        w = b2 - np.einsum("nd,nd->n", b2, b1)[:, None] * b1
+        x = np.einsum("nd,nd->n", v, w)
+        y = np.einsum("nd,nd->n", np.cross(b1, v), w)
+        return np.degrees(np.arctan2(y, x))
+
+
+class _Frames:
+    """Per-orientation frame lists filled while streaming."""
+
+    def __init__(self):
+        self.coords: List[list] = []
+        self.values: List[dict] = []
+        self.numbers = None
+
+    def start(self, atoms, link: int) -> None:
+        if self.numbers is None:
+            self.numbers = [a[0] for a in atoms]
+        elif len(atoms) != len(self.numbers):
+            raise ValueError(f"atom count changed from {len(self.numbers)} to {len(atoms)}")
+        self.coords.append([a[1:] for a in atoms])
+        self.values.append({"link": link})
+
+    def set(self, field: str, value, first: bool = False) -> None:
+        if self.values and not (first and field in self.values[-1]):
+            self.values[-1][field] = value
+
+
+def read_trajectory(path: PathLike, orientation: str = "Input", opt_only: bool = False) -> Trajectory:
+    """All frames of one log; falls back to the other orientation if the chosen one is never printed."""
+    if orientation not in ORIENTATIONS:
+        raise ValueError(f"orientation must be one of {ORIENTATIONS}")
+    frames = {kind: _Frames() for kind in ORIENTATIONS}
+    link = 0
+    for ev in scan_log(path, (Geometry, ScfDone, TdEnergy, OptStep, Convergence, Termination)):
+        kind = type(ev)
+        if kind is Geometry:
+            if ev.atoms:
+                frames[ev.kind].start(ev.atoms, link)
+            continue
+        if kind is Termination:
+            link += 1
+            continue
+        for fr in frames.values():
+            if kind is ScfDone:
+                fr.set("scf_energy", ev.energy)
+            elif kind is TdEnergy:
+                fr.set("td_energy", ev.energy, first=True)
+            elif kind is OptStep:
+                fr.set("step", ev.step)
+            elif ev.item in CONVERGENCE_FIELDS:
+                fr.set(CONVERGENCE_FIELDS[ev.item], ev.value)
+
+    fr = frames[orientation]
+    if not fr.coords:
+        fr = frames[ORIENTATIONS[1 - ORIENTATIONS.index(orientation)]]
+    n_atoms = len(fr.numbers or ())
+    coords = np.array(fr.coords, dtype=np.float64).reshape(len(fr.coords), n_atoms, 3)
+    cols = {f: np.array([v.get(f, np.nan) for v in fr.values], dtype=np.float64) for f in FRAME_FIELDS}
+    for f in ("link", "step"):
+        cols[f] = np.nan_to_num(cols[f]).astype(np.int32)
+    numbers = np.array(fr.numbers or (), dtype=np.int32)
+    if opt_only:
+        keep = cols["link"] == 0
+        coords = coords[keep]
+        cols = {f: a[keep] for f, a in cols.items()}
+    return Trajectory(coords, numbers, **cols)
+
+
+def write_xyz(traj: Trajectory, path: PathLike) -> Path:
+    """Multi-frame XYZ; the comment line carries the step number and energies."""
+    path = Path(path)
+    symbols = [element_symbol(int(z)) for z in traj.atomic_numbers]
+    with open(path, "w") as f:
+        for n in range(len(traj)):
+            f.write(f"{len(symbols)}\n")
+            f.write(f"step={traj.step[n]} scf={traj.scf_energy[n]:.8f} td={traj.td_energy[n]:.8f} "
+                    f"max_force={traj.max_force[n]:.6f} rms_force={traj.rms_force[n]:.6f}\n")
+            f.writelines(f"{s:<2}  {x:12.6f}  {y:12.6f}  {z:12.6f}\n"
+                         for s, (x, y, z) in zip(symbols, traj.coords[n]))
+    return path
+
+def save_trajectory(traj: Trajectory, path: PathLike) -> Path:
+    """Write as .npz (all arrays), .npy (coords only, memory-mappable) or .xyz; returns the file written."""
+    path = Path(path)
+    if path.suffix == ".xyz":
+        return write_xyz(traj, path)
+    if path.suffix == ".npy":
+        np.save(path, traj.coords)
+        return path
+    np.savez(path, **traj._asdict())
+    return path if path.suffix == ".npz" else Path(f"{path}.npz")
+
+def load_trajectory(path: PathLike) -> Trajectory:
+    with np.load(path) as z:
+        return Trajectory(**{f: z[f] for f in Trajectory._fields})
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Extract the optimisation trajectory of Gaussian logs as NumPy arrays.")
+    ap.add_argument("logs", nargs="+", help="Gaussian .log files.")
+    ap.add_argument("--format", choices=["npz", "npy", "xyz"], default="npz",
+                    help="npz: all arrays; npy: coordinates only (memory-mappable); xyz: multi-frame XYZ.")
+    ap.add_argument("--orientation", choices=ORIENTATIONS, default="Input")
+    ap.add_argument("--opt-only", action="store_true", help="Keep only the frames of the first job link.")
+    args = ap.parse_args()
+
+    for log in args.logs:
+        traj = read_trajectory(log, args.orientation, args.opt_only)
+        out = save_trajectory(traj, Path(strip_compression(log)).with_suffix(f".traj.{args.format}"))
+        print(f"{Path(log).name}: {len(traj)} frames x {traj.coords.shape[1]} atoms -> {out}")
+
+if __name__ == "__main__":
+    cli()
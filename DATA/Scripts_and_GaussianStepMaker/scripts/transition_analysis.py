@@ -0,0 +1,152 @@
+"""
+Vectorised dominant-transition analysis over a whole campaign.
+
+tddft_parser.rank_transitions() ranks the 'src -> dst coeff' lines of one
+state with Python lists. analyse() does the same for every state at once
+from flat arrays (state_row, src, dst, coeff), e.g. a state_table.StateTable:
+
+    table = build_table(files)
+    res = analyse_table(table, threshold=0.30, topk=3, homo=homo_per_file)
+    res.top_src[i], res.top_dst[i], res.top_weight[i], res.labels[i]
+    res.adjacent_present.mean()
+
+Per state it returns the top-k transitions by |coeff| (argpartition, then a
+sort of the k survivors; ties keep file order as in rank_transitions), their
+contribution weights 2*c^2, the adjacent (|dst - src| == 1) and significant
+(|coeff| >= threshold) flags, and HOMO/LUMO labels following
+calc_dct.get_label(). Unused top-k slots hold -1 / NaN / "".
+"""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from log_scanner import open_log
+
+PathLike = Union[str, Path]
+
+ALPHA_ELECTRONS_RE = re.compile(r"^\s*(\d+)\s+alpha electrons")
+TIE_EPS = 1e-9   # coefficients are printed to 5 decimals, so this only breaks exact ties
+
+
+class TransitionAnalysis(NamedTuple):
+    top_src: np.ndarray            # (n_states, k) int, -1 where unused
+    top_dst: np.ndarray            # (n_states, k) int, -1 where unused
+    top_coeff: np.ndarray          # (n_states, k) float, NaN where unused
+    top_weight: np.ndarray         # (n_states, k) 2*c^2
+    n_top: np.ndarray              # (n_states,) filled slots
+    adjacent: np.ndarray           # (n_states, k) |dst - src| == 1
+    significant: np.ndarray        # (n_states, k) |coeff| >= threshold
+    adjacent_present: np.ndarray   # (n_states,) any adjacent and significant transition
+    adjacent_dominant: np.ndarray  # (n_states,) any adjacent transition among the top k
+    labels: Optional[np.ndarray]   # (n_states, k) 'H-1->LUMO' etc., or None without HOMO indices
+
+
+def homo_index_from_log(path: PathLike) -> Optional[int]:
+    """Number of alpha electrons (= HOMO index) from the first ' N alpha electrons' line."""
+    with open_log(path) as f:
+        for line in f:
+            if "alpha electrons" in line:
+                m = ALPHA_ELECTRONS_RE.match(line)
+                if m:
+                    return int(m.group(1))
+    return None
+
+def _label(diff: int) -> str:
+    if diff == 0: return "HOMO"
+    if diff == 1: return "LUMO"
+    if diff < 0: return f"H{diff}"
+    return f"L+{diff-1}"
+
+def pair_labels(src: np.ndarray, dst: np.ndarray, homo: np.ndarray) -> np.ndarray:
+    """Vectorised calc_dct.get_label() pairs, 'H-1->LUMO'.
+
+    Only the distinct (src - homo, dst - homo) pairs are formatted; every
+    other entry is a lookup into them.
+    """
+    d_src = (np.asarray(src) - homo).ravel()
+    d_dst = (np.asarray(dst) - homo).ravel()
+    if d_src.size == 0:
+        return np.empty(np.shape(src), dtype=str)
+    lo = min(d_src.min(), d_dst.min())
+    span = max(d_src.max(), d_dst.max()) - lo + 1
+    code = (d_src - lo) * span + (d_dst - lo)
+    uniq, inverse = np.unique(code, return_inverse=True)
+    text = np.array([f"{_label(c // span + lo)}->{_label(c % span + lo)}" for c in uniq.tolist()])
+    return text[inverse].reshape(np.shape(src))
+
+def analyse(state_row: np.ndarray, src: np.ndarray, dst: np.ndarray, coeff: np.ndarray, n_states: int,
+            threshold: float = 0.30, topk: int = 3, homo: Optional[np.ndarray] = None) -> TransitionAnalysis:
+    """Rank the transitions of all states in one go.
+
+    state_row must be non-decreasing (transitions grouped by state, as in a
+    StateTable); homo, if given, is a HOMO index per state (or a scalar).
+    """
+    state_row = np.asarray(state_row, dtype=np.int64)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    coeff = np.asarray(coeff, dtype=np.float64)
+    k = max(0, topk)
+
+    # Scatter |coeff| into a dense (n_states, width) matrix, one row per state
+    counts = np.bincount(state_row, minlength=n_states)
+    width = int(counts.max()) if len(counts) else 0
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    pos = np.arange(len(state_row)) - starts[state_row]
+    score = np.full((n_states, max(width, 1)), -np.inf)
+    score[state_row, pos] = np.abs(coeff) - pos * TIE_EPS
+    flat = np.full((n_states, max(width, 1)), -1, dtype=np.int64)
+    flat[state_row, pos] = np.arange(len(state_row))
+
+    # Top-k columns per row: partition, then order the k survivors
+    kk = min(k, width)
+    if kk == 0:
+        cols = np.empty((n_states, 0), dtype=np.int64)
+    elif kk < width:
+        cols = np.argpartition(-score, kk - 1, axis=1)[:, :kk]
+    else:
+        cols = np.broadcast_to(np.arange(width), (n_states, width))
+    rows = np.arange(n_states)[:, None]
+    order = np.argsort(-score[rows, cols], axis=1, kind="stable")
+    cols = np.take_along_axis(cols, order, axis=1)
+    picked = flat[rows, cols]
+    valid = picked >= 0
+
+    def take(a, fill):
+        out = np.full((n_states, k), fill, dtype=np.result_type(a, type(fill)))
+        out[:, :kk] = np.where(valid, a[np.maximum(picked, 0)], fill)
+        return out
+
+    top_src = take(src, -1)
+    top_dst = take(dst, -1)
+    top_coeff = take(coeff, np.nan)
+    used = top_src >= 0
+    adjacent = used & (np.abs(top_dst - top_src) == 1)
+    significant = used & (np.abs(np.nan_to_num(top_coeff)) >= threshold)
+
+    adj_sig = (np.abs(dst - src) == 1) & (np.abs(coeff) >= threshold)
+    adjacent_present = np.bincount(state_row[adj_sig], minlength=n_states) > 0
+
+    labels = None
+    if homo is not None:
+        h = np.broadcast_to(np.asarray(homo), (n_states,))[:, None]
+        labels = np.where(used, pair_labels(top_src, top_dst, h), "")
+
+    return TransitionAnalysis(
+        top_src=top_src, top_dst=top_dst, top_coeff=top_coeff, top_weight=2.0 * top_coeff ** 2,
+        n_top=used.sum(axis=1), adjacent=adjacent, significant=significant,
+        adjacent_present=adjacent_present, adjacent_dominant=adjacent.any(axis=1), labels=labels,
+    )
+
+def analyse_table(table, threshold: float = 0.30, topk: int = 3,
+                  homo: Optional[np.ndarray] = None) -> TransitionAnalysis:
+    """analyse() over a state_table.StateTable; homo is one HOMO index per file (table.files order)."""
+    t = table.transitions
+    homo_per_state = None
+    if homo is not None:
+        homo_per_state = np.asarray(homo)[table.states["file_id"]]
+    return analyse(t["state_row"], t["src"], t["dst"], t["coeff"], len(table.states),
+                   threshold=threshold, topk=topk, homo=homo_per_state)
@@ -0,0 +1,292 @@
+"""
+Multi-frame XYZ ensembles (ORCA GOAT output) as one NumPy array, with RMSD deduplication.
+
+iter_xyz() streams the frames of a file; read_ensemble() packs them into a
+contiguous (n_frames, n_atoms, 3) array, with the energy of each frame taken
+from its comment line ("-72.5509193283 converged=true" in the GOAT
+ensembles, "... E -72.5239198858" in the _trj.xyz files). frame_index()
+only locates the frames (byte offset and comment energy of each, without
+parsing coordinates) and read_frame() then reads a single one.
+
+dedup() picks a non-redundant set in order of increasing energy: a conformer
+is dropped if its Kabsch RMSD to an already kept one is below the threshold.
+Most pairs never reach the Kabsch step, because two cheap lower bounds on the
+RMSD reject them first:
+
+    radial       after superposition the centroids coincide, so each atom's
+                 distance to the centroid changes by at most its displacement:
+                 RMSD >= rms(r_A - r_B)
+    fingerprint  every interatomic distance changes by at most |e_i| + |e_j|,
+                 so their RMS change is at most 2 x RMSD, and sorting both
+                 distance vectors cannot increase it:
+                 RMSD >= rms(sort(d_A) - sort(d_B)) / 2
+
+The radial bound is applied to all pairs from one matrix product, the sorted
+interatomic-distance fingerprint to the pairs it lets through, and Kabsch to
+what is left. Candidates are handled in blocks against all kept conformers
+at once; inside a block there is one vectorised round per kept conformer, so
+no Python loop runs over pairs. Kabsch and the radial bound need the same
+atom order in every frame, which holds for GOAT ensembles.
+
+    ens = read_ensemble("Naph_GOAT.finalensemble.xyz")
+    ens = ens.take(energy_window(ens, 3.0))          # within 3 kcal/mol of the minimum
+    keep = dedup(ens, rmsd_threshold=0.125)
+    write_xyz(ens.take(keep), "Naph_GOAT.unique.xyz")
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+HARTREE_TO_KCAL = 627.509474
+RMSD_THRESHOLD = 0.125     # Angstrom, GOAT's default for distinct conformers
+BLOCK = 256                # candidates screened per block in dedup()
+KABSCH_CHUNK = 65536       # pairs per batched fingerprint / Kabsch call
+BOUND_TOL = 1e-6           # round-off allowance on the lower bounds
+
+_ENERGY_RE = re.compile(r"(?:^|\s)E\s+([-+]?\d+\.\d+)")
+_FLOAT_RE = re.compile(r"[-+]?\d+\.\d+")
+
+
+class Ensemble(NamedTuple):
+    symbols: List[str]
+    coords: np.ndarray      # (n_frames, n_atoms, 3) float64, Angstrom
+    energies: np.ndarray    # (n_frames,) Hartree, NaN where the comment has none
+    comments: List[str]
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def take(self, idx) -> "Ensemble":
+        """Sub-ensemble from an index array or boolean mask."""
+        idx = np.flatnonzero(idx) if np.asarray(idx).dtype == bool else np.asarray(idx, dtype=int)
+        return Ensemble(self.symbols, self.coords[idx], self.energies[idx], [self.comments[i] for i in idx])
+
+
+def comment_energy(comment: str) -> float:
+    """Energy from an XYZ comment line: the value after ' E ', else the first float; NaN if none."""
+    m = _ENERGY_RE.search(comment) or _FLOAT_RE.search(comment)
+    return float(m.group(1) if m.re is _ENERGY_RE else m.group(0)) if m else float("nan")
+
+def iter_xyz(path: PathLike) -> Iterator[Tuple[str, List[str], np.ndarray]]:
+    """Yield (comment, symbols, (n_atoms, 3) coords) per frame, reading the file line by line."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            head = f.readline()
+            if not head:
+                return
+            if not head.strip():
+                continue
+            n = int(head)
+            comment = f.readline().rstrip("\n")
+            lines = [f.readline() for _ in range(n)]
+            if not lines or not lines[-1]:
+                return   # truncated last frame
+            symbols = [line.split(None, 1)[0] for line in lines]
+            coords = np.array(" ".join(line.split(None, 1)[1] for line in lines).split(),
+                              dtype=np.float64).reshape(n, -1)[:, :3]
+            yield comment, symbols, coords
+
+def frame_index(path: PathLike) -> Tuple[np.ndarray, np.ndarray]:
+    """(offsets, energies): byte offset and comment-line energy of every complete frame.
+
+    Frames are assumed to follow each other without blank lines and to have
+    the atom count of the first one, as in the GOAT and _trj.xyz files.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ends = np.flatnonzero(np.frombuffer(mm, dtype=np.uint8) == 10)
+            n_atoms = int(mm[:ends[0]]) if len(ends) else 0
+            per_frame = n_atoms + 2
+            n_frames = len(ends) // per_frame
+            starts = np.concatenate([[0], ends[:-1] + 1])
+            offsets = starts[:n_frames * per_frame:per_frame].astype(np.int64)
+            comments = starts[1:n_frames * per_frame:per_frame]
+            energies = np.array([comment_energy(mm[c:e].decode("utf-8", "ignore"))
+                                 for c, e in zip(comments, ends[1::per_frame])], dtype=np.float64)
+    return offsets, energies
+
+def read_frame(path: PathLike, offset: int) -> Tuple[str, List[str], np.ndarray]:
+    """(comment, symbols, coords) of the frame starting at byte offset (from frame_index())."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        n = int(f.readline())
+        comment = f.readline().decode("utf-8", "ignore").rstrip("\n")
+        lines = [f.readline().decode("utf-8", "ignore") for _ in range(n)]
+    symbols = [line.split(None, 1)[0] for line in lines]
+    coords = np.array(" ".join(line.split(None, 1)[1] for line in lines).split(),
+                      dtype=np.float64).reshape(n, -1)[:, :3]
+    return comment, symbols, coords
+
+def read_ensemble(path: PathLike) -> Ensemble:
+    """All frames of an XYZ file packed into one contiguous array."""
+    symbols: Optional[List[str]] = None
+    frames, comments = [], []
+    for comment, sym, xyz in iter_xyz(path):
+        if symbols is None:
+            symbols = sym
+        elif len(sym) != len(symbols):
+            raise ValueError(f"{Path(path).name}: frame {len(frames)} has {len(sym)} atoms, expected {len(symbols)}")
+        frames.append(xyz)
+        comments.append(comment)
+    n_atoms = len(symbols or ())
+    coords = np.stack(frames) if frames else np.empty((0, n_atoms, 3))
+    energies = np.array([comment_energy(c) for c in comments], dtype=np.float64)
+    return Ensemble(symbols or [], coords, energies, comments)
+
+def write_xyz(ens: Ensemble, path: PathLike) -> Path:
+    path = Path(path)
+    with open(path, "w") as f:
+        for xyz, comment in zip(ens.coords, ens.comments):
+            f.write(f"{len(ens.symbols)}\n{comment}\n")
+            f.writelines(f"{s:<2}  {x:14.8f}  {y:14.8f}  {z:14.8f}\n" for s, (x, y, z) in zip(ens.symbols, xyz))
+    return path
+
+
+def energy_window(ens: Ensemble, window_kcal: float) -> np.ndarray:
+    """Mask of the frames within window_kcal (kcal/mol) of the lowest energy."""
+    rel = (ens.energies - np.nanmin(ens.energies)) * HARTREE_TO_KCAL
+    return rel <= window_kcal
+
+
+# -- RMSD ----------------------------------------------------------------------
+def fingerprints(coords: np.ndarray) -> np.ndarray:
+    """(n, n_pairs) sorted interatomic distances of each frame (float64)."""
+    iu = np.triu_indices(coords.shape[1], k=1)
+    d = np.linalg.norm(coords[:, iu[0]] - coords[:, iu[1]], axis=2)
+    d.sort(axis=1)
+    return d
+
+def radial_profiles(coords: np.ndarray) -> np.ndarray:
+    """(n, n_atoms) distance of every atom to its frame's centroid."""
+    return np.linalg.norm(coords - coords.mean(axis=1, keepdims=True), axis=2)
+
+def radial_bound(ra: np.ndarray, rb: np.ndarray) -> np.ndarray:
+    """(len(ra), len(rb)) lower bounds on the Kabsch RMSD from radial profiles."""
+    sq = (ra * ra).sum(1)[:, None] + (rb * rb).sum(1)[None, :] - 2.0 * ra @ rb.T
+    return np.sqrt(np.maximum(sq, 0.0) / ra.shape[1])
+
+def fingerprint_bound(fa: np.ndarray, fb: np.ndarray) -> np.ndarray:
+    """Lower bounds on the Kabsch RMSD for paired fingerprints fa[k], fb[k]."""
+    return 0.5 * np.sqrt(((fa - fb) ** 2).mean(axis=1))
+
+def kabsch_rmsd(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Minimum RMSD over rotations and translations for paired frames a[k], b[k] (m, n_atoms, 3)."""
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    h = np.einsum("mni,mnj->mij", a, b)
+    u, s, vt = np.linalg.svd(h)
+    d = np.sign(np.linalg.det(u @ vt))
+    s[:, 2] *= d
+    sq = (a * a).sum(axis=(1, 2)) + (b * b).sum(axis=(1, 2)) - 2.0 * s.sum(axis=1)
+    return np.sqrt(np.maximum(sq, 0.0) / a.shape[1])
+
+class _Screened(NamedTuple):
+    coords: np.ndarray
+    radial: np.ndarray
+    fp: np.ndarray
+
+def _screen(coords: np.ndarray) -> _Screened:
+    return _Screened(coords, radial_profiles(coords), fingerprints(coords))
+
+def close_pairs(a: _Screened, b: _Screened, threshold: float,
+                rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (i, j) with RMSD(a[i], b[j]) < threshold; Kabsch only runs on pairs both bounds let through.
+
+    rows restricts the search to those rows of a (the returned i still index a).
+    """
+    rows = np.arange(len(a.coords)) if rows is None else np.asarray(rows)
+    if len(rows) == 0 or len(b.coords) == 0:
+        return np.empty(0, int), np.empty(0, int)
+    i, j = np.nonzero(radial_bound(a.radial[rows], b.radial) < threshold + BOUND_TOL)
+    i = rows[i]
+    close = np.zeros(len(i), dtype=bool)
+    for k0 in range(0, len(i), KABSCH_CHUNK):
+        ii, jj = i[k0:k0 + KABSCH_CHUNK], j[k0:k0 + KABSCH_CHUNK]
+        cand = np.flatnonzero(fingerprint_bound(a.fp[ii], b.fp[jj]) < threshold + BOUND_TOL)
+        close[k0 + cand] = kabsch_rmsd(a.coords[ii[cand]], b.coords[jj[cand]]) < threshold
+    return i[close], j[close]
+
+def dedup(ens: Ensemble, rmsd_threshold: float = RMSD_THRESHOLD, block: int = BLOCK) -> np.ndarray:
+    """Indices of a non-redundant subset, lowest energy first (NaN energies last)."""
+    order = np.argsort(np.where(np.isnan(ens.energies), np.inf, ens.energies), kind="stable")
+    kept: List[int] = []
+    ref = _screen(ens.coords[:0])
+    for b0 in range(0, len(order), block):
+        idx = order[b0:b0 + block]
+        cur = _screen(ens.coords[idx])
+        # against every conformer kept so far, all at once
+        dup = np.zeros(len(idx), dtype=bool)
+        dup[close_pairs(cur, ref, rmsd_threshold)[0]] = True
+        # within the block: the lowest-energy survivor is kept and its duplicates are
+        # removed from the rest in one call, so there is one round per kept conformer
+        rest = np.flatnonzero(~dup)
+        accepted: List[int] = []
+        while len(rest):
+            k = rest[0]
+            accepted.append(k)
+            rest = rest[1:]
+            i, _ = close_pairs(cur, _Screened(*(x[k:k + 1] for x in cur)), rmsd_threshold, rest)
+            rest = np.setdiff1d(rest, i, assume_unique=True)
+        kept.extend(idx[accepted].tolist())
+        ref = _Screened(*(np.concatenate([r, c[accepted]]) for r, c in zip(ref, cur)))
+    return np.array(kept, dtype=int)
+
+
+def write_com_inputs(ens: Ensemble, folder: PathLike, stem: str, route: str,
+                     charge: int = 0, multiplicity: int = 1) -> List[Path]:
+    """One Gaussian input per frame (<stem>_confNNN.com), e.g. for the step-00 ground-state optimisation."""
+    from log_to_com import save_to_com
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    out = []
+    for n, xyz in enumerate(ens.coords, 1):
+        com = folder / f"{stem}_conf{n:03d}.com"
+        header = {"link0": [f"%chk={com.stem}.chk"], "route": route, "title": f"{stem} conformer {n}",
+                  "charge": charge, "multiplicity": multiplicity}
+        save_to_com(str(com), [f" {s:<2}  {x:12.6f}  {y:12.6f}  {z:12.6f}\n" for s, (x, y, z) in zip(ens.symbols, xyz)],
+                    header)
+        out.append(com)
+    return out
+
+
+def cli():
+    ap = argparse.ArgumentParser(description="Filter and deduplicate a multi-frame XYZ conformer ensemble.")
+    ap.add_argument("xyz", help="Ensemble file, e.g. Naph_GOAT.finalensemble.xyz.")
+    ap.add_argument("--window", type=float, default=None, help="Keep frames within this many kcal/mol of the minimum.")
+    ap.add_argument("--rmsd", type=float, default=RMSD_THRESHOLD, help="RMSD threshold (Angstrom) for duplicates.")
+    ap.add_argument("--output", type=str, default=None, help="Output XYZ (default: <stem>.unique.xyz).")
+    ap.add_argument("--com-dir", type=str, default=None, help="Also write one Gaussian .com per kept conformer here.")
+    ap.add_argument("--route", type=str, default="#p opt freq b3lyp/6-31g(d)", help="Route line for --com-dir.")
+    ap.add_argument("--charge", type=int, default=0)
+    ap.add_argument("--multiplicity", type=int, default=1)
+    args = ap.parse_args()
+
+    ens = read_ensemble(args.xyz)
+    print(f"{args.xyz}: {len(ens)} frames x {len(ens.symbols)} atoms")
+    if args.window is not None:
+        ens = ens.take(energy_window(ens, args.window))
+        print(f"  {len(ens)} within {args.window:g} kcal/mol")
+    ens = ens.take(dedup(ens, args.rmsd))
+    print(f"  {len(ens)} unique at RMSD < {args.rmsd:g} A")
+    stem = os.path.basename(args.xyz).split(".")[0]
+    out = write_xyz(ens, args.output or Path(args.xyz).with_name(f"{stem}.unique.xyz"))
+    print(f"Wrote: {out}")
+    if args.com_dir:
+        coms = write_com_inputs(ens, args.com_dir, stem, args.route, args.charge, args.multiplicity)
+        print(f"Wrote {len(coms)} .com files to {args.com_dir}")
+
+if __name__ == "__main__":
+    cli()